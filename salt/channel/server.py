@@ -12,6 +12,7 @@ import logging
 import os
 import pathlib
 import shutil
+import time
 
 import tornado.gen
 
@@ -112,6 +113,7 @@ class ReqServerChannel:
 
     @tornado.gen.coroutine
     def handle_message(self, payload):
+        received = time.time()
         try:
             payload = self._decode_payload(payload)
         except Exception as exc:  # pylint: disable=broad-except
@@ -162,6 +164,9 @@ class ReqServerChannel:
         if version > 1:
             nonce = payload["load"].pop("nonce", None)
 
+        # Let the handler measure the time the request waited
+        payload["received"] = received
+
         # TODO: test
         try:
             # Take the payload_handler function that was registered when we created the channel
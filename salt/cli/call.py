@@ -1,7 +1,9 @@
 import os
+import sys
 
 import salt.cli.caller
 import salt.defaults.exitcodes
+import salt.loader.profiler
 import salt.utils.parsers
 from salt.config import _expand_glob_path, prepend_root_dir
 
@@ -46,14 +48,29 @@ class SaltCall(salt.utils.parsers.SaltCallOptionParser):
             self.config["extension_modules"] = os.path.join(cache_dir, "extmods")
             prepend_root_dir(self.config, ["cachedir", "extension_modules"])
 
-        caller = salt.cli.caller.Caller.factory(self.config)
+        try:
+            caller = salt.cli.caller.Caller.factory(self.config)
 
-        if self.options.doc:
-            caller.print_docs()
-            self.exit(salt.defaults.exitcodes.EX_OK)
+            if self.options.doc:
+                caller.print_docs()
+                self.exit(salt.defaults.exitcodes.EX_OK)
 
-        if self.options.grains_run:
-            caller.print_grains()
-            self.exit(salt.defaults.exitcodes.EX_OK)
+            if self.options.grains_run:
+                caller.print_grains()
+                self.exit(salt.defaults.exitcodes.EX_OK)
 
-        caller.run()
+            caller.run()
+        finally:
+            if self.config.get("loader_profile"):
+                self._print_loader_profile()
+
+    def _print_loader_profile(self):
+        """
+        Write the loader profile to the cachedir and print the most expensive
+        modules to stderr
+        """
+        report = salt.loader.profiler.PROFILER.write(self.config["cachedir"])
+        print(
+            salt.loader.profiler.PROFILER.format_report(limit=25, report=report),
+            file=sys.stderr,
+        )
@@ -13,7 +13,6 @@ import types
 import urllib.parse
 from copy import deepcopy
 
-import salt.crypt
 import salt.defaults.exitcodes
 import salt.exceptions
 import salt.features
@@ -170,6 +169,9 @@ VALID_OPTS = immutabletypes.freeze(
         # what commands the master is processing and what the rates are of the executions
         "master_stats": bool,
         "master_stats_event_iter": int,
+        # Serve the latency statistics of the master workers in the Prometheus text format on
+        # this local port, 0 disables it
+        "master_stats_port": int,
         # The key fingerprint of the higher-level master for the syndic to verify it is talking to the
         # intended master
         "syndic_finger": str,
@@ -284,6 +286,12 @@ VALID_OPTS = immutabletypes.freeze(
         "disable_returners": list,
         # Tell the loader to only load modules in this list
         "whitelist_modules": list,
+        # Number of seconds the loaders may reuse cached __virtual__ results, 0 disables the cache
+        "loader_virtual_cache_ttl": int,
+        # Record the import and __virtual__ time of every module loaded by the loaders
+        "loader_profile": bool,
+        # Share the pillar and grains between the loaders instead of copying them
+        "loader_copy_on_write": bool,
         # A list of additional directories to search for salt modules in
         "module_dirs": list,
         # A list of additional directories to search for salt returners in
@@ -307,6 +315,17 @@ VALID_OPTS = immutabletypes.freeze(
         "open_mode": bool,
         # Whether or not processes should be forked when needed. The alternative is to use threading.
         "multiprocessing": bool,
+        # Whether or not the minion forks its job processes from a template process
+        # which already loaded the modules
+        "minion_job_forkserver": bool,
+        # The number of threads running the jobs of the minion when multiprocessing
+        # is disabled. 0 starts a new thread for every job.
+        "minion_job_threads": int,
+        # The number of jobs which can wait for one of the minion_job_threads
+        "minion_job_queue_size": int,
+        # What to do with a job when the queue of minion_job_threads is full,
+        # "queue" to wait for room in the queue or "reject" to return an error
+        "minion_job_queue_policy": str,
         # Maximum number of concurrently active processes at any given point in time
         "process_count_max": int,
         # Whether or not the salt minion should run scheduled mine updates
@@ -402,6 +421,18 @@ VALID_OPTS = immutabletypes.freeze(
         "state_auto_order": bool,
         # Fire events as state chunks are processed by the state compiler
         "state_events": bool,
+        # Cache rendered SLS data and reuse it while the SLS files, pillar and grains are unchanged
+        "state_render_cache": bool,
+        # Run independent states in up to this many processes at once, 0 disables
+        "state_parallel_workers": int,
+        # Run parallel states in a pool of this many reusable processes, 0 disables
+        "state_parallel_pool": int,
+        # Reuse the return codes of identical onlyif/unless commands until a state makes changes
+        "state_guard_cache": bool,
+        # Write a report of the time spent in each phase of every state run
+        "state_profile": bool,
+        # Send the state results to the master in batches of this size during the run
+        "state_stream_batch": int,
         # The number of seconds a minion should wait before retry when attempting authentication
         "acceptance_wait_time": float,
         # The number of seconds a minion should wait before giving up during authentication
@@ -508,6 +539,11 @@ VALID_OPTS = immutabletypes.freeze(
         # The number of MWorker processes for a master to startup. This number needs to scale up as
         # the number of connected minions increases.
         "worker_threads": int,
+        # The number of threads of each MWorker running the pillar and file serving requests, so
+        # that the worker keeps handling other requests while they block. 0 runs them inline.
+        "worker_blocking_threads": int,
+        # The number of requests a MWorker handles at once when worker_blocking_threads is set
+        "worker_max_inflight": int,
         # The port for the master to listen to returns on. The minion needs to connect to this port
         # to send returns.
         "ret_port": int,
@@ -705,6 +741,13 @@ VALID_OPTS = immutabletypes.freeze(
         "master_job_cache": str,
         # Specify whether the master should store end times for jobs as returns come in
         "job_cache_store_endtime": bool,
+        # Coalesce the returns of the minions for this many seconds before storing them in
+        # the job cache, 0 stores each return as it comes in
+        "master_return_batch_interval": float,
+        # Store the batched returns as soon as this many are waiting
+        "master_return_batch_size": int,
+        # Fire the event of each batched return along with the event of the batch
+        "master_return_batch_minion_events": bool,
         # The minion data cache is a cache of information about the minions stored on the master.
         # This information is primarily the pillar and grains data. The data is cached in the master
         # cachedir under the name of the minion and used to predetermine what minions are expected to
@@ -768,8 +811,18 @@ VALID_OPTS = immutabletypes.freeze(
         "winrepo_refspecs": list,
         # Set a hard limit for the amount of memory modules can consume on a minion.
         "modules_max_memory": int,
+        # Start the minion with the pillar it compiled last and refresh it in the background
+        "minion_warm_start": bool,
+        # The number of seconds after which the warm start snapshot is no longer used
+        "minion_warm_start_max_age": int,
         # Blacklist specific core grains to be filtered
         "grains_blacklist": list,
+        # The number of threads running the grains functions, 0 runs them one after the other
+        "grains_parallel_workers": int,
+        # The number of seconds to wait for a grains function run by a thread
+        "grains_parallel_timeout": float,
+        # Map grains function names or globs to the seconds their results are reused for
+        "grains_function_ttl": dict,
         # The number of minutes between the minion refreshing its cache of grains
         "grains_refresh_every": int,
         # Enable grains refresh prior to any operation
@@ -788,6 +841,10 @@ VALID_OPTS = immutabletypes.freeze(
         "jinja_lstrip_blocks": bool,
         # If this is set to True the first newline after a Jinja block is removed
         "jinja_trim_blocks": bool,
+        # The number of compiled Jinja templates kept in memory, 0 disables the cache
+        "jinja_template_cache_size": int,
+        # Also keep the compiled Jinja templates on disk, under the cachedir
+        "jinja_bytecode_cache": bool,
         # Cache minion ID to file
         "minion_id_caching": bool,
         # Always generate minion id in lowercase.
@@ -1047,7 +1104,12 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "cachedir": os.path.join(salt.syspaths.CACHE_DIR, "minion"),
         "append_minionid_config_dirs": [],
         "cache_jobs": False,
+        "minion_warm_start": False,
+        "minion_warm_start_max_age": 86400,
         "grains_blacklist": [],
+        "grains_parallel_workers": 0,
+        "grains_parallel_timeout": 60.0,
+        "grains_function_ttl": {},
         "grains_cache": False,
         "grains_cache_expiration": 300,
         "grains_deep_merge": False,
@@ -1164,6 +1226,9 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "disable_modules": [],
         "disable_returners": [],
         "whitelist_modules": [],
+        "loader_virtual_cache_ttl": 0,
+        "loader_profile": False,
+        "loader_copy_on_write": False,
         "module_dirs": [],
         "returner_dirs": [],
         "grains_dirs": [],
@@ -1179,6 +1244,10 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "auto_accept": True,
         "autosign_timeout": 120,
         "multiprocessing": True,
+        "minion_job_forkserver": False,
+        "minion_job_threads": 0,
+        "minion_job_queue_size": 0,
+        "minion_job_queue_policy": "queue",
         "process_count_max": -1,
         "mine_enabled": True,
         "mine_return_job": False,
@@ -1217,6 +1286,14 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "state_auto_order": True,
         "state_events": False,
         "state_aggregate": False,
+        "state_render_cache": False,
+        "state_parallel_workers": 0,
+        "state_parallel_pool": 0,
+        "state_guard_cache": False,
+        "state_profile": False,
+        "state_stream_batch": 0,
+        "jinja_template_cache_size": 0,
+        "jinja_bytecode_cache": False,
         "state_queue": False,
         "snapper_states": False,
         "snapper_states_config": "root",
@@ -1335,6 +1412,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "auth_mode": 1,
         "user": _MASTER_USER,
         "worker_threads": 5,
+        "worker_blocking_threads": 0,
+        "worker_max_inflight": 64,
         "sock_dir": os.path.join(salt.syspaths.SOCK_DIR, "master"),
         "sock_pool_size": 1,
         "ret_port": 4506,
@@ -1435,6 +1514,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "max_event_size": 1048576,
         "master_stats": False,
         "master_stats_event_iter": 60,
+        "master_stats_port": 0,
         "minionfs_env": "base",
         "minionfs_mountpoint": "",
         "minionfs_whitelist": [],
@@ -1504,6 +1584,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "ext_job_cache": "",
         "master_job_cache": "local_cache",
         "job_cache_store_endtime": False,
+        "master_return_batch_interval": 0,
+        "master_return_batch_size": 1000,
+        "master_return_batch_minion_events": True,
         "minion_data_cache": True,
         "enforce_mine_cache": False,
         "ipc_mode": _DFLT_IPC_MODE,
@@ -1594,6 +1677,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "jinja_sls_env": {},
         "jinja_lstrip_blocks": False,
         "jinja_trim_blocks": False,
+        "jinja_template_cache_size": 0,
+        "jinja_bytecode_cache": False,
         "tcp_keepalive": True,
         "tcp_keepalive_idle": 300,
         "tcp_keepalive_cnt": -1,
@@ -3764,6 +3849,9 @@ def apply_minion_config(
     """
     Returns minion configurations dict.
     """
+    # Late import, salt.crypt pulls in the transport and crypto libraries
+    import salt.crypt
+
     if defaults is None:
         defaults = DEFAULT_MINION_OPTS.copy()
     if overrides is None:
@@ -3999,6 +4087,9 @@ def apply_master_config(overrides=None, defaults=None):
     """
     Returns master configurations dict.
     """
+    # Late import, salt.crypt pulls in the transport and crypto libraries
+    import salt.crypt
+
     if defaults is None:
         defaults = DEFAULT_MASTER_OPTS.copy()
     if overrides is None:
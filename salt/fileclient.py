@@ -27,11 +27,9 @@ import salt.utils.data
 import salt.utils.files
 import salt.utils.gzip_util
 import salt.utils.hashutils
-import salt.utils.http
 import salt.utils.path
 import salt.utils.platform
 import salt.utils.stringutils
-import salt.utils.templates
 import salt.utils.url
 import salt.utils.verify
 import salt.utils.versions
@@ -478,6 +476,9 @@ class Client:
         """
         Get a single file from a URL.
         """
+        # Late import, salt.utils.http pulls in requests
+        import salt.utils.http
+
         url_data = urllib.parse.urlparse(url, allow_fragments=False)
         url_scheme = url_data.scheme
         url_path = os.path.join(url_data.netloc, url_data.path).rstrip(os.sep)
@@ -841,6 +842,9 @@ class Client:
         """
         Cache a file then process it as a template
         """
+        # Late import, salt.utils.templates pulls in jinja2
+        import salt.utils.templates
+
         if "env" in kwargs:
             # "env" is not supported; Use "saltenv".
             kwargs.pop("env")
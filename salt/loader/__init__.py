@@ -5,10 +5,13 @@ plugin interfaces used by Salt.
 """
 
 import contextlib
+import copy
 import inspect
 import logging
 import os
+import queue
 import re
+import threading
 import time
 import types
 
@@ -26,6 +29,7 @@ import salt.utils.odict
 import salt.utils.platform
 import salt.utils.stringutils
 import salt.utils.versions
+import salt.version
 from salt.exceptions import LoaderError
 from salt.template import check_render_pipe_str
 from salt.utils import entrypoints
@@ -1069,6 +1073,175 @@ def _load_cached_grains(opts, cfn):
         return None
 
 
+class _GrainsFunctionCache:
+    """
+    The results of the grains functions which have a TTL in
+    ``grains_function_ttl``, kept in the cachedir so that a grains refresh
+    only runs the functions whose results are stale
+    """
+
+    def __init__(self, opts):
+        self.ttls = opts.get("grains_function_ttl") or {}
+        self.path = os.path.join(opts["cachedir"], "grains.functions.cache.p")
+        self._entries = {}
+        self._dirty = False
+        if opts.get("refresh_grains_cache", False) or not os.path.isfile(self.path):
+            return
+        try:
+            with salt.utils.files.fopen(self.path, "rb") as fp_:
+                data = salt.utils.data.decode(
+                    salt.payload.load(fp_), preserve_tuples=True
+                )
+            if (
+                isinstance(data, dict)
+                and data.get("version") == salt.version.__version__
+            ):
+                self._entries = data.get("entries") or {}
+        except Exception as exc:  # pylint: disable=broad-except
+            log.warning(
+                "Unable to read the grains functions cache %s: %s", self.path, exc
+            )
+
+    def ttl(self, key):
+        """
+        Return the TTL of the grains function ``key``, 0 if it has none
+        """
+        for pattern, ttl in self.ttls.items():
+            if salt.utils.stringutils.expr_match(key, pattern):
+                return ttl
+        return 0
+
+    def get(self, key):
+        """
+        Return a copy of the cached result of the grains function ``key``, or
+        ``None`` if it has no TTL or the result is stale
+        """
+        ttl = self.ttl(key)
+        entry = self._entries.get(key)
+        if not ttl or not entry or time.time() - entry["time"] >= ttl:
+            return None
+        log.trace("Using cached result of the %s grains function", key)
+        return copy.deepcopy(entry["ret"])
+
+    def set(self, key, ret):
+        """
+        Store the result of the grains function ``key`` if it has a TTL
+        """
+        if not isinstance(ret, dict) or not self.ttl(key):
+            return
+        self._entries[key] = {"time": time.time(), "ret": copy.deepcopy(ret)}
+        self._dirty = True
+
+    def save(self):
+        """
+        Write the cache to disk if it was modified
+        """
+        if not self._dirty:
+            return
+        try:
+            with salt.utils.files.set_umask(0o077):
+                with salt.utils.files.fopen(self.path, "w+b") as fp_:
+                    salt.payload.dump(
+                        {"version": salt.version.__version__, "entries": self._entries},
+                        fp_,
+                    )
+            self._dirty = False
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error(
+                "Unable to write the grains functions cache %s: %s", self.path, exc
+            )
+
+
+class _GrainJob:
+    """
+    A grains function run by a thread of ``_start_grain_jobs``
+    """
+
+    def __init__(self, key, func, kwargs):
+        self.key = key
+        self.func = func
+        self.kwargs = kwargs
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.start_time = None
+        self.ret = None
+        self.exc = None
+
+    def run(self):
+        self.start_time = time.monotonic()
+        self.started.set()
+        try:
+            self.ret = self.func(**self.kwargs)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.exc = exc
+        finally:
+            self.done.set()
+
+    def result(self, timeout):
+        """
+        Return the value returned by the function, or ``None`` if it did not
+        complete within ``timeout`` seconds of being started. Exceptions
+        raised by the function are raised again.
+        """
+        if self.started.wait(timeout):
+            remaining = timeout - (time.monotonic() - self.start_time)
+            if self.done.wait(max(remaining, 0)):
+                if self.exc is not None:
+                    raise self.exc
+                return self.ret
+        log.warning(
+            "Grains function %s did not complete within %s seconds, its "
+            "grains are not included",
+            self.key,
+            timeout,
+        )
+        return None
+
+
+def _start_grain_jobs(jobs, workers):
+    """
+    Run the ``_GrainJob`` instances on up to ``workers`` daemon threads, which
+    exit once there are no more jobs to run
+    """
+    job_queue = queue.Queue()
+    for job in jobs:
+        job_queue.put(job)
+
+    def _worker():
+        while True:
+            try:
+                job = job_queue.get_nowait()
+            except queue.Empty:
+                return
+            job.run()
+
+    for idx in range(min(workers, len(jobs))):
+        thread = threading.Thread(target=_worker, name=f"GrainsWorker-{idx}")
+        thread.daemon = True
+        thread.start()
+
+
+def _merge_grains(grains_data, ret, blist, deep_merge):
+    """
+    Merge the grains returned by a grains function into ``grains_data``,
+    leaving out the blacklisted ones
+    """
+    if not isinstance(ret, dict):
+        return
+    if blist:
+        for key in list(ret):
+            for block in blist:
+                if salt.utils.stringutils.expr_match(key, block):
+                    del ret[key]
+                    log.trace("Filtering %s grain", key)
+        if not ret:
+            return
+    if deep_merge:
+        salt.utils.dictupdate.update(grains_data, ret)
+    else:
+        grains_data.update(ret)
+
+
 def grains(opts, force_refresh=False, proxy=None, context=None, loaded_base_name=None):
     """
     Return the functions for the dynamic grains and the values for the static
@@ -1144,31 +1317,64 @@ def grains(opts, force_refresh=False, proxy=None, context=None, loaded_base_name
     )
     if force_refresh:  # if we refresh, lets reload grain modules
         funcs.clear()
+    core_keys = [key for key in funcs if key.startswith("core.")]
+    other_keys = [
+        key for key in funcs if not key.startswith("core.") and key != "_errors"
+    ]
+
+    # Results of the grains functions with a TTL in grains_function_ttl
+    # which are still fresh, these functions are not run again
+    cached = {}
+    func_cache = None
+    if opts.get("grains_function_ttl"):
+        func_cache = _GrainsFunctionCache(opts)
+        for key in core_keys + other_keys:
+            ret = func_cache.get(key)
+            if ret is not None:
+                cached[key] = ret
+
+    # With grains_parallel_workers, the grains functions which do not depend
+    # on the grains computed before them are started on threads right away.
+    # Their results are still merged in the usual order below.
+    jobs = {}
+    workers = opts.get("grains_parallel_workers", 0)
+    timeout = opts.get("grains_parallel_timeout", 60.0)
+    if workers and workers > 0:
+        for key in core_keys:
+            if key not in cached:
+                jobs[key] = _GrainJob(key, funcs[key], {})
+        for key in other_keys:
+            if key in cached:
+                continue
+            try:
+                parameters = inspect.signature(funcs[key]).parameters
+            except Exception:  # pylint: disable=broad-except
+                # Run it in order below, where the error is reported
+                continue
+            if "grains" in parameters:
+                continue
+            kwargs = {}
+            if "proxy" in parameters:
+                kwargs["proxy"] = proxy
+            jobs[key] = _GrainJob(key, funcs[key], kwargs)
+        _start_grain_jobs(list(jobs.values()), workers)
+
     # Run core grains
-    for key in funcs:
-        if not key.startswith("core."):
-            continue
+    for key in core_keys:
         log.trace("Loading %s grain", key)
-        ret = funcs[key]()
-        if not isinstance(ret, dict):
-            continue
-        if blist:
-            for key in list(ret):
-                for block in blist:
-                    if salt.utils.stringutils.expr_match(key, block):
-                        del ret[key]
-                        log.trace("Filtering %s grain", key)
-            if not ret:
-                continue
-        if grains_deep_merge:
-            salt.utils.dictupdate.update(grains_data, ret)
+        if key in cached:
+            ret = cached[key]
         else:
-            grains_data.update(ret)
+            if key in jobs:
+                ret = jobs[key].result(timeout)
+            else:
+                ret = funcs[key]()
+            if func_cache is not None:
+                func_cache.set(key, ret)
+        _merge_grains(grains_data, ret, blist, grains_deep_merge)
 
     # Run the rest of the grains
-    for key in funcs:
-        if key.startswith("core.") or key == "_errors":
-            continue
+    for key in other_keys:
         try:
             # Grains are loaded too early to take advantage of the injected
             # __proxy__ variable.  Pass an instance of that LazyLoader
@@ -1177,13 +1383,18 @@ def grains(opts, force_refresh=False, proxy=None, context=None, loaded_base_name
             # proxymodule for retrieving information from the connected
             # device.
             log.trace("Loading %s grain", key)
-            parameters = inspect.signature(funcs[key]).parameters
-            kwargs = {}
-            if "proxy" in parameters:
-                kwargs["proxy"] = proxy
-            if "grains" in parameters:
-                kwargs["grains"] = grains_data
-            ret = funcs[key](**kwargs)
+            if key in cached:
+                ret = cached[key]
+            elif key in jobs:
+                ret = jobs[key].result(timeout)
+            else:
+                parameters = inspect.signature(funcs[key]).parameters
+                kwargs = {}
+                if "proxy" in parameters:
+                    kwargs["proxy"] = proxy
+                if "grains" in parameters:
+                    kwargs["grains"] = grains_data
+                ret = funcs[key](**kwargs)
         except Exception:  # pylint: disable=broad-except
             if salt.utils.platform.is_proxy():
                 log.info(
@@ -1197,20 +1408,12 @@ def grains(opts, force_refresh=False, proxy=None, context=None, loaded_base_name
                 exc_info=True,
             )
             continue
-        if not isinstance(ret, dict):
-            continue
-        if blist:
-            for key in list(ret):
-                for block in blist:
-                    if salt.utils.stringutils.expr_match(key, block):
-                        del ret[key]
-                        log.trace("Filtering %s grain", key)
-            if not ret:
-                continue
-        if grains_deep_merge:
-            salt.utils.dictupdate.update(grains_data, ret)
-        else:
-            grains_data.update(ret)
+        if func_cache is not None and key not in cached:
+            func_cache.set(key, ret)
+        _merge_grains(grains_data, ret, blist, grains_deep_merge)
+
+    if func_cache is not None:
+        func_cache.save()
 
     if opts.get("proxy_merge_grains_in_module", True) and proxy:
         try:
@@ -21,6 +21,8 @@ import salt.config
 import salt.defaults.events
 import salt.defaults.exitcodes
 import salt.loader.context
+import salt.loader.profiler
+import salt.loader.virtualcache
 import salt.syspaths
 import salt.utils.args
 import salt.utils.context
@@ -72,6 +74,10 @@ PY3_PRE_EXT = re.compile(r"\.cpython-{}{}(\.opt-[1-9])?".format(*sys.version_inf
 # Will be set to pyximport module at runtime if cython is enabled in config.
 pyximport = None
 
+# Listings of the module directories, shared by all the loaders of the process
+_MODULE_DIR_INDEX = {}
+_MODULE_DIR_INDEX_LOCK = threading.Lock()
+
 
 def _generate_module(name):
     if name in sys.modules:
@@ -84,6 +90,58 @@ def _generate_module(name):
     sys.modules[name] = module
 
 
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan_module_dir(mod_dir):
+    """
+    Return the sorted file names found in ``mod_dir`` followed by the ones
+    found in its ``__pycache__`` directory, along with a mapping of the names
+    without an extension to their directory listing.
+
+    The listing is kept in a process wide index and only rebuilt when the
+    mtime of one of the directories changes, so that the many loaders of a
+    process do not list the same directories over and over again. Raises
+    ``OSError`` if ``mod_dir`` cannot be listed.
+    """
+    with _MODULE_DIR_INDEX_LOCK:
+        entry = _MODULE_DIR_INDEX.get(mod_dir)
+        if entry is not None and all(_mtime(p) == m for p, m in entry[0]):
+            return entry[1], entry[2]
+
+    pycache = os.path.join(mod_dir, "__pycache__")
+    # Take the mtimes before listing so that a change made while listing
+    # causes a rescan on the next call
+    stamps = [(mod_dir, _mtime(mod_dir)), (pycache, _mtime(pycache))]
+    # Make sure we have a sorted listdir in order to have
+    # expectable override results
+    files = sorted(x for x in os.listdir(mod_dir) if x != "__pycache__")
+    subdirs = {}
+    for filename in files:
+        if os.path.splitext(filename)[1]:
+            continue
+        path = os.path.join(mod_dir, filename)
+        stamps.append((path, _mtime(path)))
+        try:
+            subdirs[filename] = frozenset(os.listdir(path))
+        except OSError:
+            subdirs[filename] = None
+    try:
+        files.extend(
+            os.path.join("__pycache__", x) for x in sorted(os.listdir(pycache))
+        )
+    except OSError:
+        pass
+    files = tuple(files)
+    with _MODULE_DIR_INDEX_LOCK:
+        _MODULE_DIR_INDEX[mod_dir] = (stamps, files, subdirs)
+    return files, subdirs
+
+
 def _mod_type(module_path):
     if module_path.startswith(str(SALT_BASE_PATH)):
         return "int"
@@ -294,7 +352,12 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 self.pack[i] = self.pack[i].value()
         if opts is None:
             opts = {}
-        opts = copy.deepcopy(opts)
+        if opts.get("loader_copy_on_write"):
+            # Share the pillar and grains, which are large and mostly read,
+            # with the opts the loader was created from instead of copying them
+            opts = self.__copy_on_write_opts(opts)
+        else:
+            opts = copy.deepcopy(opts)
         for i in ["pillar", "grains"]:
             if i in opts and isinstance(
                 opts[i], salt.loader.context.NamedLoaderContext
@@ -322,6 +385,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
         self.whitelist = whitelist
         self.virtual_enable = virtual_enable
+        self.profile = bool(self.opts.get("loader_profile"))
         self.initial_load = True
 
         # names of modules that we don't have (errors, __virtual__, etc.)
@@ -353,6 +417,21 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             self.suffix_map[suffix] = (suffix, mode, kind)
             self.suffix_order.append(suffix)
 
+        self._virtual_cache = None
+        if (
+            self.virtual_enable
+            and self.opts.get("loader_virtual_cache_ttl")
+            and self.opts.get("cachedir")
+        ):
+            self._virtual_cache = salt.loader.virtualcache.VirtualCache(
+                self.opts["cachedir"],
+                self.tag,
+                self.opts["loader_virtual_cache_ttl"],
+                grains=self.pack["__grains__"],
+                proxytype=(self.opts.get("proxy") or {}).get("proxytype"),
+                opts=self.opts,
+            )
+
         self._lock = self._get_lock()
 
         with self._lock:
@@ -403,11 +482,12 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         # otherwise we assume its jinja template access
         if mod_name not in self.loaded_modules and not self.loaded:
             for name in self._iter_files(mod_name):
-                if name in self.loaded_files:
+                if name in self.loaded_files or self._provides_other(name, mod_name):
                     continue
                 # if we got what we wanted, we are done
                 if self._load_module(name) and mod_name in self.loaded_modules:
                     break
+            self._save_virtual_cache()
         if mod_name in self.loaded_modules:
             return LoadedMod(mod_name, self)
         else:
@@ -491,20 +571,9 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
         for mod_dir in self.module_dirs:
             try:
-                # Make sure we have a sorted listdir in order to have
-                # expectable override results
-                files = sorted(x for x in os.listdir(mod_dir) if x != "__pycache__")
+                files, subdirs = _scan_module_dir(mod_dir)
             except OSError:
                 continue  # Next mod_dir
-            try:
-                pycache_files = [
-                    os.path.join("__pycache__", x)
-                    for x in sorted(os.listdir(os.path.join(mod_dir, "__pycache__")))
-                ]
-            except OSError:
-                pass
-            else:
-                files.extend(pycache_files)
 
             for filename in files:
                 try:
@@ -547,7 +616,9 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # if its a directory, lets allow us to load that
                     if ext == "":
                         # is there something __init__?
-                        subfiles = os.listdir(fpath)
+                        subfiles = subdirs.get(filename)
+                        if subfiles is None:
+                            continue  # Next filename, not a directory
                         for suffix in self.suffix_order:
                             if "" == suffix:
                                 continue  # Next suffix (__init__ must have a suffix)
@@ -613,6 +684,26 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 self._refresh_file_mapping()
             self.initial_load = False
 
+    @staticmethod
+    def __copy_on_write_opts(opts):
+        """
+        Deep copy the opts except for the pillar and grains, which are wrapped
+        in copy on write dicts
+        """
+        shared = ("pillar", "grains")
+        ret = copy.deepcopy({key: val for key, val in opts.items() if key not in shared})
+        for key in shared:
+            if key not in opts:
+                continue
+            value = opts[key]
+            if isinstance(value, salt.loader.context.NamedLoaderContext):
+                value = value.value()
+            if isinstance(value, dict):
+                ret[key] = salt.utils.context.CopyOnWriteDict(value)
+            else:
+                ret[key] = copy.deepcopy(value)
+        return ret
+
     def __prep_mod_opts(self, opts):
         """
         Strip out of the opts any logger instance
@@ -658,6 +749,21 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             if mod_name not in k:
                 yield k
 
+    def _provides_other(self, name, mod_name):
+        """
+        Return ``True`` if the virtual cache knows that the module file
+        ``name`` loads, but not under ``mod_name``, so that importing it can
+        be deferred until one of its own names is used
+        """
+        if self._virtual_cache is None:
+            return False
+        cached = self._virtual_cache.get(self.file_mapping[name][0])
+        return cached is not None and cached[0] and mod_name not in cached[1]
+
+    def _save_virtual_cache(self):
+        if self._virtual_cache is not None:
+            self._virtual_cache.save()
+
     def _reload_submodules(self, mod):
         submodules = (
             getattr(mod, sname)
@@ -728,7 +834,24 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             pass
 
         self.loaded_files.add(name)
+
+        if self._virtual_cache is not None:
+            cached = self._virtual_cache.get(fpath)
+            if cached is not None and not cached[0]:
+                log.trace(
+                    "Skipping %s.%s, its __virtual__ result is cached: %s",
+                    self.tag,
+                    name,
+                    cached[2],
+                )
+                for mod_name in cached[1]:
+                    self.missing_modules[mod_name] = cached[2]
+                return False
+
         fpath_dirname = os.path.dirname(fpath)
+        if self.profile:
+            start = time.perf_counter()
+            memory = salt.loader.profiler.memory_usage()
         try:
             self.__populate_sys_path()
             sys.path.append(fpath_dirname)
@@ -858,6 +981,13 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         finally:
             sys.path.remove(fpath_dirname)
             self.__clean_sys_path()
+            if self.profile:
+                if memory is not None:
+                    after = salt.loader.profiler.memory_usage()
+                    memory = None if after is None else after - memory
+                salt.loader.profiler.PROFILER.record_import(
+                    self.tag, name, time.perf_counter() - start, memory
+                )
 
         loader_context = salt.loader.context.LoaderContext()
         if hasattr(mod, "__salt_loader__"):
@@ -956,6 +1086,10 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # If a module has information about why it could not be loaded, record it
                     self.missing_modules[module_name] = virtual_err
                     self.missing_modules[name] = virtual_err
+                    if self._virtual_cache is not None:
+                        self._virtual_cache.set(
+                            fpath, False, {module_name, name}, virtual_err
+                        )
                     return False
         else:
             virtual_aliases = ()
@@ -974,6 +1108,10 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     err_string = "not a proxy_minion enabled module"
                     self.missing_modules[module_name] = err_string
                     self.missing_modules[name] = err_string
+                    if self._virtual_cache is not None:
+                        self._virtual_cache.set(
+                            fpath, False, {module_name, name}, err_string
+                        )
                     return False
 
         try:
@@ -1045,6 +1183,9 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     self._apply_outputter(func, mod)
                 self.loaded_modules.add(tgt_mod)
 
+        if self._virtual_cache is not None:
+            self._virtual_cache.set(fpath, True, mod_names)
+
         # enforce depends
         try:
             Depends.enforce_dependencies(self._dict, self.tag, name)
@@ -1084,7 +1225,9 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
             def _inner_load(mod_name):
                 for name in self._iter_files(mod_name):
-                    if name in self.loaded_files:
+                    if name in self.loaded_files or self._provides_other(
+                        name, mod_name
+                    ):
                         continue
                     # if we got what we wanted, we are done
                     if self._load_module(name) and key in self._dict:
@@ -1109,6 +1252,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                         self._refresh_file_mapping()
                         reloaded = True
                     continue
+            self._save_virtual_cache()
 
         return ret
 
@@ -1121,12 +1265,15 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 if name in self.loaded_files or name in self.missing_modules:
                     continue
                 self._load_module(name)
+            self._save_virtual_cache()
 
             self.loaded = True
 
     def reload_modules(self):
         with self._lock:
             self.loaded_files = set()
+            if self._virtual_cache is not None:
+                self._virtual_cache.clear()
             self._load_all()
 
     def _apply_outputter(self, func, mod):
@@ -1190,6 +1337,10 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     )
                     log.error(error_reason, exc_info_on_loglevel=logging.DEBUG)
                     virtual = None
+                if self.profile:
+                    salt.loader.profiler.PROFILER.record_virtual(
+                        self.tag, module_name, time.time() - start
+                    )
                 # Get the module's virtual name
                 virtualname = getattr(mod, "__virtualname__", virtual)
                 if not virtual:
@@ -0,0 +1,164 @@
+"""
+Import time profiling of loader modules.
+
+When ``loader_profile`` is enabled, or ``salt-call`` is run with
+``--profile-loader``, every loader of the process records for each module it
+loads the time spent importing it, the time spent in its ``__virtual__``
+functions and the growth of the process memory while importing it. The
+report lists the modules sorted by the total time they cost, and is written
+as JSON to the ``loader_profile`` directory of the cachedir.
+"""
+
+import logging
+import os
+import threading
+
+import salt.utils.atomicfile
+import salt.utils.json
+
+try:
+    import psutil
+
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+log = logging.getLogger(__name__)
+
+
+def memory_usage():
+    """
+    Return the resident memory of the process in bytes, or ``None`` if it
+    cannot be determined
+    """
+    if not HAS_PSUTIL:
+        return None
+    try:
+        return psutil.Process().memory_info().rss
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+class LoaderProfiler:
+    """
+    The import and ``__virtual__`` timings of the modules loaded by all the
+    loaders of the process
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Maps (tag, module name) to the module statistics
+        self._modules = {}
+
+    def _entry(self, tag, name):
+        return self._modules.setdefault(
+            (tag, name),
+            {"import": 0.0, "virtual": 0.0, "memory": None, "loads": 0},
+        )
+
+    def record_import(self, tag, name, seconds, memory=None):
+        """
+        Record that importing the module ``name`` of the loader ``tag`` took
+        ``seconds`` and grew the process memory by ``memory`` bytes
+        """
+        with self._lock:
+            entry = self._entry(tag, name)
+            entry["import"] += seconds
+            entry["loads"] += 1
+            if memory is not None:
+                entry["memory"] = (entry["memory"] or 0) + memory
+
+    def record_virtual(self, tag, name, seconds):
+        """
+        Record that a ``__virtual__`` function of the module ``name`` of the
+        loader ``tag`` took ``seconds``
+        """
+        with self._lock:
+            self._entry(tag, name)["virtual"] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._modules = {}
+
+    def report(self):
+        """
+        Return the recorded modules sorted by their total time, most expensive
+        first, with durations in milliseconds and memory in kilobytes
+        """
+        with self._lock:
+            items = list(self._modules.items())
+        modules = []
+        for (tag, name), entry in items:
+            modules.append(
+                {
+                    "tag": tag,
+                    "module": name,
+                    "total": round((entry["import"] + entry["virtual"]) * 1000, 3),
+                    "import": round(entry["import"] * 1000, 3),
+                    "virtual": round(entry["virtual"] * 1000, 3),
+                    "memory": (
+                        None if entry["memory"] is None else entry["memory"] // 1024
+                    ),
+                    "loads": entry["loads"],
+                }
+            )
+        modules.sort(key=lambda item: item["total"], reverse=True)
+        return {
+            "duration": round(sum(item["total"] for item in modules), 3),
+            "modules": modules,
+        }
+
+    def format_report(self, limit=None, report=None):
+        """
+        Return the report as a text table of the ``limit`` most expensive
+        modules
+        """
+        if report is None:
+            report = self.report()
+        lines = [
+            "{:>10} {:>10} {:>10} {:>10}  {}".format(
+                "total ms", "import ms", "virtual ms", "memory kB", "module"
+            )
+        ]
+        for item in report["modules"][:limit]:
+            lines.append(
+                "{:>10.1f} {:>10.1f} {:>10.1f} {:>10}  {}.{}".format(
+                    item["total"],
+                    item["import"],
+                    item["virtual"],
+                    "-" if item["memory"] is None else item["memory"],
+                    item["tag"],
+                    item["module"],
+                )
+            )
+        lines.append(
+            "{:>10.1f} ms spent loading {} modules".format(
+                report["duration"], len(report["modules"])
+            )
+        )
+        return "\n".join(lines)
+
+    def write(self, cachedir, name=None):
+        """
+        Write the report to ``<cachedir>/loader_profile/<name>.json``, where
+        ``name`` defaults to the process id, and return the report
+        """
+        report = self.report()
+        if name is None:
+            name = os.getpid()
+        profile_dir = os.path.join(cachedir, "loader_profile")
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, f"{name}.json")
+            with salt.utils.atomicfile.atomic_open(path, "w") as fp_:
+                salt.utils.json.dump(report, fp_, indent=2)
+            log.info(
+                "Loader profile (%s ms) written to %s", report["duration"], path
+            )
+        except OSError as exc:
+            log.error("Unable to write the loader profile: %s", exc)
+        return report
+
+
+# The profiler shared by all the loaders of the process
+PROFILER = LoaderProfiler()
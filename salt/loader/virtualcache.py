@@ -0,0 +1,194 @@
+"""
+Persistent cache of the ``__virtual__`` results of loader modules.
+
+When ``loader_virtual_cache_ttl`` is set, each loader records the outcome of
+the ``__virtual__`` functions of the modules it imported in the ``loader``
+directory of the cachedir: the names a module was loaded under, or the reason
+it did not load. Entries are tied to the size and mtime of the module file,
+and the whole cache is discarded when the salt version, the Python version,
+the opts, the grains or the directories of the ``PATH`` change, and when the
+modules are refreshed. A later loader then skips importing modules which are
+known not to load, and only imports the module which provides a name when that
+name is first used, instead of every module found before it.
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import sys
+import time
+
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.version
+
+log = logging.getLogger(__name__)
+
+# Bump this when the layout of the cache file changes
+CACHE_VERSION = 2
+
+# The opts which change with each call of salt-call and have no bearing on the
+# __virtual__ functions, or which are part of the key on their own
+_VOLATILE_OPTS = frozenset(("arg", "fun", "grains", "jid", "kwarg"))
+
+
+def _digest(items):
+    """
+    Return a digest of the serializable values of ``items``, skipping the ones
+    which cannot be serialized
+    """
+    digest = hashlib.sha256()
+    for key, value in sorted(items, key=lambda item: str(item[0])):
+        try:
+            digest.update(salt.payload.dumps([key, value]))
+        except Exception:  # pylint: disable=broad-except
+            continue
+    return digest.hexdigest()
+
+
+def _path_key():
+    """
+    Return the directories of the ``PATH`` with their mtime, which changes when
+    a binary is installed in or removed from them
+    """
+    ret = []
+    for path in os.environ.get("PATH", "").split(os.pathsep):
+        try:
+            ret.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            ret.append([path, None])
+    return ret
+
+
+def invalidate(cachedir):
+    """
+    Remove the cached ``__virtual__`` results of all the loaders, so that the
+    next loaders import all the modules again
+    """
+    for path in glob.glob(os.path.join(cachedir, "loader", "virtual.*.p")):
+        try:
+            os.remove(path)
+        except OSError as exc:
+            log.error("Unable to remove the loader virtual cache %s: %s", path, exc)
+
+
+class VirtualCache:
+    """
+    The ``__virtual__`` results of the modules of one loader tag, keyed on the
+    path of the module file
+    """
+
+    def __init__(self, cachedir, tag, ttl, grains=None, proxytype=None, opts=None):
+        self.path = os.path.join(cachedir, "loader", f"virtual.{tag}.p")
+        self.ttl = ttl
+        self.key = [
+            salt.version.__version__,
+            list(sys.version_info[:3]),
+            _digest((grains or {}).items()),
+            _digest(
+                (key, value)
+                for key, value in (opts or {}).items()
+                if key not in _VOLATILE_OPTS
+            ),
+            _path_key(),
+            proxytype,
+        ]
+        self._entries = None
+        self._dirty = False
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            if os.path.isfile(self.path):
+                try:
+                    with salt.utils.files.fopen(self.path, "rb") as fp_:
+                        data = salt.payload.load(fp_)
+                    if (
+                        isinstance(data, dict)
+                        and data.get("version") == CACHE_VERSION
+                        and data.get("key") == self.key
+                    ):
+                        self._entries = data.get("entries") or {}
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.warning(
+                        "Unable to read the loader virtual cache %s: %s",
+                        self.path,
+                        exc,
+                    )
+        return self._entries
+
+    @staticmethod
+    def _stat(fpath):
+        try:
+            stat = os.stat(fpath)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def get(self, fpath):
+        """
+        Return the ``(loaded, names, reason)`` recorded for the module file
+        ``fpath``, or ``None`` if there is no valid entry
+        """
+        entry = self._load().get(fpath)
+        if not entry:
+            return None
+        if time.time() - entry["time"] > self.ttl or entry["stat"] != self._stat(
+            fpath
+        ):
+            return None
+        return entry["loaded"], entry["names"], entry["reason"]
+
+    def set(self, fpath, loaded, names, reason=None):
+        """
+        Record that the module file ``fpath`` was loaded under ``names``, or
+        that it was not loaded for ``reason``
+        """
+        stat = self._stat(fpath)
+        if stat is None:
+            return
+        self._load()[fpath] = {
+            "stat": stat,
+            "time": time.time(),
+            "loaded": loaded,
+            "names": list(names),
+            "reason": None if reason is None else str(reason),
+        }
+        self._dirty = True
+
+    def clear(self):
+        """
+        Discard the recorded results, in memory and on disk
+        """
+        self._entries = {}
+        self._dirty = False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            log.error("Unable to remove the loader virtual cache %s: %s", self.path, exc)
+
+    def save(self):
+        """
+        Write the cache to disk if it was modified
+        """
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with salt.utils.files.set_umask(0o077):
+                with salt.utils.atomicfile.atomic_open(self.path, "wb") as fp_:
+                    salt.payload.dump(
+                        {
+                            "version": CACHE_VERSION,
+                            "key": self.key,
+                            "entries": self._entries,
+                        },
+                        fp_,
+                    )
+            self._dirty = False
+        except OSError as exc:
+            log.error("Unable to write the loader virtual cache %s: %s", self.path, exc)
@@ -5,6 +5,8 @@ involves preparing the three listeners and the workers needed by the master.
 
 import asyncio
 import collections
+import concurrent.futures
+import contextvars
 import copy
 import ctypes
 import logging
@@ -43,6 +45,7 @@ import salt.utils.event
 import salt.utils.files
 import salt.utils.gitfs
 import salt.utils.gzip_util
+import salt.utils.histogram
 import salt.utils.jid
 import salt.utils.job
 import salt.utils.master
@@ -863,6 +866,12 @@ class Master(SMaster):
                 name="Maintenance",
             )
 
+            if self.opts["master_stats"] and self.opts["master_stats_port"]:
+                log.info("Creating master stats server process")
+                self.process_manager.add_process(
+                    MasterStatsServer, args=(self.opts,), name="MasterStatsServer"
+                )
+
             if self.opts.get("event_return"):
                 log.info("Creating master event return process")
                 self.process_manager.add_process(
@@ -1011,6 +1020,41 @@ class EventMonitor(salt.utils.process.SignalHandlingProcess):
             io_loop.start()
 
 
+class MasterStatsServer(salt.utils.process.SignalHandlingProcess):
+    """
+    Serve the statistics of the master workers in the Prometheus text format
+    on the local interface
+    """
+
+    def __init__(self, opts, **kwargs):
+        super().__init__(**kwargs)
+        self.opts = opts
+
+    def run(self):
+        # Only the stats server needs a web server
+        import tornado.web
+
+        opts = self.opts
+
+        class MetricsHandler(tornado.web.RequestHandler):
+            def get(self):
+                self.set_header("Content-Type", "text/plain; version=0.0.4")
+                self.write(
+                    salt.utils.master.worker_stats_prometheus(
+                        salt.utils.master.get_worker_stats(opts)
+                    )
+                )
+
+        io_loop = tornado.ioloop.IOLoop()
+        app = tornado.web.Application([(r"/metrics", MetricsHandler)])
+        app.listen(self.opts["master_stats_port"], address="127.0.0.1")
+        log.info(
+            "Serving the master stats on http://127.0.0.1:%s/metrics",
+            self.opts["master_stats_port"],
+        )
+        io_loop.start()
+
+
 class ReqServer(salt.utils.process.SignalHandlingProcess):
     """
     Starts up the master request server, minions send results to this
@@ -1060,6 +1104,7 @@ class ReqServer(salt.utils.process.SignalHandlingProcess):
         self.process_manager = salt.utils.process.ProcessManager(
             name="ReqServer_ProcessManager", wait_for_kill=1
         )
+        salt.utils.master.clean_worker_stats(self.opts)
 
         req_channels = []
         for transport, opts in iter_transport_opts(self.opts):
@@ -1132,6 +1177,13 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         self.k_mtime = 0
         self.stats = collections.defaultdict(lambda: {"mean": 0, "runs": 0})
         self.stat_clock = time.time()
+        # The time spent handling the requests and waiting before being
+        # handled, per command since the worker started
+        self.latency = collections.defaultdict(salt.utils.histogram.Histogram)
+        self.queue_wait = collections.defaultdict(salt.utils.histogram.Histogram)
+        self.started = time.time()
+        self.busy = 0.0
+        self.stat_busy = 0.0
 
     # We need __setstate__ and __getstate__ to also pickle 'SMaster.secrets'.
     # Otherwise, 'SMaster.secrets' won't be copied over to the spawned process
@@ -1163,6 +1215,14 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
             except Exception:  # pylint: disable=broad-except
                 # Don't stop signal handling because an exception occurred.
                 pass
+        aes_funcs = getattr(self, "aes_funcs", None)
+        if aes_funcs is not None:
+            try:
+                # Store the returns still waiting in a batch
+                aes_funcs.flush_returns()
+            except Exception:  # pylint: disable=broad-except
+                # Don't stop signal handling because an exception occurred.
+                pass
         super()._handle_signals(signum, sigframe)
 
     def __bind(self):
@@ -1174,12 +1234,23 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
             req_channel.post_fork(
                 self._handle_payload, io_loop=self.io_loop
             )  # TODO: cleaner? Maybe lazily?
+        if self.opts["master_return_batch_interval"]:
+            self.io_loop.add_callback(self._flush_returns)
         try:
             self.io_loop.start()
         except (KeyboardInterrupt, SystemExit):
             # Tornado knows what to do
             pass
 
+    def _flush_returns(self):
+        """
+        Store the batched returns every master_return_batch_interval
+        """
+        self.aes_funcs.flush_returns()
+        self.io_loop.call_later(
+            self.opts["master_return_batch_interval"], self._flush_returns
+        )
+
     async def _handle_payload(self, payload):
         """
         The _handle_payload method is the key method used to figure out what
@@ -1203,13 +1274,14 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         """
         key = payload["enc"]
         load = payload["load"]
+        received = payload.get("received")
         if key == "clear":
-            ret = await self._handle_clear(load)
+            ret = await self._handle_clear(load, received=received)
         else:
-            ret = self._handle_aes(load)
+            ret = await self._handle_aes(load, received=received)
         return ret
 
-    def _post_stats(self, start, cmd):
+    def _post_stats(self, start, cmd, received=None):
         """
         Calculate the master stats and fire events with stat info
         """
@@ -1218,6 +1290,11 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         self.stats[cmd]["mean"] = (
             self.stats[cmd]["mean"] * (self.stats[cmd]["runs"] - 1) + duration
         ) / self.stats[cmd]["runs"]
+        self.latency[cmd].record(duration)
+        if received is not None:
+            self.queue_wait[cmd].record(start - received)
+        self.busy += duration
+        self.stat_busy += duration
         if end - self.stat_clock > self.opts["master_stats_event_iter"]:
             # Fire the event with the stats and wipe the tracker
             self.aes_funcs.event.fire_event(
@@ -1225,17 +1302,46 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
                     "time": end - self.stat_clock,
                     "worker": self.name,
                     "stats": self.stats,
+                    "utilization": self.stat_busy / (end - self.stat_clock),
                 },
                 tagify(self.name, "stats"),
             )
+            self._write_stats(end)
             self.stats = collections.defaultdict(lambda: {"mean": 0, "runs": 0})
             self.stat_clock = end
+            self.stat_busy = 0.0
+
+    def _write_stats(self, now):
+        """
+        Write the latency histograms of the worker for the master_stats runner
+        and the master_stats_port endpoint
+        """
+        try:
+            salt.utils.master.write_worker_stats(
+                self.opts,
+                self.name,
+                {
+                    "pid": os.getpid(),
+                    "started": self.started,
+                    "time": now,
+                    "busy": self.busy,
+                    "latency": {
+                        cmd: hist.to_dict() for cmd, hist in self.latency.items()
+                    },
+                    "queue_wait": {
+                        cmd: hist.to_dict() for cmd, hist in self.queue_wait.items()
+                    },
+                },
+            )
+        except OSError as exc:
+            log.error("Failed to write the stats of %s: %s", self.name, exc)
 
-    async def _handle_clear(self, load):
+    async def _handle_clear(self, load, received=None):
         """
         Process a cleartext command
 
         :param dict load: Cleartext payload
+        :param float received: The time the request was received
         :return: The result of passing the load to a function in ClearFuncs corresponding to
                  the command specified in the load's 'cmd' key.
         """
@@ -1253,14 +1359,15 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         else:
             ret = method(load), {"fun": "send_clear"}
         if self.opts["master_stats"]:
-            self._post_stats(start, cmd)
+            self._post_stats(start, cmd, received)
         return ret
 
-    def _handle_aes(self, data):
+    async def _handle_aes(self, data, received=None):
         """
         Process a command sent via an AES key
 
         :param str load: Encrypted payload
+        :param float received: The time the request was received
         :return: The result of passing the load to a function in AESFuncs corresponding to
                  the command specified in the load's 'cmd' key.
         """
@@ -1277,10 +1384,13 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
             self.stats[cmd]["runs"] += 1
 
         with salt.utils.ctx.request_context({"data": data, "opts": self.opts}):
-            ret = self.aes_funcs.run_func(data["cmd"], data)
+            if cmd in self.aes_funcs.async_methods:
+                ret = await self.aes_funcs.run_func_async(cmd, data)
+            else:
+                ret = self.aes_funcs.run_func(cmd, data)
 
         if self.opts["master_stats"]:
-            self._post_stats(start, cmd)
+            self._post_stats(start, cmd, received)
         return ret
 
     def run(self):
@@ -1378,6 +1488,9 @@ class AESFuncs(TransportMethods):
         "_symlink_list",
         "_file_envs",
     )
+    # The methods which may block on ext_pillar or fileserver backends, they
+    # run on the thread pool of the worker when worker_blocking_threads is set
+    async_methods = ("_pillar", "_serve_file")
 
     def __init__(self, opts):
         """
@@ -1405,6 +1518,15 @@ class AESFuncs(TransportMethods):
             self.pki_dir = self.opts["cluster_pki_dir"]
         else:
             self.pki_dir = self.opts.get("pki_dir", "")
+        # The returns waiting to be stored in a batch
+        self._returns = []
+        self.executor = None
+        if self.opts.get("worker_blocking_threads"):
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.opts["worker_blocking_threads"],
+                thread_name_prefix="AESFuncs",
+            )
+        self._loop = None
 
     def __setup_fileserver(self):
         """
@@ -1789,12 +1911,24 @@ class AESFuncs(TransportMethods):
                 {"grains": load["grains"], "pillar": data},
             )
             if self.opts.get("minion_data_cache_events") is True:
-                self.event.fire_event(
+                self._fire_event(
                     {"Minion data cache refresh": load["id"]},
                     tagify(load["id"], "refresh", "minion"),
                 )
         return data
 
+    def _fire_event(self, data, tag):
+        """
+        Fire an event on the master event bus, handing it over to the io loop
+        of the worker when called from its thread pool
+        """
+        if self._loop is not None and threading.current_thread() is not (
+            threading.main_thread()
+        ):
+            self._loop.call_soon_threadsafe(self.event.fire_event, data, tag)
+        else:
+            self.event.fire_event(data, tag)
+
     def _minion_event(self, load):
         """
         Receive an event from the minion and fire it on the master event
@@ -1880,6 +2014,20 @@ class AESFuncs(TransportMethods):
                     )
             load["sig"] = sig
 
+        if load.get("partial"):
+            # A batch of results streamed while the job is still running
+            salt.utils.job.store_partial(
+                self.opts, load, event=self.event, mminion=self.mminion
+            )
+            return
+
+        if self.opts["master_return_batch_interval"]:
+            # Coalesce the returns, they are stored by flush_returns
+            self._returns.append(load)
+            if len(self._returns) >= self.opts["master_return_batch_size"]:
+                self.flush_returns()
+            return
+
         try:
             salt.utils.job.store_job(
                 self.opts, load, event=self.event, mminion=self.mminion
@@ -1887,6 +2035,25 @@ class AESFuncs(TransportMethods):
         except salt.exceptions.SaltCacheError:
             log.error("Could not store job information for load: %s", load)
 
+    def flush_returns(self):
+        """
+        Store the returns batched by _return in the job cache and fire their
+        events
+        """
+        if not self._returns:
+            return
+        returns, self._returns = self._returns, []
+        try:
+            salt.utils.job.store_jobs(
+                self.opts,
+                returns,
+                event=self.event,
+                mminion=self.mminion,
+                minion_events=self.opts["master_return_batch_minion_events"],
+            )
+        except salt.exceptions.SaltCacheError:
+            log.error("Could not store job information for %d returns", len(returns))
+
     def _syndic_return(self, load):
         """
         Receive a syndic minion return and format it to look like returns from
@@ -2116,7 +2283,29 @@ class AESFuncs(TransportMethods):
         # Encrypt the return
         return ret, {"fun": "send"}
 
+    async def run_func_async(self, func, load):
+        """
+        Wrapper for running the functions of async_methods on the thread pool
+        of the worker, so that a slow ext_pillar or fileserver backend does not
+        hold up the other requests handled by the worker
+
+        :param function func: The function to run
+        :return: The result of the master function that was called
+        """
+        if self.executor is None:
+            return self.run_func(func, load)
+        self._loop = asyncio.get_running_loop()
+        # Run in a copy of the request context
+        context = contextvars.copy_context()
+        return await self._loop.run_in_executor(
+            self.executor, context.run, self.run_func, func, load
+        )
+
     def destroy(self):
+        self.flush_returns()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
         self.masterapi.destroy()
         if self.local is not None:
             self.local.destroy()
@@ -34,6 +34,8 @@ import salt.defaults.exitcodes
 import salt.engines
 import salt.loader
 import salt.loader.lazy
+import salt.loader.profiler
+import salt.loader.virtualcache
 import salt.payload
 import salt.pillar
 import salt.serializers.msgpack
@@ -49,8 +51,10 @@ import salt.utils.error
 import salt.utils.event
 import salt.utils.extmods
 import salt.utils.files
+import salt.utils.forkserver
 import salt.utils.jid
 import salt.utils.minion
+import salt.utils.minionsnapshot
 import salt.utils.minions
 import salt.utils.network
 import salt.utils.platform
@@ -453,6 +457,8 @@ class MinionBase:
                 self.opts["saltenv"],
                 pillarenv=self.opts.get("pillarenv"),
             ).compile_pillar()
+        else:
+            salt.loader.virtualcache.invalidate(self.opts["cachedir"])
 
         self.utils = salt.loader.utils(self.opts, context=context)
         self.functions = salt.loader.minion_mods(
@@ -1266,6 +1272,16 @@ class Minion(MinionBase):
         # True means the Minion is fully functional and ready to handle events.
         self.ready = False
         self.jid_queue = [] if jid_queue is None else jid_queue
+        self.job_forkserver = None
+        self.job_pool = None
+        if not self.opts.get("multiprocessing", True) and self.opts.get(
+            "minion_job_threads"
+        ):
+            self.job_pool = salt.utils.process.ThreadPool(
+                self.opts["minion_job_threads"],
+                queue_size=self.opts.get("minion_job_queue_size", 0),
+                priorities=True,
+            )
         self.periodic_callbacks = {}
         self.req_channel = None
 
@@ -1426,16 +1442,27 @@ class Minion(MinionBase):
         if self.connected:
             self.opts["master"] = master
 
-            # Initialize pillar before loader to make pillar accessible in modules
-            async_pillar = salt.pillar.get_async_pillar(
-                self.opts,
-                self.opts["grains"],
-                self.opts["id"],
-                self.opts["saltenv"],
-                pillarenv=self.opts.get("pillarenv"),
-            )
-            self.opts["pillar"] = yield async_pillar.compile_pillar()
-            async_pillar.destroy()
+            pillar = None
+            if self.opts.get("minion_warm_start") and not self.ready:
+                pillar = salt.utils.minionsnapshot.load(self.opts)
+            if pillar is not None:
+                # Start with the pillar of the snapshot and compile the
+                # current pillar once the minion is up
+                self.opts["pillar"] = pillar
+                self.io_loop.spawn_callback(self.pillar_refresh)
+            else:
+                # Initialize pillar before loader to make pillar accessible in modules
+                async_pillar = salt.pillar.get_async_pillar(
+                    self.opts,
+                    self.opts["grains"],
+                    self.opts["id"],
+                    self.opts["saltenv"],
+                    pillarenv=self.opts.get("pillarenv"),
+                )
+                self.opts["pillar"] = yield async_pillar.compile_pillar()
+                async_pillar.destroy()
+                if self.opts.get("minion_warm_start"):
+                    salt.utils.minionsnapshot.save(self.opts, self.opts["pillar"])
 
         if not self.ready:
             self._setup_core()
@@ -1459,6 +1486,7 @@ class Minion(MinionBase):
                 self.returners,
                 cleanup=[master_event(type="alive")],
             )
+            self.schedule.job_pool = self.job_pool
 
         # add default scheduling jobs to the minions scheduler
         if self.opts["mine_enabled"] and "mine.update" in self.functions:
@@ -1615,6 +1643,9 @@ class Minion(MinionBase):
 
         executors = salt.loader.executors(opts, functions, proxy=proxy, context=context)
 
+        if opts.get("loader_profile"):
+            salt.loader.profiler.PROFILER.write(opts["cachedir"])
+
         if opt_in:
             self.opts = opts
 
@@ -1813,6 +1844,7 @@ class Minion(MinionBase):
 
         if isinstance(data["fun"], str):
             if data["fun"] == "sys.reload_modules":
+                salt.loader.virtualcache.invalidate(self.opts["cachedir"])
                 (
                     self.functions,
                     self.returners,
@@ -1821,6 +1853,7 @@ class Minion(MinionBase):
                 ) = self._load_modules()
                 self.schedule.functions = self.functions
                 self.schedule.returners = self.returners
+                self._stop_job_forkserver()
 
         if self.opts.get("grains_refresh_pre_exec"):
             if hasattr(self, "proxy"):
@@ -1830,6 +1863,8 @@ class Minion(MinionBase):
             self.opts["grains"] = salt.loader.grains(
                 self.opts, force_refresh=True, proxy=proxy
             )
+            if self.job_forkserver is not None:
+                self.job_forkserver.refresh(grains=self.opts["grains"])
 
         process_count_max = self.opts.get("process_count_max")
         if process_count_max > 0:
@@ -1851,6 +1886,22 @@ class Minion(MinionBase):
         creds_map = None
         multiprocessing_enabled = self.opts.get("multiprocessing", True)
         name = "ProcessPayload(jid={})".format(data["jid"])
+        if not multiprocessing_enabled and self.job_pool is not None:
+            await self._queue_job(data)
+            return
+        if (
+            multiprocessing_enabled
+            and self.opts.get("minion_job_forkserver")
+            and salt.utils.forkserver.supported()
+        ):
+            if self.job_forkserver is None:
+                self.job_forkserver = salt.utils.forkserver.JobForkServer(self)
+            if self.job_forkserver.submit(data, self.connected):
+                return
+            log.warning(
+                "The job fork server is unavailable, starting jid %s in a new process",
+                data["jid"],
+            )
         if multiprocessing_enabled:
             if salt.utils.platform.spawning_platform():
                 # let python reconstruct the minion on the other side if we're
@@ -1879,6 +1930,53 @@ class Minion(MinionBase):
             process.start()
         self.subprocess_list.add(process)
 
+    async def _queue_job(self, data):
+        """
+        Queue a job for the threads of the job pool, waiting for room in the
+        queue or rejecting the job when the queue is full
+        """
+        while not self.job_pool.fire_async(
+            self._target,
+            args=(self, self.opts, data, self.connected, None),
+            priority=salt.utils.minion.JOB_PRIORITY_PUBLISH,
+        ):
+            if self.opts.get("minion_job_queue_policy") == "reject":
+                log.error(
+                    "The job queue is full, rejecting jid %s. %s",
+                    data["jid"],
+                    self.job_pool.stats(),
+                )
+                await self._reject_job(data)
+                return
+            log.warning(
+                "The job queue is full while queueing jid %s, waiting...",
+                data["jid"],
+            )
+            await asyncio.sleep(1)
+        log.debug("Queued jid %s. %s", data["jid"], self.job_pool.stats())
+
+    async def _reject_job(self, data):
+        """
+        Return an error for a job which was not run
+        """
+        ret = {
+            "success": False,
+            "return": "The job was rejected, the job queue of the minion is full",
+            "retcode": salt.defaults.exitcodes.EX_GENERIC,
+            "out": "nested",
+            "jid": data["jid"],
+            "fun": data["fun"],
+            "fun_args": data["arg"],
+        }
+        if "master_id" in data:
+            ret["master_id"] = data["master_id"]
+        if not self.opts["pub_ret"]:
+            return
+        try:
+            await self._send_req_async(self._prepare_return_pub(ret), timeout=60)
+        except SaltReqTimeoutError:
+            log.warning("Unable to return the rejection of jid %s", data["jid"])
+
     def ctx(self):
         """
         Return a single context manager for the minion's data
@@ -1890,7 +1988,11 @@ class Minion(MinionBase):
         return exitstack
 
     @classmethod
-    def _target(cls, minion_instance, opts, data, connected, creds_map):
+    def _prepare_target_instance(cls, minion_instance, opts, connected, creds_map):
+        """
+        Return the minion instance to run jobs with, rebuilding it from
+        ``opts`` on platforms which spawn processes
+        """
         if creds_map:
             salt.crypt.AsyncAuth.creds_map = creds_map
         if not minion_instance:
@@ -1910,6 +2012,13 @@ class Minion(MinionBase):
             if not hasattr(minion_instance, "proc_dir"):
                 uid = salt.utils.user.get_uid(user=opts.get("user", None))
                 minion_instance.proc_dir = get_proc_dir(opts["cachedir"], uid=uid)
+        return minion_instance
+
+    @classmethod
+    def _target(cls, minion_instance, opts, data, connected, creds_map):
+        minion_instance = cls._prepare_target_instance(
+            minion_instance, opts, connected, creds_map
+        )
 
         with salt.utils.ctx.request_context({"data": data, "opts": opts}):
             if isinstance(data["fun"], tuple) or isinstance(data["fun"], list):
@@ -2552,15 +2661,26 @@ class Minion(MinionBase):
         if not hasattr(self, "schedule"):
             return
         log.debug("Refreshing modules. Notify=%s", notify)
+        # A dependency of the __virtual__ functions may have been installed
+        salt.loader.virtualcache.invalidate(self.opts["cachedir"])
         self.functions, self.returners, _, self.executors = self._load_modules(
             force_refresh, notify=notify
         )
 
         self.schedule.functions = self.functions
         self.schedule.returners = self.returners
+        # The template process is started again with the new modules
+        self._stop_job_forkserver()
 
         self.beacons_refresh()
 
+    def _stop_job_forkserver(self):
+        """
+        Stop the job fork server, it is started again for the next job
+        """
+        if self.job_forkserver is not None:
+            self.job_forkserver.stop()
+
     def beacons_refresh(self):
         """
         Refresh the functions and returners.
@@ -2643,6 +2763,10 @@ class Minion(MinionBase):
                 )
                 self.opts["pillar"] = new_pillar
                 self.functions.pack["__pillar__"] = self.opts["pillar"]
+                if self.job_forkserver is not None:
+                    self.job_forkserver.refresh(pillar=self.opts["pillar"])
+                if self.opts.get("minion_warm_start"):
+                    salt.utils.minionsnapshot.save(self.opts, new_pillar)
             finally:
                 async_pillar.destroy()
         self.matchers_refresh()
@@ -3160,6 +3284,7 @@ class Minion(MinionBase):
                     utils=self.utils,
                     cleanup=[master_event(type="alive")],
                 )
+                self.schedule.job_pool = self.job_pool
 
             try:
                 if self.opts["grains_refresh_every"]:  # In minutes, not seconds!
@@ -3356,6 +3481,8 @@ class Minion(MinionBase):
         self._running = False
         if hasattr(self, "schedule"):
             del self.schedule
+        if getattr(self, "job_forkserver", None) is not None:
+            self.job_forkserver.stop()
         if hasattr(self, "pub_channel") and self.pub_channel is not None:
             self.pub_channel.on_recv(None)
             self.pub_channel.close()
@@ -22,6 +22,7 @@ import salt.client
 import salt.client.ssh.client
 import salt.config
 import salt.defaults.events
+import salt.loader.virtualcache
 import salt.payload
 import salt.runner
 import salt.state
@@ -111,6 +112,8 @@ def _sync(form, saltenv=None, extmod_whitelist=None, extmod_blacklist=None):
         mod_file = os.path.join(__opts__["cachedir"], "module_refresh")
         with salt.utils.files.fopen(mod_file, "a"):
             pass
+        # The synced modules may change the __virtual__ result of others
+        salt.loader.virtualcache.invalidate(__opts__["cachedir"])
     if (
         form == "grains"
         and __opts__.get("grains_cache")
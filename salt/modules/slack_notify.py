@@ -18,6 +18,7 @@ Module for sending messages to Slack
 import logging
 import urllib.parse
 
+import salt.utils.http
 import salt.utils.json
 import salt.utils.slack
 from salt.exceptions import SaltInvocationError
@@ -712,6 +712,23 @@ def apply_(mods=None, **kwargs):
 
         .. versionadded:: 3006.0
 
+    state_profile
+        Time each phase of the state run, such as rendering every SLS file and
+        running every state, and write the report to the ``state_profile``
+        directory of the minion cachedir. The ``.folded`` file of the report
+        can be passed to flamegraph tools. Defaults to the ``state_profile``
+        configuration option.
+
+        .. versionadded:: 3008.0
+
+    state_stream_batch
+        Send the state results to the master in batches of this many results
+        while the state run is in progress, so that the job cache shows the
+        progress of the run. Defaults to the ``state_stream_batch``
+        configuration option.
+
+        .. versionadded:: 3008.0
+
 
     .. rubric:: APPLYING INDIVIDUAL SLS FILES (A.K.A. :py:func:`STATE.SLS <salt.modules.state.sls>`)
 
@@ -829,6 +846,23 @@ def apply_(mods=None, **kwargs):
         a state run completes execution.
 
         .. versionadded:: 3006.0
+
+    state_profile
+        Time each phase of the state run, such as rendering every SLS file and
+        running every state, and write the report to the ``state_profile``
+        directory of the minion cachedir. The ``.folded`` file of the report
+        can be passed to flamegraph tools. Defaults to the ``state_profile``
+        configuration option.
+
+        .. versionadded:: 3008.0
+
+    state_stream_batch
+        Send the state results to the master in batches of this many results
+        while the state run is in progress, so that the job cache shows the
+        progress of the run. Defaults to the ``state_stream_batch``
+        configuration option.
+
+        .. versionadded:: 3008.0
     """
     if mods:
         return sls(mods, **kwargs)
@@ -987,7 +1021,14 @@ def run_request(name="default", **kwargs):
     return {}
 
 
-def highstate(test=None, queue=None, state_events=None, **kwargs):
+def highstate(
+    test=None,
+    queue=None,
+    state_events=None,
+    state_profile=None,
+    state_stream_batch=None,
+    **kwargs,
+):
     """
     Retrieve the state data from the salt master for this minion and execute it
 
@@ -1091,6 +1132,23 @@ def highstate(test=None, queue=None, state_events=None, **kwargs):
 
         .. versionadded:: 3006.0
 
+    state_profile
+        Time each phase of the state run, such as rendering every SLS file and
+        running every state, and write the report to the ``state_profile``
+        directory of the minion cachedir. The ``.folded`` file of the report
+        can be passed to flamegraph tools. Defaults to the ``state_profile``
+        configuration option.
+
+        .. versionadded:: 3008.0
+
+    state_stream_batch
+        Send the state results to the master in batches of this many results
+        while the state run is in progress, so that the job cache shows the
+        progress of the run. Defaults to the ``state_stream_batch``
+        configuration option.
+
+        .. versionadded:: 3008.0
+
     CLI Examples:
 
     .. code-block:: bash
@@ -1150,6 +1208,12 @@ def highstate(test=None, queue=None, state_events=None, **kwargs):
     if state_events is not None:
         opts["state_events"] = state_events
 
+    if state_profile is not None:
+        opts["state_profile"] = state_profile
+
+    if state_stream_batch is not None:
+        opts["state_stream_batch"] = state_stream_batch
+
     try:
         st_ = salt.state.HighState(
             opts,
@@ -1215,6 +1279,8 @@ def sls(
     queue=None,
     sync_mods=None,
     state_events=None,
+    state_profile=None,
+    state_stream_batch=None,
     **kwargs,
 ):
     """
@@ -1332,6 +1398,23 @@ def sls(
 
         .. versionadded:: 3006.0
 
+    state_profile
+        Time each phase of the state run, such as rendering every SLS file and
+        running every state, and write the report to the ``state_profile``
+        directory of the minion cachedir. The ``.folded`` file of the report
+        can be passed to flamegraph tools. Defaults to the ``state_profile``
+        configuration option.
+
+        .. versionadded:: 3008.0
+
+    state_stream_batch
+        Send the state results to the master in batches of this many results
+        while the state run is in progress, so that the job cache shows the
+        progress of the run. Defaults to the ``state_stream_batch``
+        configuration option.
+
+        .. versionadded:: 3008.0
+
     CLI Example:
 
     .. code-block:: bash
@@ -1421,6 +1504,12 @@ def sls(
     if state_events is not None:
         opts["state_events"] = state_events
 
+    if state_profile is not None:
+        opts["state_profile"] = state_profile
+
+    if state_stream_batch is not None:
+        opts["state_stream_batch"] = state_stream_batch
+
     try:
         st_ = salt.state.HighState(
             opts,
@@ -3,12 +3,12 @@ Return data to local job cache
 
 """
 
-import bisect
 import errno
 import glob
 import logging
 import os
 import shutil
+import struct
 import time
 
 import salt.exceptions
@@ -37,6 +37,21 @@ RETURN_P = "return.p"
 OUT_P = "out.p"
 # endtime is the end time for a job, not stored as msgpack
 ENDTIME = "endtime"
+# results streamed by the minions before their return, one file per batch in
+# a subdirectory per minion
+PARTIAL_DIR = ".partial"
+# the index of the jobs in the cache, one entry per saved load with the fields
+# needed to list the jobs without reading their loads
+JID_INDEX = "jobs.index.p"
+JID_INDEX_LOCK = "jobs.index.lock"
+# the fields of the loads kept in the index
+JID_INDEX_FIELDS = ("fun", "arg", "tgt", "tgt_type", "user", "metadata", "kwargs")
+
+_INDEX_HEADER = struct.Struct(">I")
+
+# The index read so far, maps the path of the index to its inode, the size
+# read and the indexed jobs
+_JID_INDEX = {}
 
 
 def _job_dir():
@@ -79,6 +94,108 @@ def _walk_through(job_dir):
                 yield jid, job, t_path, final
 
 
+def _jid_index_path():
+    return os.path.join(__opts__["cachedir"], JID_INDEX)
+
+
+def _index_entry(jid, load):
+    """
+    Return the index entry of a load
+    """
+    entry = {"jid": jid}
+    for key in JID_INDEX_FIELDS:
+        if key not in load:
+            continue
+        if key == "kwargs":
+            # Only the metadata of the kwargs is listed
+            if isinstance(load[key], dict) and "metadata" in load[key]:
+                entry[key] = {"metadata": load[key]["metadata"]}
+            continue
+        entry[key] = load[key]
+    return entry
+
+
+def _frame(entries):
+    data = b""
+    for entry in entries:
+        payload = salt.payload.dumps(entry)
+        data += _INDEX_HEADER.pack(len(payload)) + payload
+    return data
+
+
+def _append_index(entries):
+    """
+    Append entries to the jid index, indexing the jobs already in the cache
+    when there is no index yet
+    """
+    path = _jid_index_path()
+    lock = os.path.join(__opts__["cachedir"], JID_INDEX_LOCK)
+    try:
+        with salt.utils.files.flopen(lock, "a"):
+            if not os.path.exists(path):
+                log.info("Building the jid index of the job cache")
+                indexed = []
+                if os.path.isdir(_job_dir()):
+                    for jid, job, _, _ in _walk_through(_job_dir()):
+                        indexed.append(_index_entry(jid, job))
+                entries = indexed + list(entries)
+            with salt.utils.files.fopen(path, "ab") as wfh:
+                wfh.write(_frame(entries))
+    except OSError as exc:
+        log.error("Failed to update the jid index: %s", exc)
+
+
+def _read_index():
+    """
+    Return the indexed jobs, reading only the entries appended since the last
+    call
+    """
+    path = _jid_index_path()
+    if not os.path.exists(path):
+        _append_index([])
+    try:
+        inode = os.stat(path).st_ino
+    except OSError:
+        return {}
+    cached = _JID_INDEX.get(path)
+    if cached is None or cached["inode"] != inode:
+        cached = _JID_INDEX[path] = {"inode": inode, "offset": 0, "jobs": {}}
+    with salt.utils.files.fopen(path, "rb") as rfh:
+        rfh.seek(cached["offset"])
+        buf = rfh.read()
+    pos = 0
+    while pos + _INDEX_HEADER.size <= len(buf):
+        (length,) = _INDEX_HEADER.unpack_from(buf, pos)
+        end = pos + _INDEX_HEADER.size + length
+        if end > len(buf):
+            # An entry being written
+            break
+        entry = salt.payload.loads(buf[pos + _INDEX_HEADER.size : end])
+        cached["jobs"][entry.pop("jid")] = entry
+        pos = end
+    cached["offset"] += pos
+    return cached["jobs"]
+
+
+def _prune_index():
+    """
+    Drop the jobs which are no longer in the cache from the jid index
+    """
+    path = _jid_index_path()
+    if not os.path.exists(path):
+        return
+    lock = os.path.join(__opts__["cachedir"], JID_INDEX_LOCK)
+    with salt.utils.files.flopen(lock, "a"):
+        jobs = _read_index()
+        entries = []
+        for jid, entry in jobs.items():
+            jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+            if os.path.isdir(jid_dir):
+                entries.append(dict(entry, jid=jid))
+        with salt.utils.atomicfile.atomic_open(path, "wb") as wfh:
+            wfh.write(_frame(entries))
+
+
 # TODO: add to returner docs-- this is a new one
 def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
     """
@@ -175,6 +292,48 @@ def returner(load):
             salt.utils.atomicfile.atomic_open(os.path.join(hn_dir, OUT_P), "w+b"),
         )
 
+    # The full return supersedes the results streamed before it
+    partial_dir = os.path.join(jid_dir, PARTIAL_DIR, load["id"])
+    if os.path.isdir(partial_dir):
+        shutil.rmtree(partial_dir, ignore_errors=True)
+
+
+def save_partial(load):
+    """
+    Save a batch of results streamed by a minion before its return
+    """
+    jid_dir = salt.utils.jid.jid_dir(load["jid"], _job_dir(), __opts__["hash_type"])
+    if not os.path.isdir(jid_dir) or os.path.exists(os.path.join(jid_dir, "nocache")):
+        return False
+    if os.path.isfile(os.path.join(jid_dir, load["id"], RETURN_P)):
+        # The minion already returned
+        return False
+    partial_dir = os.path.join(jid_dir, PARTIAL_DIR, load["id"])
+    os.makedirs(partial_dir, exist_ok=True)
+    salt.payload.dump(
+        load["return"],
+        salt.utils.atomicfile.atomic_open(
+            os.path.join(partial_dir, f"{int(load.get('seq', 0))}.p"), "w+b"
+        ),
+    )
+
+
+def _get_partial(partial_dir):
+    """
+    Merge the batches of results streamed by a minion
+    """
+    ret = {}
+    batches = [fn_ for fn_ in os.listdir(partial_dir) if fn_.endswith(".p")]
+    for fn_ in sorted(batches, key=lambda fn_: int(fn_[:-2])):
+        try:
+            with salt.utils.files.fopen(os.path.join(partial_dir, fn_), "rb") as rfh:
+                batch = salt.payload.load(rfh)
+        except Exception:  # pylint: disable=broad-except
+            continue
+        if isinstance(batch, dict):
+            ret.update(batch)
+    return ret
+
 
 def save_load(jid, clear_load, minions=None, recurse_count=0):
     """
@@ -213,6 +372,7 @@ def save_load(jid, clear_load, minions=None, recurse_count=0):
         return save_load(
             jid=jid, clear_load=clear_load, recurse_count=recurse_count + 1
         )
+    _append_index([_index_entry(jid, clear_load)])
 
     # if you have a tgt, save that for the UI etc
     if "tgt" in clear_load and clear_load["tgt"] != "":
@@ -356,12 +516,32 @@ def get_jid(jid):
     return ret
 
 
+def get_partials(jid):
+    """
+    Return the results streamed so far by the minions which did not return
+    yet for the specified job id, merged per minion
+    """
+    jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+    partial_root = os.path.join(jid_dir, PARTIAL_DIR)
+    ret = {}
+    if not os.path.isdir(partial_root):
+        return ret
+    for fn_ in os.listdir(partial_root):
+        if os.path.isfile(os.path.join(jid_dir, fn_, RETURN_P)):
+            # The minion returned, its full return replaces the partial ones
+            continue
+        partial = _get_partial(os.path.join(partial_root, fn_))
+        if partial:
+            ret[fn_] = {"return": partial, "partial": True}
+    return ret
+
+
 def get_jids():
     """
     Return a dict mapping all job ids to job information
     """
     ret = {}
-    for jid, job, _, _ in _walk_through(_job_dir()):
+    for jid, job in _read_index().items():
         ret[jid] = salt.utils.jid.format_jid_instance(jid, job)
 
         if __opts__.get("job_cache_store_endtime"):
@@ -378,20 +558,15 @@ def get_jids_filter(count, filter_find_job=True):
     :param int count: show not more than the count of most recent jobs
     :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
     """
-    keys = []
+    jobs = _read_index()
     ret = []
-    for jid, job, _, _ in _walk_through(_job_dir()):
-        job = salt.utils.jid.format_jid_instance_ext(jid, job)
-        if filter_find_job and job["Function"] == "saltutil.find_job":
-            continue
-        i = bisect.bisect(keys, jid)
-        if len(keys) == count and i == 0:
+    for jid in sorted(jobs, reverse=True):
+        if len(ret) >= count:
+            break
+        if filter_find_job and jobs[jid].get("fun") == "saltutil.find_job":
             continue
-        keys.insert(i, jid)
-        ret.insert(i, job)
-        if len(keys) > count:
-            del keys[0]
-            del ret[0]
+        ret.append(salt.utils.jid.format_jid_instance_ext(jid, jobs[jid]))
+    ret.reverse()
     return ret
 
 
@@ -464,6 +639,8 @@ def clean_old_jobs():
                 if seconds_difference > keep_jobs_seconds:
                     _remove_job_dir(t_path)
 
+        _prune_index()
+
 
 def update_endtime(jid, time):
     """
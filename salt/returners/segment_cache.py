@@ -0,0 +1,554 @@
+"""
+Return data to a log structured job cache on the master
+
+Unlike the default ``local_cache``, which creates a directory per job and per
+returning minion, this job cache appends everything it stores to segment files.
+All the data of a job goes to the segment of the hour the job was started in.
+Each segment is a ``data`` file holding the serialized loads, minion lists and
+returns, and an ``index`` file mapping the job ids and minion ids to their
+records in the ``data`` file. Storing a return is two appends, however many
+minions return, and old jobs are removed by deleting whole segments.
+
+To use it as the master job cache, set in the master config:
+
+.. code-block:: yaml
+
+    master_job_cache: segment_cache
+
+Jobs are kept for ``keep_jobs_seconds``, rounded up to the hour of their
+segment.
+"""
+
+import calendar
+import contextlib
+import logging
+import os
+import shutil
+import struct
+import time
+import zlib
+
+import salt.exceptions
+import salt.payload
+import salt.utils.files
+import salt.utils.jid
+import salt.utils.job
+import salt.utils.minions
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+log = logging.getLogger(__name__)
+
+# The records appended to the data file
+DATA = "data"
+# The entries mapping job and minion ids to records in the data file
+INDEX = "index"
+# The segment of the jobs whose jid does not tell when they were started
+OTHER_SEGMENT = "other"
+# The kinds of records
+JID = "jid"
+LOAD = "load"
+MINIONS = "minions"
+RETURN = "return"
+PARTIAL = "partial"
+ENDTIME = "endtime"
+
+# The length and CRC32 of each index entry
+_HEADER = struct.Struct(">II")
+
+# The parsed index of every segment, maps the segment directory to the inode
+# and size of the index file read so far and the records of each job
+_INDEX = {}
+
+
+def __virtual__():
+    if not HAS_FCNTL:
+        return (False, "The segment_cache returner requires fcntl")
+    return True
+
+
+def _job_dir():
+    """
+    Return root of the segments of the job cache
+    """
+    return os.path.join(__opts__["cachedir"], "job_segments")
+
+
+def _segment(jid):
+    """
+    Return the name of the segment of a job
+    """
+    if salt.utils.jid.is_jid(jid):
+        return jid[:10]
+    return OTHER_SEGMENT
+
+
+def _segment_dir(jid):
+    return os.path.join(_job_dir(), _segment(jid))
+
+
+def _segment_time(name):
+    """
+    Return when the hour of a segment ends, or None for the other segment
+    """
+    try:
+        start = time.strptime(name, "%Y%m%d%H")
+    except ValueError:
+        return None
+    # The jids generated by this master are in UTC, the ones passed by older
+    # masters, syndics or minions may be in local time: keep the segment until
+    # its hour ended in both
+    return max(calendar.timegm(start), time.mktime(start)) + 3600
+
+
+def _read_index(seg_dir):
+    """
+    Return the records of each job of a segment, reading only the entries
+    appended since the last call
+
+    The entries are read up to the first one which is incomplete or does not
+    match its checksum, either being written or torn by a writer which died.
+    The next writer truncates a torn entry, see ``_locked``.
+    """
+    path = os.path.join(seg_dir, INDEX)
+    try:
+        inode = os.stat(path).st_ino
+    except OSError:
+        _INDEX.pop(seg_dir, None)
+        return {}
+    cached = _INDEX.get(seg_dir)
+    if cached is None or cached["inode"] != inode:
+        cached = _INDEX[seg_dir] = {"inode": inode, "offset": 0, "jobs": {}}
+    with salt.utils.files.fopen(path, "rb") as fp_:
+        fp_.seek(cached["offset"])
+        buf = fp_.read()
+    pos = 0
+    while pos + _HEADER.size <= len(buf):
+        length, crc = _HEADER.unpack_from(buf, pos)
+        end = pos + _HEADER.size + length
+        if end > len(buf):
+            # An entry being written
+            break
+        entry = buf[pos + _HEADER.size : end]
+        if zlib.crc32(entry) != crc:
+            # A torn entry
+            break
+        kind, jid, minion_id, offset, size = salt.payload.loads(entry)
+        job = cached["jobs"].setdefault(jid, {})
+        if kind in (RETURN, PARTIAL):
+            job.setdefault(kind, {}).setdefault(minion_id, []).append((offset, size))
+        else:
+            job.setdefault(kind, []).append((minion_id, offset, size))
+        pos = end
+    cached["offset"] += pos
+    return cached["jobs"]
+
+
+def _job(jid):
+    """
+    Return the records of a job
+    """
+    return _read_index(_segment_dir(jid)).get(jid, {})
+
+
+@contextlib.contextmanager
+def _data(seg_dir):
+    """
+    Open the data file of a segment once to read several records from it
+    """
+    with salt.utils.files.fopen(os.path.join(seg_dir, DATA), "rb") as fp_:
+
+        def read(offset, size):
+            fp_.seek(offset)
+            return salt.payload.loads(fp_.read(size))
+
+        yield read
+
+
+def _read(seg_dir, offset, size):
+    with _data(seg_dir) as read:
+        return read(offset, size)
+
+
+@contextlib.contextmanager
+def _locked(seg_dir):
+    """
+    Lock a segment for appending to it
+    """
+    os.makedirs(seg_dir, exist_ok=True)
+    with salt.utils.files.fopen(os.path.join(seg_dir, INDEX), "ab") as index_fp:
+        fcntl.flock(index_fp.fileno(), fcntl.LOCK_EX)
+        try:
+            _read_index(seg_dir)
+            valid = _INDEX[seg_dir]["offset"]
+            if index_fp.seek(0, os.SEEK_END) > valid:
+                # No entry is being written while the segment is locked, the
+                # entries left after the valid ones were torn by a writer
+                # which died, drop them so that the next entries are read
+                log.warning("Truncating the torn entries of %s", seg_dir)
+                index_fp.truncate(valid)
+            yield index_fp
+        finally:
+            fcntl.flock(index_fp.fileno(), fcntl.LOCK_UN)
+
+
+def _append(seg_dir, index_fp, kind, jid, data, minion_id=None):
+    """
+    Append a record to the data file of a locked segment and index it
+    """
+    payload = salt.payload.dumps(data)
+    with salt.utils.files.fopen(os.path.join(seg_dir, DATA), "ab") as data_fp:
+        offset = data_fp.seek(0, os.SEEK_END)
+        data_fp.write(payload)
+    entry = salt.payload.dumps([kind, jid, minion_id, offset, len(payload)])
+    index_fp.write(_HEADER.pack(len(entry), zlib.crc32(entry)) + entry)
+    index_fp.flush()
+
+
+def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
+    """
+    Return a job id and record it in the job cache
+    """
+    if recurse_count >= 5:
+        err = f"prep_jid could not store a jid after {recurse_count} tries."
+        log.error(err)
+        raise salt.exceptions.SaltCacheError(err)
+    if passed_jid is None:  # this can be a None or an empty string.
+        jid = salt.utils.jid.gen_jid(__opts__)
+    else:
+        jid = passed_jid
+
+    seg_dir = _segment_dir(jid)
+    try:
+        with _locked(seg_dir) as index_fp:
+            if JID in _read_index(seg_dir).get(jid, {}):
+                if passed_jid is None:
+                    # Someone else is using this jid
+                    return prep_jid(nocache=nocache, recurse_count=recurse_count + 1)
+                return jid
+            _append(seg_dir, index_fp, JID, jid, {"nocache": nocache})
+    except OSError as exc:
+        log.warning("Could not write out jid %s: %s. Retrying.", jid, exc)
+        time.sleep(0.1)
+        return prep_jid(
+            passed_jid=jid, nocache=nocache, recurse_count=recurse_count + 1
+        )
+    return jid
+
+
+def _nocache(seg_dir, job):
+    if not job.get(JID):
+        return False
+    with _data(seg_dir) as read:
+        for _, offset, size in job[JID]:
+            if read(offset, size).get("nocache"):
+                return True
+    return False
+
+
+def returner(load):
+    """
+    Return data to the job cache
+    """
+    # if a minion is returning a standalone job, get a jobid
+    if load["jid"] == "req":
+        load["jid"] = prep_jid(nocache=load.get("nocache", False))
+
+    jid = load["jid"]
+    seg_dir = _segment_dir(jid)
+    job = _job(jid)
+    if JID not in job and LOAD not in job:
+        log.error(
+            "An inconsistency occurred, a job was received with a job id "
+            "(%s) that is not present in the job cache",
+            jid,
+        )
+        return False
+    if _nocache(seg_dir, job):
+        return
+
+    data = {key: load[key] for key in ["return", "retcode", "success"] if key in load}
+    if "out" in load:
+        data["out"] = load["out"]
+    with _locked(seg_dir) as index_fp:
+        if load["id"] in _read_index(seg_dir)[jid].get(RETURN, {}):
+            # Minion has already returned this jid and it should be dropped
+            log.error(
+                "An extra return was detected from minion %s, please verify "
+                "the minion, this could be a replay attack",
+                load["id"],
+            )
+            return False
+        _append(seg_dir, index_fp, RETURN, jid, data, minion_id=load["id"])
+
+
+def save_partial(load):
+    """
+    Save a batch of results streamed by a minion before its return
+    """
+    jid = load["jid"]
+    seg_dir = _segment_dir(jid)
+    job = _job(jid)
+    if JID not in job and LOAD not in job:
+        return False
+    if _nocache(seg_dir, job) or load["id"] in job.get(RETURN, {}):
+        return False
+    with _locked(seg_dir) as index_fp:
+        _append(
+            seg_dir,
+            index_fp,
+            PARTIAL,
+            jid,
+            {"seq": int(load.get("seq", 0)), "return": load["return"]},
+            minion_id=load["id"],
+        )
+
+
+def save_load(jid, clear_load, minions=None, recurse_count=0):
+    """
+    Save the load to the specified jid
+
+    minions argument is to provide a pre-computed list of matched minions for
+    the job, for cases when this function can't compute that list itself (such
+    as for salt-ssh)
+    """
+    if recurse_count >= 5:
+        err = "save_load could not write job cache file after {} retries.".format(
+            recurse_count
+        )
+        log.error(err)
+        raise salt.exceptions.SaltCacheError(err)
+
+    seg_dir = _segment_dir(jid)
+    try:
+        with _locked(seg_dir) as index_fp:
+            _append(seg_dir, index_fp, LOAD, jid, clear_load)
+    except OSError as exc:
+        log.warning("Could not write job invocation cache file: %s", exc)
+        time.sleep(0.1)
+        return save_load(
+            jid=jid, clear_load=clear_load, recurse_count=recurse_count + 1
+        )
+
+    # if you have a tgt, save that for the UI etc
+    if "tgt" in clear_load and clear_load["tgt"] != "":
+        if minions is None:
+            ckminions = salt.utils.minions.CkMinions(__opts__)
+            # Retrieve the minions list
+            _res = ckminions.check_minions(
+                clear_load["tgt"], clear_load.get("tgt_type", "glob")
+            )
+            minions = _res["minions"]
+        # save the minions to a cache so we can see in the UI
+        save_minions(jid, minions)
+
+
+def save_minions(jid, minions, syndic_id=None):
+    """
+    Save/update the list of minions for a given job
+    """
+    # Ensure we have a list for Python 3 compatibility
+    minions = list(minions)
+
+    log.debug(
+        "Adding minions for job %s%s: %s",
+        jid,
+        f" from syndic master '{syndic_id}'" if syndic_id else "",
+        minions,
+    )
+    seg_dir = _segment_dir(jid)
+    try:
+        with _locked(seg_dir) as index_fp:
+            _append(seg_dir, index_fp, MINIONS, jid, minions, minion_id=syndic_id)
+    except OSError as exc:
+        log.error(
+            "Failed to write minion list %s to job cache segment %s: %s",
+            minions,
+            seg_dir,
+            exc,
+        )
+
+
+def _get_minions(read, job):
+    """
+    Return the minions of a job, the last list saved by the master and by each
+    syndic
+    """
+    lists = {}
+    for syndic_id, offset, size in job.get(MINIONS, []):
+        lists[syndic_id] = (offset, size)
+    all_minions = set()
+    for offset, size in lists.values():
+        all_minions.update(read(offset, size))
+    return all_minions
+
+
+def get_load(jid):
+    """
+    Return the load data that marks a specified jid
+    """
+    seg_dir = _segment_dir(jid)
+    job = _job(jid)
+    if not job.get(LOAD):
+        return {}
+    _, offset, size = job[LOAD][-1]
+    with _data(seg_dir) as read:
+        ret = read(offset, size) or {}
+        all_minions = _get_minions(read, job)
+    if all_minions:
+        ret["Minions"] = sorted(all_minions)
+    return ret
+
+
+def get_jid(jid):
+    """
+    Return the information returned when the specified job id was executed
+    """
+    seg_dir = _segment_dir(jid)
+    job = _job(jid)
+    ret = {}
+    if not job.get(RETURN):
+        return ret
+    with _data(seg_dir) as read:
+        for minion_id, records in job[RETURN].items():
+            offset, size = records[0]
+            ret[minion_id] = read(offset, size)
+    return ret
+
+
+def get_partials(jid):
+    """
+    Return the results streamed so far by the minions which did not return
+    yet for the specified job id, merged per minion
+    """
+    seg_dir = _segment_dir(jid)
+    job = _job(jid)
+    ret = {}
+    if not job.get(PARTIAL):
+        return ret
+    with _data(seg_dir) as read:
+        for minion_id, records in job[PARTIAL].items():
+            if minion_id in job.get(RETURN, {}):
+                continue
+            partial = {}
+            batches = [read(offset, size) for offset, size in records]
+            for batch in sorted(batches, key=lambda batch: batch["seq"]):
+                if isinstance(batch["return"], dict):
+                    partial.update(batch["return"])
+            if partial:
+                ret[minion_id] = {"return": partial, "partial": True}
+    return ret
+
+
+def _iter_loads():
+    """
+    Yield the jid and load of every job in the cache
+    """
+    job_dir = _job_dir()
+    if not os.path.isdir(job_dir):
+        return
+    for name in sorted(os.listdir(job_dir)):
+        seg_dir = os.path.join(job_dir, name)
+        jobs = [
+            (jid, job[LOAD][-1])
+            for jid, job in list(_read_index(seg_dir).items())
+            if job.get(LOAD)
+        ]
+        if not jobs:
+            continue
+        with _data(seg_dir) as read:
+            for jid, (_, offset, size) in jobs:
+                try:
+                    load = read(offset, size)
+                except Exception:  # pylint: disable=broad-except
+                    log.exception("Failed to deserialize the load of %s", jid)
+                    continue
+                if load:
+                    yield jid, load
+
+
+def get_jids():
+    """
+    Return a dict mapping all job ids to job information
+    """
+    ret = {}
+    for jid, load in _iter_loads():
+        ret[jid] = salt.utils.jid.format_jid_instance(jid, load)
+        if __opts__.get("job_cache_store_endtime"):
+            endtime = get_endtime(jid)
+            if endtime:
+                ret[jid]["EndTime"] = endtime
+    return ret
+
+
+def get_jids_filter(count, filter_find_job=True):
+    """
+    Return a list of all jobs information filtered by the given criteria.
+    :param int count: show not more than the count of most recent jobs
+    :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
+    """
+    ret = []
+    for jid, load in _iter_loads():
+        job = salt.utils.jid.format_jid_instance_ext(jid, load)
+        if filter_find_job and job["Function"] == "saltutil.find_job":
+            continue
+        ret.append(job)
+    ret.sort(key=lambda job: job["JID"])
+    return ret[-count:] if count else []
+
+
+def clean_old_jobs():
+    """
+    Remove the segments whose jobs are all older than keep_jobs_seconds
+    """
+    keep_jobs_seconds = salt.utils.job.get_keep_jobs_seconds(__opts__)
+    if keep_jobs_seconds == 0:
+        return
+    job_dir = _job_dir()
+    if not os.path.isdir(job_dir):
+        return
+    now = time.time()
+    for name in os.listdir(job_dir):
+        seg_dir = os.path.join(job_dir, name)
+        end = _segment_time(name)
+        if end is None:
+            # Jobs without a time in their jid, expire them once the segment
+            # was not written to for long enough
+            try:
+                end = os.stat(os.path.join(seg_dir, INDEX)).st_mtime
+            except OSError:
+                end = 0
+        if now - end > keep_jobs_seconds:
+            log.debug("Removing job cache segment %s", seg_dir)
+            shutil.rmtree(seg_dir, ignore_errors=True)
+            _INDEX.pop(seg_dir, None)
+
+
+def update_endtime(jid, time):
+    """
+    Update (or store) the end time for a given job
+    """
+    seg_dir = _segment_dir(jid)
+    try:
+        with _locked(seg_dir) as index_fp:
+            _append(seg_dir, index_fp, ENDTIME, jid, time)
+    except OSError as exc:
+        log.warning("Could not write job invocation cache file: %s", exc)
+
+
+def get_endtime(jid):
+    """
+    Retrieve the stored endtime for a given job
+
+    Returns False if no endtime is present
+    """
+    job = _job(jid)
+    if not job.get(ENDTIME):
+        return False
+    _, offset, size = job[ENDTIME][-1]
+    return _read(_segment_dir(jid), offset, size)
@@ -173,6 +173,38 @@ def lookup_jid(
         return ret
 
 
+def lookup_partials(jid, ext_source=None):
+    """
+    .. versionadded:: 3008.0
+
+    Return the results streamed so far by the minions which are still running
+    a job, see :conf_minion:`state_stream_batch`. The minions which already
+    returned are shown by :py:func:`jobs.lookup_jid <salt.runners.jobs.lookup_jid>`.
+
+    jid
+        The jid to look up.
+
+    ext_source
+        The external job cache to use. Default: `None`.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run jobs.lookup_partials 20130916125524463507 --out=highstate
+    """
+    mminion = salt.minion.MasterMinion(__opts__)
+    returner = _get_returner(
+        (__opts__["ext_job_cache"], ext_source, __opts__["master_job_cache"])
+    )
+    get_partials = mminion.returners.get(f"{returner}.get_partials")
+    if get_partials is None:
+        return {}
+    return {
+        minion: partial.get("return") for minion, partial in get_partials(jid).items()
+    }
+
+
 def list_job(jid, ext_source=None, display_progress=False):
     """
     List a specific job given by its jid
@@ -0,0 +1,89 @@
+"""
+Report the latency of the requests handled by the master workers
+
+.. versionadded:: 3008.0
+
+The master workers record these statistics when :conf_master:`master_stats`
+is enabled, and write them every :conf_master:`master_stats_event_iter`
+seconds.
+"""
+
+import logging
+
+import salt.utils.master
+
+log = logging.getLogger(__name__)
+
+
+def latency(cmd=None, worker=None):
+    """
+    Return the latency of the requests handled by the master workers since
+    they started, per command: the time spent handling the requests and the
+    time they waited in the worker before being handled, with their
+    percentiles in seconds.
+
+    cmd
+        Only report this command, ``_pillar`` or ``_file_hash`` for instance
+
+    worker
+        Only report the requests handled by this worker, ``MWorker-0`` for
+        instance
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run master_stats.latency
+        salt-run master_stats.latency cmd=_pillar
+    """
+    stats = salt.utils.master.get_worker_stats(__opts__)
+    if worker is not None:
+        stats = {name: data for name, data in stats.items() if name == worker}
+    merged = salt.utils.master.merge_worker_stats(stats)
+    ret = {}
+    for key, hists in merged.items():
+        for name, hist in hists.items():
+            if cmd is not None and name != cmd:
+                continue
+            ret.setdefault(name, {})[key] = hist.summary()
+    return ret
+
+
+def workers():
+    """
+    Return the utilization of each master worker since it started, the share
+    of the time it spent handling requests.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run master_stats.workers
+    """
+    ret = {}
+    for name, data in salt.utils.master.get_worker_stats(__opts__).items():
+        uptime = data["time"] - data["started"]
+        ret[name] = {
+            "pid": data["pid"],
+            "uptime": uptime,
+            "busy": data["busy"],
+            "utilization": data["busy"] / uptime if uptime > 0 else 0.0,
+            "requests": sum(hist.count for hist in data["latency"].values()),
+        }
+    return ret
+
+
+def prometheus():
+    """
+    Return the statistics of the master workers in the Prometheus text format,
+    as served on :conf_master:`master_stats_port`.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run master_stats.prometheus
+    """
+    return salt.utils.master.worker_stats_prometheus(
+        salt.utils.master.get_worker_stats(__opts__)
+    )
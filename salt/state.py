@@ -13,12 +13,15 @@ The data sent to the state calls is as follows:
 
 from __future__ import annotations
 
+import collections
 import copy
 import datetime
 import fnmatch
 import importlib
 import inspect
 import logging
+import multiprocessing
+import multiprocessing.connection
 import os
 import pickle
 import random
@@ -26,14 +29,15 @@ import re
 import site
 import time
 import traceback
+import uuid
 from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
 from typing import Any, Optional, Union
 
-import networkx as nx
-
 import salt.channel.client
+import salt.crypt
 import salt.fileclient
 import salt.loader
+import salt.loader.virtualcache
 import salt.minion
 import salt.pillar
 import salt.syspaths as syspaths
@@ -50,6 +54,8 @@ import salt.utils.jid
 import salt.utils.msgpack
 import salt.utils.platform
 import salt.utils.process
+import salt.utils.slscache
+import salt.utils.stateprofile
 import salt.utils.url
 import salt.utils.verify
 
@@ -60,7 +66,7 @@ from salt.serializers.msgpack import deserialize as msgpack_deserialize
 from salt.serializers.msgpack import serialize as msgpack_serialize
 from salt.template import compile_template, compile_template_str
 from salt.utils.odict import DefaultOrderedDict, HashableOrderedDict
-from salt.utils.requisite import DependencyGraph, RequisiteType
+from salt.utils.requisite import DependencyGraph, RequisiteCycleError, RequisiteType
 
 log = logging.getLogger(__name__)
 
@@ -128,6 +134,11 @@ STATE_RUNTIME_KEYWORDS = frozenset(
     ]
 )
 
+# Map each requisite type to its base type without the _any or _all suffix
+REQUISITE_BASE_TYPES = {
+    req_type: re.sub(r"_any$|_all$", "", req_type.value) for req_type in RequisiteType
+}
+
 STATE_INTERNAL_KEYWORDS = STATE_REQUISITE_KEYWORDS.union(
     STATE_REQUISITE_IN_KEYWORDS
 ).union(STATE_RUNTIME_KEYWORDS)
@@ -625,7 +636,7 @@ class Compiler:
         try:
             # Get nodes in topological order also sorted by order attribute
             sorted_chunks = self.dependency_dag.aggregate_and_order_chunks(cap)
-        except nx.NetworkXUnfeasible:
+        except RequisiteCycleError:
             sorted_chunks = []
             cycle_edges = self.dependency_dag.get_cycles_str()
             errors.append(f"Recursive requisites were found: {cycle_edges}")
@@ -705,6 +716,135 @@ class Compiler:
         return _apply_exclude(high)
 
 
+class ParallelStateJob:
+    """
+    A parallel state chunk submitted to a :class:`ParallelStatePool`. It is
+    stored in place of the process under the ``proc`` key of the running data.
+    """
+
+    def __init__(self, pool, name, payload):
+        self.pool = pool
+        self.name = name
+        self.payload = payload
+        self.ret = None
+
+    def is_alive(self):
+        if self.ret is None:
+            self.pool.poll()
+        return self.ret is None
+
+    def finish(self, ret):
+        if ret is None:
+            ret = {
+                "result": False,
+                "comment": "Parallel process failed to return",
+                "name": self.name,
+                "changes": {},
+            }
+        self.ret = ret
+        self.payload = None
+
+
+class _ParallelStateWorker:
+    __slots__ = ("proc", "conn", "job")
+
+    def __init__(self, proc, conn):
+        self.proc = proc
+        self.conn = conn
+        self.job = None
+
+
+class ParallelStatePool:
+    """
+    Pool of worker processes running the ``parallel: True`` chunks of a state
+    run. The workers are started once with the state modules already loaded,
+    run one chunk at a time and send the results back over a pipe.
+    """
+
+    def __init__(self, state, size):
+        self.state = state
+        self.queue = collections.deque()
+        self.workers = [self._start_worker() for _ in range(size)]
+
+    def _start_worker(self):
+        conn, child_conn = multiprocessing.Pipe()
+        proc = self.state._start_parallel_process(
+            self.state._parallel_pool_worker, "ParallelStateWorker", child_conn
+        )
+        child_conn.close()
+        return _ParallelStateWorker(proc, conn)
+
+    def submit(self, name, payload):
+        """
+        Queue a pickled ``(name, cdata, low, inject_globals)`` tuple and return
+        the job tracking it
+        """
+        job = ParallelStateJob(self, name, payload)
+        self.queue.append(job)
+        self.poll()
+        return job
+
+    def poll(self):
+        """
+        Collect the results of the finished chunks and hand the queued chunks
+        to the idle workers
+        """
+        for idx, worker in enumerate(self.workers):
+            if worker.job is None:
+                continue
+            ret = None
+            if worker.conn.poll():
+                try:
+                    ret = msgpack_deserialize(worker.conn.recv_bytes())
+                except (EOFError, OSError):
+                    pass
+            elif worker.proc.is_alive():
+                continue
+            worker.job.finish(ret)
+            worker.job = None
+            if ret is None:
+                log.error("Parallel state worker %s died, restarting it", worker.proc)
+                worker.conn.close()
+                worker.proc.join()
+                self.workers[idx] = self._start_worker()
+        for worker in self.workers:
+            if not self.queue:
+                break
+            if worker.job is None:
+                worker.job = self.queue.popleft()
+                worker.conn.send_bytes(worker.job.payload)
+
+    def sentinels(self):
+        """
+        Return the objects which become ready when a busy worker finishes its
+        chunk or dies
+        """
+        ret = []
+        for worker in self.workers:
+            if worker.job is not None:
+                ret.extend((worker.conn, worker.proc.sentinel))
+        return ret
+
+    def close(self):
+        """
+        Wait for the submitted chunks to finish and stop the workers
+        """
+        while self.queue or any(worker.job for worker in self.workers):
+            self.poll()
+            time.sleep(0.01)
+        for worker in self.workers:
+            try:
+                worker.conn.send_bytes(b"")
+            except OSError:
+                pass
+        for worker in self.workers:
+            worker.proc.join(5)
+            if worker.proc.is_alive():
+                worker.proc.terminate()
+            worker.conn.close()
+        self.workers = []
+
+
 class State:
     """
     Class used to execute salt states
@@ -788,6 +928,7 @@ class State:
         else:
             self.state_con = context
         self.state_con["fileclient"] = self.file_client
+        self._parallel_pool = None
         self.load_modules()
         self.mod_init = set()
         self.pre = {}
@@ -796,9 +937,18 @@ class State:
         self.invocation_id = _invocation_id
         self.instance_id = str(id(self))
         self.inject_globals = {}
+        # onlyif/unless command retcodes reused while no state reports changes
+        self._guard_cache = {}
+        self._guard_cache_hits = 0
+        # Results of the finished chunks not streamed to the master yet
+        self._stream_buffer = {}
+        self._stream_seq = 0
         self.mocked = mocked
         self.global_state_conditions = None
         self.dependency_dag = DependencyGraph()
+        self.profiler = salt.utils.stateprofile.StateProfiler(
+            enabled=bool(self.opts.get("state_profile"))
+        )
         # a mapping of state tag (unique id) to the return result dict
         self.disabled_states: Optional[dict[str, dict[str, Any]]] = None
 
@@ -984,6 +1134,27 @@ class State:
 
         return ret
 
+    def _run_check_retcode(self, cmd: str, cmd_opts: dict[str, Any]) -> int:
+        """
+        Return the retcode of an onlyif/unless command. With
+        ``state_guard_cache`` enabled, the retcode of a command already run
+        with the same options is reused until a state reports changes.
+        """
+        if not self.opts.get("state_guard_cache"):
+            return self.functions["cmd.retcode"](
+                cmd, ignore_retcode=True, python_shell=True, **cmd_opts
+            )
+        key = (cmd, repr(sorted(cmd_opts.items())))
+        if key in self._guard_cache:
+            log.debug("Using the cached return code of command: %s", cmd)
+            self._guard_cache_hits += 1
+            return self._guard_cache[key]
+        retcode = self.functions["cmd.retcode"](
+            cmd, ignore_retcode=True, python_shell=True, **cmd_opts
+        )
+        self._guard_cache[key] = retcode
+        return retcode
+
     def _run_check_function(self, entry):
         """Format slot args and run unless/onlyif function."""
         fun = entry.pop("fun")
@@ -1025,9 +1196,7 @@ class State:
         for entry in low_onlyif:
             if isinstance(entry, str):
                 try:
-                    cmd = self.functions["cmd.retcode"](
-                        entry, ignore_retcode=True, python_shell=True, **cmd_opts
-                    )
+                    cmd = self._run_check_retcode(entry, cmd_opts)
                 except CommandExecutionError:
                     # Command failed, notify onlyif to skip running the item
                     cmd = 100
@@ -1103,9 +1272,7 @@ class State:
         for entry in low_unless:
             if isinstance(entry, str):
                 try:
-                    cmd = self.functions["cmd.retcode"](
-                        entry, ignore_retcode=True, python_shell=True, **cmd_opts
-                    )
+                    cmd = self._run_check_retcode(entry, cmd_opts)
                     log.debug("Last command return code: %s", cmd)
                 except CommandExecutionError:
                     # Command failed, so notify unless to skip the item
@@ -1234,6 +1401,8 @@ class State:
         """
         Load the modules into the state
         """
+        # The pool workers would keep running with the old modules
+        self._close_parallel_pool()
         log.info("Loading fresh modules for state activity")
         self.utils = salt.loader.utils(self.opts, file_client=self.file_client)
         self.functions = salt.loader.minion_mods(
@@ -1290,6 +1459,8 @@ class State:
                 log.error(
                     "Error encountered during module reload. Modules were not reloaded."
                 )
+        # A dependency of the __virtual__ functions may have been installed
+        salt.loader.virtualcache.invalidate(self.opts["cachedir"])
         self.load_modules()
         if not self.opts.get("local", False) and self.opts.get("multiprocessing", True):
             self.functions["saltutil.refresh_modules"]()
@@ -1436,7 +1607,7 @@ class State:
         try:
             # Get nodes in topological order also sorted by order attribute
             sorted_chunks = self.dependency_dag.aggregate_and_order_chunks(cap)
-        except nx.NetworkXUnfeasible:
+        except RequisiteCycleError:
             sorted_chunks = []
             cycle_edges = self.dependency_dag.get_cycles_str()
             errors.append(f"Recursive requisites were found: {cycle_edges}")
@@ -1539,7 +1710,8 @@ class State:
                             )
                             chunks.append(live)
                             break
-        chunks, errors = self.order_chunks(chunks)
+        with self.profiler.phase("order_chunks"):
+            chunks, errors = self.order_chunks(chunks)
         self.disabled = disabled
         return chunks, errors
 
@@ -1914,12 +2086,65 @@ class State:
         if instance is None:
             instance = cls(**init_kwargs)
             instance.states.inject_globals = inject_globals
+        ret = cls._run_parallel_chunk(instance, name, cdata, low)
+
+        tag = _gen_tag(low)
+        troot = os.path.join(instance.opts["cachedir"], instance.invocation_id)
+        tfile = os.path.join(troot, salt.utils.hashutils.sha1_digest(tag))
+        if not os.path.isdir(troot):
+            try:
+                os.makedirs(troot)
+            except OSError:
+                # Looks like the directory was created between the check
+                # and the attempt, we are safe to pass
+                pass
+        with salt.utils.files.fopen(tfile, "wb+") as fp_:
+            fp_.write(msgpack_serialize(ret))
+
+    @classmethod
+    def _parallel_pool_worker(cls, instance, init_kwargs, conn):
+        """
+        The target function of the ParallelStatePool worker processes. Runs
+        the chunks received over ``conn`` until an empty message is received
+        or the pool goes away.
+        """
+        if instance is None:
+            instance = cls(**init_kwargs)
+        while True:
+            try:
+                task = conn.recv_bytes()
+            except (EOFError, OSError):
+                break
+            if not task:
+                break
+            name, cdata, low, inject_globals = pickle.loads(task)
+            instance.states.inject_globals = inject_globals
+            ret = cls._run_parallel_chunk(instance, name, cdata, low)
+            instance.states.inject_globals = {}
+            try:
+                data = msgpack_serialize(ret)
+            except Exception as exc:  # pylint: disable=broad-except
+                data = msgpack_serialize(
+                    {
+                        "result": False,
+                        "name": name,
+                        "changes": {},
+                        "comment": f"Unable to serialize the state return: {exc}",
+                        "__parallel__": True,
+                    }
+                )
+            conn.send_bytes(data)
+
+    @staticmethod
+    def _run_parallel_chunk(instance, name, cdata, low):
+        """
+        Run the state function of a parallel chunk and return its result
+        """
         # we need to re-record start/end duration here because it is impossible to
         # correctly calculate further down the chain
         utc_start_time = datetime.datetime.utcnow()
 
         instance.format_slots(cdata)
-        tag = _gen_tag(low)
         try:
             ret = instance.states[cdata["full"]](*cdata["args"], **cdata["kwargs"])
         except Exception as exc:  # pylint: disable=broad-except
@@ -2005,18 +2230,7 @@ class State:
                         "is returned".format(**low["retry"]),
                     ]
                 )
-
-        troot = os.path.join(instance.opts["cachedir"], instance.invocation_id)
-        tfile = os.path.join(troot, salt.utils.hashutils.sha1_digest(tag))
-        if not os.path.isdir(troot):
-            try:
-                os.makedirs(troot)
-            except OSError:
-                # Looks like the directory was created between the check
-                # and the attempt, we are safe to pass
-                pass
-        with salt.utils.files.fopen(tfile, "wb+") as fp_:
-            fp_.write(msgpack_serialize(ret))
+        return ret
 
     def call_parallel(
         self,
@@ -2036,16 +2250,42 @@ class State:
         if not name:
             name = low.get("name", low.get("__id__"))
 
+        proc = None
+        if self.opts.get("state_parallel_pool"):
+            proc = self._submit_parallel_pool(name, cdata, low, inject_globals)
+        if proc is None:
+            if not salt.utils.platform.spawning_platform():
+                inject_globals = None
+            proc = self._start_parallel_process(
+                self._call_parallel_target,
+                f"ParallelState({name})",
+                name,
+                cdata,
+                low,
+                inject_globals,
+            )
+        ret = {
+            "name": name,
+            "result": None,
+            "changes": {},
+            "comment": "Started in a separate process",
+            "proc": proc,
+        }
+        return ret
+
+    def _start_parallel_process(self, target, name, *args):
+        """
+        Start a process calling ``target`` with this instance, or with None
+        on spawning platforms, the arguments to create a new instance and
+        ``args``
+        """
         if salt.utils.platform.spawning_platform():
             instance = None
         else:
             instance = self
-            inject_globals = None
 
         proc = salt.utils.process.Process(
-            target=self._call_parallel_target,
-            args=(instance, self._init_kwargs, name, cdata, low, inject_globals),
-            name=f"ParallelState({name})",
+            target=target, args=(instance, self._init_kwargs) + args, name=name
         )
         try:
             proc.start()
@@ -2066,19 +2306,55 @@ class State:
             init_kwargs = self._init_kwargs.copy()
             init_kwargs["context"] = clean_context
             proc = salt.utils.process.Process(
-                target=self._call_parallel_target,
-                args=(instance, init_kwargs, name, cdata, low, inject_globals),
-                name=f"ParallelState({name})",
+                target=target, args=(instance, init_kwargs) + args, name=name
             )
             proc.start()
-        ret = {
-            "name": name,
-            "result": None,
-            "changes": {},
-            "comment": "Started in a separate process",
-            "proc": proc,
-        }
-        return ret
+        return proc
+
+    def _submit_parallel_pool(
+        self,
+        name: str,
+        cdata: dict[str, Any],
+        low: LowChunk,
+        inject_globals: dict[Any, Any],
+    ) -> Optional[ParallelStateJob]:
+        """
+        Send the chunk to the parallel state pool, starting the pool if needed.
+        Returns None if the chunk cannot be sent to the pool workers.
+        """
+        running = inject_globals.get("__running__")
+        if running:
+            # The parallel chunks still running cannot be sent over
+            inject_globals = dict(inject_globals)
+            inject_globals["__running__"] = immutabletypes.freeze(
+                {
+                    tag: {key: val for key, val in ret.items() if key != "proc"}
+                    for tag, ret in running.items()
+                }
+            )
+        try:
+            payload = pickle.dumps((name, cdata, low, inject_globals))
+        except Exception as exc:  # pylint: disable=broad-except
+            log.debug(
+                "Running state %s in a separate process, it cannot be sent to "
+                "the parallel state pool: %s",
+                name,
+                exc,
+            )
+            return None
+        if self._parallel_pool is None:
+            self._parallel_pool = ParallelStatePool(
+                self, self.opts["state_parallel_pool"]
+            )
+        return self._parallel_pool.submit(name, payload)
+
+    def _close_parallel_pool(self) -> None:
+        """
+        Stop the parallel state pool once its chunks have finished
+        """
+        if getattr(self, "_parallel_pool", None) is not None:
+            self._parallel_pool.close()
+            self._parallel_pool = None
 
     @salt.utils.decorators.state.OutputUnifier("content_check", "unify")
     def call(
@@ -2092,6 +2368,16 @@ class State:
         Call a state directly with the low data structure, verify data
         before processing.
         """
+        with self.profiler.phase(_gen_tag(low)):
+            return self._call(low, chunks, running, retries)
+
+    def _call(
+        self,
+        low: LowChunk,
+        chunks: Optional[Sequence[LowChunk]],
+        running: Optional[dict[str, dict]],
+        retries: int,
+    ):
         utc_start_time = datetime.datetime.utcnow()
         local_start_time = utc_start_time - (
             datetime.datetime.utcnow() - datetime.datetime.now()
@@ -2128,6 +2414,7 @@ class State:
         else:
             self.state_con["runas_password"] = low.get("runas_password", None)
 
+        guard_cache_hits = self._guard_cache_hits
         if not low.get("__prereq__"):
             log.info(
                 "Executing state %s.%s for [%s]",
@@ -2182,7 +2469,8 @@ class State:
                 any(req in low for req in req_list)
                 and "{0[state]}.mod_run_check".format(low) not in self.states
             ):
-                ret.update(self._run_check(low))
+                with self.profiler.phase("guard_checks"):
+                    ret.update(self._run_check(low))
 
             if not self.opts.get("lock_saltenv", False):
                 # NOTE: Overriding the saltenv when lock_saltenv is blocked in
@@ -2222,10 +2510,14 @@ class State:
                         )
                     elif not low.get("__prereq__") and low.get("parallel"):
                         # run the state call in parallel, but only if not in a prereq
-                        ret = self.call_parallel(cdata, low, inject_globals)
+                        with self.profiler.phase("call_parallel"):
+                            ret = self.call_parallel(cdata, low, inject_globals)
                     else:
-                        self.format_slots(cdata)
-                        with salt.utils.files.set_umask(low.get("__umask__")):
+                        with self.profiler.phase("format_slots"):
+                            self.format_slots(cdata)
+                        with salt.utils.files.set_umask(
+                            low.get("__umask__")
+                        ), self.profiler.phase("function"):
                             ret = self.states[cdata["full"]](
                                 *cdata["args"], **cdata["kwargs"]
                             )
@@ -2286,6 +2578,8 @@ class State:
         self.__run_num += 1
         format_log(ret)
         self.check_refresh(low, ret)
+        if ret.get("changes"):
+            self._guard_cache.clear()
         utc_finish_time = datetime.datetime.utcnow()
         timezone_delta = datetime.datetime.utcnow() - datetime.datetime.now()
         local_finish_time = utc_finish_time - timezone_delta
@@ -2295,6 +2589,9 @@ class State:
         # duration in milliseconds.microseconds
         duration = (delta.seconds * 1000000 + delta.microseconds) / 1000.0
         ret["duration"] = duration
+        guard_cache_hits = self._guard_cache_hits - guard_cache_hits
+        if guard_cache_hits:
+            ret["guard_cache_hits"] = guard_cache_hits
         ret["__id__"] = low["__id__"]
         log.info(
             "Completed state [%s] at time %s (duration_in_ms=%s)",
@@ -2520,27 +2817,137 @@ class State:
                 self._check_disabled(chunk, disabled)
         else:
             disabled = disabled_states
+        self._guard_cache.clear()
         running = {}
-        for low in chunks:
-            if "__FAILHARD__" in running:
-                running.pop("__FAILHARD__")
-                return running
-            tag = _gen_tag(low)
-            if tag not in running:
-                # Check if this low chunk is paused
-                action = self.check_pause(low)
-                if action == "kill":
-                    break
-                running = self.call_chunk(low, running, chunks)
-                if self.check_failhard(low, running):
+        workers = self.opts.get("state_parallel_workers") or 0
+        if workers > 0 and not self.opts["failhard"] and self.dependency_dag.dag:
+            # The chunks already started in parallel are still collected when
+            # the run is stopped by failhard or a kill request
+            self._call_chunks_wavefront(chunks, running, workers)
+            running.pop("__FAILHARD__", None)
+        else:
+            for low in chunks:
+                if "__FAILHARD__" in running:
+                    running.pop("__FAILHARD__")
                     return running
-        while True:
-            if self.reconcile_procs(running):
-                break
-            time.sleep(0.01)
+                tag = _gen_tag(low)
+                if tag not in running:
+                    # Check if this low chunk is paused
+                    action = self.check_pause(low)
+                    if action == "kill":
+                        break
+                    running = self.call_chunk(low, running, chunks)
+                    if self.check_failhard(low, running):
+                        return running
+        while not self.reconcile_procs(running):
+            self._wait_procs(running)
         ret = dict(list(disabled.items()) + list(running.items()))
         return ret
 
+    def _wait_procs(self, running: dict[str, dict], timeout: float = 1) -> None:
+        """
+        Wait until one of the parallel processes of the running data finishes,
+        or at most ``timeout`` seconds
+        """
+        sentinels = set()
+        for ret in running.values():
+            proc = ret.get("proc")
+            if isinstance(proc, ParallelStateJob):
+                sentinels.update(proc.pool.sentinels())
+            elif proc:
+                sentinels.add(proc.sentinel)
+        if sentinels:
+            multiprocessing.connection.wait(list(sentinels), timeout)
+        else:
+            time.sleep(0.01)
+
+    def _wavefront_eligible(self, low: LowChunk) -> bool:
+        """
+        Check if the low chunk can be run in a separate process by the
+        wavefront scheduler
+        """
+        if low.get("parallel") is False or low.get("failhard"):
+            return False
+        if any(
+            key in low
+            for key in (
+                "__prereq__",
+                "__prerequiring__",
+                RequisiteType.WATCH.value,
+                RequisiteType.WATCH_ANY.value,
+                RequisiteType.PREREQ.value,
+                "reload_modules",
+                "reload_grains",
+                "reload_pillar",
+            )
+        ):
+            return False
+        return f"{low['state']}.mod_aggregate" not in self.states or not (
+            self.dependency_dag.get_aggregate_chunks(low)
+        )
+
+    def _call_chunks_wavefront(
+        self, chunks: Sequence[LowChunk], running: dict[str, dict], workers: int
+    ) -> bool:
+        """
+        Run the chunks, starting every eligible chunk in a separate process as
+        soon as all of its requisites have finished, with at most ``workers``
+        processes running at once.
+
+        Chunks which are not eligible act as barriers: they only run once all
+        the chunks before them have finished, and no chunk after them is
+        started before they have run.
+
+        :return: False if the run was stopped by failhard or a kill request
+        """
+        pending = list(chunks)
+        stopped = False
+        while pending and not stopped:
+            self.reconcile_procs(running)
+            busy = sum(1 for ret in running.values() if "proc" in ret)
+            pending_tags = {_gen_tag(low) for low in pending}
+            remaining = []
+            blocked = False
+            for low in pending:
+                tag = _gen_tag(low)
+                if tag in running:
+                    # The chunk was already run as a requisite of another chunk
+                    pending_tags.discard(tag)
+                    continue
+                if blocked:
+                    # Nothing is started past a barrier which has not run yet
+                    remaining.append(low)
+                    continue
+                eligible = self._wavefront_eligible(low)
+                if eligible:
+                    ready = busy < workers and all(
+                        _gen_tag(req) not in pending_tags
+                        and not running.get(_gen_tag(req), {}).get("proc")
+                        for _, req in self.dependency_dag.get_dependencies(low)
+                    )
+                else:
+                    ready = not remaining and not busy
+                    blocked = not ready
+                if not ready:
+                    remaining.append(low)
+                    continue
+                if self.check_pause(low) == "kill":
+                    stopped = True
+                    break
+                pending_tags.discard(tag)
+                if eligible:
+                    low["parallel"] = True
+                self.call_chunk(low, running, chunks)
+                if "__FAILHARD__" in running or self.check_failhard(low, running):
+                    stopped = True
+                    break
+                if "proc" in running.get(tag, {}):
+                    busy += 1
+            if not stopped and len(remaining) == len(pending):
+                self._wait_procs(running)
+            pending = remaining
+        return not stopped
+
     def check_failhard(self, low: LowChunk, running: dict[str, dict]):
         """
         Check if the low data chunk should send a failhard signal
@@ -2601,6 +3008,34 @@ class State:
                 return "run"
         return "run"
 
+    def _read_parallel_ret(self, tag: str, name: str) -> dict[str, Any]:
+        """
+        Read the result a parallel process wrote to the cachedir
+        """
+        ret_cache = os.path.join(
+            self.opts["cachedir"],
+            self.invocation_id,
+            salt.utils.hashutils.sha1_digest(tag),
+        )
+        if not os.path.isfile(ret_cache):
+            ret = {
+                "result": False,
+                "comment": "Parallel process failed to return",
+                "name": name,
+                "changes": {},
+            }
+        try:
+            with salt.utils.files.fopen(ret_cache, "rb") as fp_:
+                ret = msgpack_deserialize(fp_.read())
+        except OSError:
+            ret = {
+                "result": False,
+                "comment": "Parallel cache failure",
+                "name": name,
+                "changes": {},
+            }
+        return ret
+
     def reconcile_procs(self, running: dict) -> bool:
         """
         Check the running dict for processes and resolve them
@@ -2610,30 +3045,16 @@ class State:
             proc = running[tag].get("proc")
             if proc:
                 if not proc.is_alive():
-                    ret_cache = os.path.join(
-                        self.opts["cachedir"],
-                        self.invocation_id,
-                        salt.utils.hashutils.sha1_digest(tag),
-                    )
-                    if not os.path.isfile(ret_cache):
-                        ret = {
-                            "result": False,
-                            "comment": "Parallel process failed to return",
-                            "name": running[tag]["name"],
-                            "changes": {},
-                        }
-                    try:
-                        with salt.utils.files.fopen(ret_cache, "rb") as fp_:
-                            ret = msgpack_deserialize(fp_.read())
-                    except OSError:
-                        ret = {
-                            "result": False,
-                            "comment": "Parallel cache failure",
-                            "name": running[tag]["name"],
-                            "changes": {},
-                        }
+                    if isinstance(proc, ParallelStateJob):
+                        # The pool sends the result back over a pipe
+                        ret = proc.ret
+                    else:
+                        ret = self._read_parallel_ret(tag, running[tag]["name"])
+                    if ret.get("changes"):
+                        self._guard_cache.clear()
                     running[tag].update(ret)
                     running[tag].pop("proc")
+                    self._stream_result(tag, running[tag])
                 else:
                     retset.add(False)
         return False not in retset
@@ -2643,33 +3064,26 @@ class State:
         Look into the running data to check the status of all requisite
         states.
         """
-        reqs = {}
-        for req_type, chunk in self.dependency_dag.get_dependencies(low):
-            reqs.setdefault(req_type, []).append(chunk)
+        # The requisite chunks and their tags are looked up once per chunk
+        # by the dependency graph, so the tags are not generated again here
+        requisites = self.dependency_dag.get_requisites(low)
+        reqs = {r_type: chunks for r_type, (chunks, _) in requisites.items()}
         fun_stats = set()
-        for r_type, chunks in reqs.items():
+        for r_type, (_, tags) in requisites.items():
             req_stats = set()
-            r_type_base = re.sub(r"_any$|_all$", "", r_type)
+            r_type_base = REQUISITE_BASE_TYPES[r_type]
             if r_type_base == RequisiteType.PREREQ.value:
                 run_dict = self.pre
             else:
                 run_dict = running
 
-            filtered_run_dict = {}
-            for chunk in chunks:
-                tag = _gen_tag(chunk)
-                run_dict_chunk = run_dict.get(tag)
-                if run_dict_chunk:
-                    filtered_run_dict[tag] = run_dict_chunk
-            run_dict = filtered_run_dict
-
-            while True:
-                if self.reconcile_procs(run_dict):
-                    break
-                time.sleep(0.01)
+            run_dict = {tag: run_dict[tag] for tag in tags if run_dict.get(tag)}
 
-            for chunk in chunks:
-                tag = _gen_tag(chunk)
+            if any("proc" in tag_ret for tag_ret in run_dict.values()):
+                while not self.reconcile_procs(run_dict):
+                    self._wait_procs(run_dict)
+
+            for tag in tags:
                 if tag not in run_dict:
                     req_stats.add("unmet")
                     continue
@@ -2954,9 +3368,71 @@ class State:
                 }
                 for key in ("__sls__", "__id__", "name"):
                     running[sub_tag][key] = low.get(key)
+                self._stream_result(sub_tag, running[sub_tag])
+            if "proc" not in running[tag]:
+                self._stream_result(tag, running[tag])
 
         return running
 
+    def _stream_enabled(self) -> bool:
+        """
+        Check if the chunk results should be streamed to the master while the
+        state run is in progress
+        """
+        return bool(
+            self.opts.get("state_stream_batch")
+            and salt.utils.jid.is_jid(self.jid)
+            and not self.opts.get("local")
+            and self.opts.get("file_client") != "local"
+            and self.opts.get("__cli") != "salt-call"
+        )
+
+    def _stream_result(self, tag: str, ret: dict[str, Any]) -> None:
+        """
+        Queue the result of a finished chunk to be streamed to the master and
+        send the queued results once there are ``state_stream_batch`` of them
+        """
+        if not self._stream_enabled():
+            return
+        self._stream_buffer[tag] = ret
+        if len(self._stream_buffer) >= self.opts["state_stream_batch"]:
+            self.flush_stream()
+
+    def flush_stream(self) -> None:
+        """
+        Send the queued chunk results to the master as a partial return of the
+        job. The master stores them in the job cache until the minion sends
+        the full return of the job.
+        """
+        if not self._stream_buffer:
+            return
+        load = {
+            "cmd": "_return",
+            "id": self.opts["id"],
+            "jid": self.jid,
+            "return": self._stream_buffer,
+            "partial": True,
+            "seq": self._stream_seq,
+        }
+        self._stream_buffer = {}
+        self._stream_seq += 1
+        try:
+            if self.opts["minion_sign_messages"]:
+                minion_privkey_path = os.path.join(self.opts["pki_dir"], "minion.pem")
+                load["sig"] = salt.crypt.sign_message(
+                    minion_privkey_path, msgpack_serialize(load)
+                )
+            # The main minion process sends the payload over its channel
+            with salt.utils.event.get_event(
+                "minion", opts=self.opts, listen=False
+            ) as event:
+                event.fire_event(
+                    load,
+                    f"__master_req_channel_payload/{uuid.uuid4()}/{self.opts['master']}",
+                )
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error("Unable to stream state results to the master: %s", exc)
+
     def _assign_not_run_result_dict(
         self,
         low: LowChunk,
@@ -3162,22 +3638,34 @@ class State:
         errors.extend(self.verify_high(high))
         if errors:
             return errors
-        high, req_in_errors = self.requisite_in(high)
+        with self.profiler.phase("requisite_in"):
+            high, req_in_errors = self.requisite_in(high)
         errors.extend(req_in_errors)
         high = self.apply_exclude(high)
         # Verify that the high data is structurally sound
         if errors:
             return errors
         # Compile and verify the raw chunks
-        chunks, errors = self.compile_high_data(high, orchestration_jid)
+        with self.profiler.phase("compile_high_data"):
+            chunks, errors = self.compile_high_data(high, orchestration_jid)
         if errors:
             return errors
         # If there are extensions in the highstate, process them and update
         # the low data chunks
 
-        ret = self.call_chunks(chunks, disabled_states=self.disabled_states)
-        ret = self.call_listen(chunks, ret)
-        ret = self.call_beacons(chunks, ret)
+        try:
+            with self.profiler.phase("call_chunks"):
+                ret = self.call_chunks(chunks, disabled_states=self.disabled_states)
+            with self.profiler.phase("call_listen"):
+                ret = self.call_listen(chunks, ret)
+            with self.profiler.phase("call_beacons"):
+                ret = self.call_beacons(chunks, ret)
+        finally:
+            self._close_parallel_pool()
+        self.flush_stream()
+        if self.profiler.enabled:
+            self.profiler.write(self.opts["cachedir"], self.jid or self.invocation_id)
+            self.profiler.clear()
 
         def _cleanup_accumulator_data():
             accum_data_path = os.path.join(
@@ -3314,6 +3802,7 @@ class State:
         return self.call_high(high)
 
     def destroy(self):
+        self._close_parallel_pool()
         if not self.preserve_file_client:
             self.file_client.close()
 
@@ -3384,6 +3873,7 @@ class BaseHighState:
         self.iorder = 10000
         self.avail = self.__gather_avail()
         self.building_highstate = HashableOrderedDict()
+        self._render_cache = None
 
     def __gather_avail(self):
         """
@@ -3953,6 +4443,9 @@ class BaseHighState:
         """
         Render a state file and retrieve all of the include states
         """
+        # Late import, salt.utils.jinja pulls in jinja2
+        import salt.utils.jinja
+
         errors = []
         if not local:
             state_data = self.client.get_state(sls, saltenv)
@@ -3971,18 +4464,34 @@ class BaseHighState:
                 "fileserver".format(sls, saltenv)
             )
         else:
+            render_cache = self._get_render_cache(context)
+            if render_cache is not None:
+                state = render_cache.get(sls, saltenv, fn_, self.state.opts["renderer"])
             try:
-                state = compile_template(
-                    fn_,
-                    self.state.rend,
-                    self.state.opts["renderer"],
-                    self.state.opts["renderer_blacklist"],
-                    self.state.opts["renderer_whitelist"],
-                    saltenv,
-                    sls,
-                    rendered_sls=mods,
-                    context=context,
-                )
+                if state is None:
+                    with salt.utils.jinja.track_templates() as templates, (
+                        self.state.profiler.phase(f"render_state:{saltenv}:{sls}")
+                    ):
+                        state = compile_template(
+                            fn_,
+                            self.state.rend,
+                            self.state.opts["renderer"],
+                            self.state.opts["renderer_blacklist"],
+                            self.state.opts["renderer_whitelist"],
+                            saltenv,
+                            sls,
+                            rendered_sls=mods,
+                            context=context,
+                        )
+                    if render_cache is not None and isinstance(state, dict):
+                        render_cache.set(
+                            sls,
+                            saltenv,
+                            fn_,
+                            self.state.opts["renderer"],
+                            templates,
+                            state,
+                        )
             except SaltRenderError as exc:
                 msg = f"Rendering SLS '{saltenv}:{sls}' failed: {exc}"
                 log.critical(msg)
@@ -4161,6 +4670,22 @@ class BaseHighState:
             state = {}
         return state, errors
 
+    def _get_render_cache(self, context=None):
+        """
+        Return the persistent SLS render cache if ``state_render_cache`` is
+        enabled, otherwise ``None``
+        """
+        if not self.opts.get("state_render_cache") or context is not None:
+            return None
+        if self._render_cache is None:
+            self._render_cache = salt.utils.slscache.SLSRenderCache(
+                self.opts,
+                self.client,
+                self.state.opts["pillar"],
+                self.state.opts["grains"],
+            )
+        return self._render_cache
+
     def _handle_iorder(self, state):
         """
         Take a state and apply the iorder system
@@ -4347,6 +4872,8 @@ class BaseHighState:
                     all_errors.extend(errors)
 
         self.clean_duplicate_extends(highstate)
+        if self._render_cache is not None:
+            self._render_cache.save()
         return highstate, all_errors
 
     def clean_duplicate_extends(self, highstate):
@@ -4445,7 +4972,8 @@ class BaseHighState:
         # File exists so continue
         err = []
         try:
-            top = self.get_top()
+            with self.state.profiler.phase("get_tops"):
+                top = self.get_top()
         except SaltRenderError as err:
             ret[tag_name]["comment"] = "Unable to render top file: "
             ret[tag_name]["comment"] += str(err.error)
@@ -4455,7 +4983,8 @@ class BaseHighState:
             err.append(trb)
             return err
         err += self.verify_tops(top)
-        matches = self.top_matches(top)
+        with self.state.profiler.phase("top_matches"):
+            matches = self.top_matches(top)
         if not matches:
             msg = (
                 "No Top file or master_tops data matches found. Please see "
@@ -4469,7 +4998,8 @@ class BaseHighState:
             err += ["Pillar failed to render with the following messages:"]
             err += self.state.opts["pillar"]["_errors"]
         else:
-            high, errors = self.render_highstate(matches)
+            with self.state.profiler.phase("render_highstate"):
+                high, errors = self.render_highstate(matches)
             if exclude:
                 if isinstance(exclude, str):
                     exclude = exclude.split(",")
@@ -11,6 +11,7 @@ import time
 import salt.utils.data
 import salt.utils.files
 import salt.utils.sanitizers
+import salt.utils.stateprofile
 import salt.utils.stringio
 import salt.utils.versions
 
@@ -97,7 +98,10 @@ def compile_template(
         if argline:
             render_kwargs["argline"] = argline
         start = time.time()
-        ret = render(input_data, saltenv, sls, **render_kwargs)
+        with salt.utils.stateprofile.phase(
+            "renderer:{}".format(render.__module__.split(".")[-1])
+        ):
+            ret = render(input_data, saltenv, sls, **render_kwargs)
         log.profile(
             "Time (in seconds) to render '%s' using '%s' renderer: %s",
             template,
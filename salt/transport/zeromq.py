@@ -533,7 +533,12 @@ class RequestServer(salt.transport.base.DaemonizedRequestServer):
         """
         # context = zmq.Context(1)
         self.context = zmq.asyncio.Context(1)
-        self._socket = self.context.socket(zmq.REP)
+        if self.opts.get("worker_blocking_threads"):
+            # A dealer socket lets the worker reply in any order, to handle
+            # several requests at once
+            self._socket = self.context.socket(zmq.DEALER)
+        else:
+            self._socket = self.context.socket(zmq.REP)
         # Linger -1 means we'll never discard messages.
         self._socket.setsockopt(zmq.LINGER, -1)
         self._start_zmq_monitor()
@@ -555,7 +560,10 @@ class RequestServer(salt.transport.base.DaemonizedRequestServer):
         self.message_handler = message_handler
 
         async def callback():
-            task = asyncio.create_task(self.request_handler())
+            if self.opts.get("worker_blocking_threads"):
+                task = asyncio.create_task(self.concurrent_request_handler())
+            else:
+                task = asyncio.create_task(self.request_handler())
             task.add_done_callback(self.tasks.discard)
             self.tasks.add(task)
 
@@ -573,6 +581,42 @@ class RequestServer(salt.transport.base.DaemonizedRequestServer):
                 log.error("Exception in request handler", exc_info=True)
                 break
 
+    async def concurrent_request_handler(self):
+        """
+        Handle up to worker_max_inflight requests at once, replying to each
+        one as soon as it is handled
+        """
+        inflight = asyncio.Semaphore(self.opts["worker_max_inflight"])
+        while not self._event.is_set():
+            await inflight.acquire()
+            try:
+                frames = await asyncio.wait_for(self._socket.recv_multipart(), 0.3)
+            except asyncio.exceptions.TimeoutError:
+                inflight.release()
+                continue
+            except Exception as exc:  # pylint: disable=broad-except
+                inflight.release()
+                log.error("Exception in request handler", exc_info=True)
+                break
+            task = asyncio.create_task(self._handle_frames(frames, inflight))
+            task.add_done_callback(self.tasks.discard)
+            self.tasks.add(task)
+
+    async def _handle_frames(self, frames, inflight):
+        """
+        Handle a request received on the dealer socket, the frames before the
+        payload route the reply back to the client
+        """
+        try:
+            reply = await self.handle_message(None, frames[-1])
+            await self._socket.send_multipart(
+                frames[:-1] + [self.encode_payload(reply)]
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error("Exception in request handler", exc_info=True)
+        finally:
+            inflight.release()
+
     async def handle_message(self, stream, payload):
         try:
             payload = self.decode_payload(payload)
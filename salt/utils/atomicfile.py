@@ -12,10 +12,10 @@ import tempfile
 import time
 
 import salt.utils.files
-import salt.utils.win_dacl
 
 CAN_RENAME_OPEN_FILE = False
 if os.name == "nt":  # pragma: no cover
+    import salt.utils.win_dacl
 
     def _rename(src, dst):
         return False
@@ -129,7 +129,7 @@ class _AtomicWFile:
         if self._fh.closed:
             return
         self._fh.close()
-        if salt.utils.win_dacl.HAS_WIN32:
+        if os.name == "nt" and salt.utils.win_dacl.HAS_WIN32:
             if os.path.isfile(self._filename):
                 salt.utils.win_dacl.copy_security(
                     source=self._filename, target=self._tmp_filename
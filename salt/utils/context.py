@@ -236,3 +236,207 @@ class NamespacedDictWrapper(MutableMapping, dict):
 
     def __str__(self):
         return self._dict().__str__()
+
+
+def _copy_on_write(value):
+    """
+    Wrap the dicts and lists of a copy on write container, other values are
+    returned as they are
+    """
+    if isinstance(value, dict):
+        return CopyOnWriteDict(value)
+    if isinstance(value, list):
+        return CopyOnWriteList(value)
+    return value
+
+
+class CopyOnWriteDict(dict):
+    """
+    A dict which shares its nested dicts and lists with the dict it was
+    created from, until they are accessed.
+
+    Creating it only copies the top level of the dict. A nested dict or list
+    is copied, the same way, the first time it is read, so changes never reach
+    the original dict while the parts which are only read are never copied.
+    This makes it a cheap replacement for a deep copy of large data which is
+    mostly read, like the pillar and grains.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The keys of the values which belong to this dict
+        self._owned = set(kwargs)
+
+    def _get(self, key):
+        value = dict.__getitem__(self, key)
+        if key not in self._owned:
+            value = _copy_on_write(value)
+            dict.__setitem__(self, key, value)
+            self._owned.add(key)
+        return value
+
+    def __getitem__(self, key):
+        return self._get(key)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._owned.add(key)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._owned.discard(key)
+
+    def __iter__(self):
+        # Defining __iter__ makes dict(self) and {**self} read the values
+        # through __getitem__ instead of sharing them
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self._get(key)
+        return default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self._get(key)
+
+    def pop(self, key, *args):
+        if key in self:
+            value = self._get(key)
+            del self[key]
+            return value
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        key = next(reversed(self.keys()))
+        return key, self.pop(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def values(self):
+        return [self._get(key) for key in self.keys()]
+
+    def items(self):
+        return [(key, self._get(key)) for key in self.keys()]
+
+    def __or__(self, other):
+        return dict(self) | other
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def copy(self):
+        return CopyOnWriteDict(self)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class CopyOnWriteList(list):
+    """
+    The list counterpart of :py:class:`CopyOnWriteDict`
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        # The indexes of the values which belong to this list
+        self._owned = set()
+
+    def _get(self, index):
+        value = list.__getitem__(self, index)
+        if index not in self._owned:
+            value = _copy_on_write(value)
+            list.__setitem__(self, index, value)
+            self._owned.add(index)
+        return value
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(idx) for idx in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._get(index)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            # The indexes may move
+            self._own_all()
+            list.__setitem__(self, index, value)
+            self._owned = set(range(len(self)))
+        else:
+            list.__setitem__(self, index, value)
+            self._owned.add(index if index >= 0 else index + len(self))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._get(index)
+
+    def _own_all(self):
+        """
+        Take ownership of all the values before the indexes move
+        """
+        for index in range(len(self)):
+            self._get(index)
+
+    def insert(self, index, value):
+        self._own_all()
+        list.insert(self, index, value)
+        self._owned = set(range(len(self)))
+
+    def append(self, value):
+        list.append(self, value)
+        self._owned.add(len(self) - 1)
+
+    def extend(self, values):
+        start = len(self)
+        list.extend(self, values)
+        self._owned.update(range(start, len(self)))
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __add__(self, values):
+        return list(self) + values
+
+    def pop(self, index=-1):
+        self._own_all()
+        return list.pop(self, index)
+
+    def remove(self, value):
+        self._own_all()
+        list.remove(self, value)
+
+    def __delitem__(self, index):
+        self._own_all()
+        list.__delitem__(self, index)
+
+    def sort(self, *args, **kwargs):
+        self._own_all()
+        list.sort(self, *args, **kwargs)
+
+    def reverse(self):
+        self._own_all()
+        list.reverse(self)
+
+    def copy(self):
+        return CopyOnWriteList(self)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(list(self), memo)
+
+    def __reduce__(self):
+        return (list, (list(self),))
@@ -0,0 +1,197 @@
+"""
+Fork server for the jobs of a minion.
+
+When ``minion_job_forkserver`` is enabled, the minion starts a template
+process which loads the modules once and then forks the process of every job
+the minion receives. The template is kept up to date with the pillar and
+grains of the minion over a pipe, and is restarted when the modules of the
+minion are refreshed.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+
+import salt._logging
+import salt.defaults.exitcodes
+import salt.utils.platform
+import salt.utils.process
+
+log = logging.getLogger(__name__)
+
+
+def supported():
+    """
+    Return whether jobs can be forked from a template process on this platform
+    """
+    return hasattr(os, "fork")
+
+
+def _reap():
+    """
+    Collect the exit status of the finished jobs
+    """
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+def _run_job(minion_cls, minion_instance, data, connected):
+    """
+    Run a job in a process forked from the template process
+    """
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    salt.utils.process.appendproctitle("ProcessPayload(jid={})".format(data["jid"]))
+    try:
+        # Do not share the logging handlers of the template process
+        salt._logging.shutdown_logging()
+        salt._logging.setup_logging()
+    except Exception:  # pylint: disable=broad-except
+        pass
+    exitcode = salt.defaults.exitcodes.EX_OK
+    try:
+        minion_instance.connected = connected
+        minion_cls._target(
+            minion_instance, minion_instance.opts, data, connected, None
+        )
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Unhandled exception running jid %s", data["jid"])
+        exitcode = salt.defaults.exitcodes.EX_GENERIC
+    finally:
+        try:
+            salt._logging.shutdown_logging()
+        finally:
+            os._exit(exitcode)  # pylint: disable=protected-access
+
+
+def _serve(minion_cls, minion_instance, opts, connected, creds_map, conn):
+    """
+    The loop of the template process
+    """
+    minion_instance = minion_cls._prepare_target_instance(
+        minion_instance, opts, connected, creds_map
+    )
+    while True:
+        _reap()
+        try:
+            if not conn.poll(1):
+                continue
+            msg = conn.recv()
+        except (EOFError, OSError):
+            # The minion went away
+            break
+        cmd = msg[0]
+        if cmd == "job":
+            _, data, connected = msg
+            try:
+                pid = os.fork()
+            except OSError as exc:
+                log.error("Unable to fork jid %s: %s", data["jid"], exc)
+                continue
+            if pid == 0:
+                conn.close()
+                _run_job(minion_cls, minion_instance, data, connected)
+            log.debug("Forked jid %s as process %s", data["jid"], pid)
+        elif cmd == "refresh":
+            for key, value in msg[1].items():
+                minion_instance.opts[key] = value
+                dunder = f"__{key}__"
+                for loader in (minion_instance.functions, minion_instance.returners):
+                    if dunder in loader.pack:
+                        loader.pack[dunder] = value
+        elif cmd == "stop":
+            break
+    conn.close()
+
+
+class JobForkServer:
+    """
+    Forks the processes of the jobs of a minion from a template process
+    """
+
+    def __init__(self, minion):
+        self.minion = minion
+        self.process = None
+        self._conn = None
+
+    def start(self):
+        """
+        Start the template process
+        """
+        # Late import, salt.crypt pulls in the transport and crypto libraries
+        import salt.crypt
+
+        parent_conn, child_conn = multiprocessing.Pipe()
+        instance = self.minion
+        creds_map = None
+        if salt.utils.platform.spawning_platform():
+            # Let the template process rebuild the minion, once
+            instance = None
+            creds_map = salt.crypt.AsyncAuth.creds_map
+        self.process = salt.utils.process.SignalHandlingProcess(
+            target=_serve,
+            name="JobForkServer",
+            args=(
+                type(self.minion),
+                instance,
+                self.minion.opts,
+                self.minion.connected,
+                creds_map,
+                child_conn,
+            ),
+        )
+        self.process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        log.debug("Started the job fork server as process %s", self.process.pid)
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def _send(self, msg):
+        if not self.is_alive():
+            return False
+        try:
+            self._conn.send(msg)
+        except (OSError, ValueError) as exc:
+            log.error("Unable to send to the job fork server: %s", exc)
+            return False
+        return True
+
+    def submit(self, data, connected):
+        """
+        Fork a process running the job ``data``. Returns ``False`` if the job
+        could not be handed over to the template process.
+        """
+        if not self.is_alive():
+            self.stop()
+            self.start()
+        return self._send(("job", data, connected))
+
+    def refresh(self, **kwargs):
+        """
+        Update the opts of the template process, for example with a new
+        ``pillar`` or new ``grains``
+        """
+        return self._send(("refresh", kwargs))
+
+    def stop(self):
+        """
+        Stop the template process. Running jobs are not affected.
+        """
+        if self.process is None:
+            return
+        self._send(("stop",))
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        self._conn.close()
+        self.process = None
+        self._conn = None
@@ -0,0 +1,133 @@
+"""
+Latency histograms in the manner of HdrHistogram
+
+The values are counted in buckets whose width grows with the value, so the
+histogram stays small while any percentile is known within a fixed relative
+error, whatever the range of the recorded values.
+"""
+
+# The percentiles reported by Histogram.summary
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class Histogram:
+    """
+    Count the recorded values in log-linear buckets
+
+    :param int precision: Each power of two is split in ``2 ** precision``
+        buckets, so the percentiles are known within ``2 ** -precision`` of
+        the recorded values, 0.8% by default.
+    :param float unit: The resolution of the histogram, the values are
+        recorded as integer multiples of it, one microsecond by default.
+    """
+
+    def __init__(self, precision=7, unit=1e-6):
+        self.precision = precision
+        self.unit = unit
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, units):
+        bucket = max(0, units.bit_length() - self.precision - 1)
+        return (bucket << self.precision) + (units >> bucket)
+
+    def _lowest(self, index):
+        bucket = max(0, (index >> self.precision) - 1)
+        return (index - (bucket << self.precision)) << bucket
+
+    def record(self, value):
+        """
+        Record a value, in the same unit as ``unit``
+        """
+        value = max(0.0, value)
+        index = self._index(int(value / self.unit))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Add the values recorded by another histogram of the same precision and
+        unit
+        """
+        if (other.precision, other.unit) != (self.precision, self.unit):
+            raise ValueError("Cannot merge histograms of a different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def percentile(self, percent):
+        """
+        Return the value below which ``percent`` percent of the recorded values
+        fall, or None if no value was recorded
+        """
+        if not self.count:
+            return None
+        rank = max(1, percent * self.count / 100.0)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                # The highest value of the bucket, bounded by the recorded ones
+                highest = (self._lowest(index + 1) - 1) * self.unit
+                return min(max(highest, self.min), self.max)
+        return self.max
+
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def summary(self):
+        """
+        Return the count, mean, extremes and percentiles of the recorded values
+        """
+        ret = {
+            "count": self.count,
+            "mean": self.mean(),
+            "min": self.min,
+            "max": self.max,
+        }
+        for percent in PERCENTILES:
+            ret[f"p{percent:g}"] = self.percentile(percent)
+        return ret
+
+    def to_dict(self):
+        """
+        Return the histogram as a dict which can be serialized
+        """
+        return {
+            "precision": self.precision,
+            "unit": self.unit,
+            "counts": self.counts,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Return the histogram serialized by ``to_dict``
+        """
+        hist = cls(precision=data["precision"], unit=data["unit"])
+        # The keys are strings once serialized in JSON
+        hist.counts = {int(index): count for index, count in data["counts"].items()}
+        hist.count = data["count"]
+        hist.total = data["total"]
+        hist.min = data["min"]
+        hist.max = data["max"]
+        return hist
@@ -2,12 +2,16 @@
 Jinja loading utils to enable a more powerful backend for jinja templates
 """
 
+import contextlib
+import contextvars
+import hashlib
 import itertools
 import logging
 import os.path
 import pprint
 import re
 import shlex
+import threading
 import time
 import uuid
 import warnings
@@ -41,11 +45,137 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
-__all__ = ["SaltCacheLoader", "SerializerExtension"]
+__all__ = ["SaltBytecodeCache", "SaltCacheLoader", "SerializerExtension"]
 
 GLOBAL_UUID = uuid.UUID("91633EBF-1C86-5E33-935A-28061F4B480E")
 JINJA_VERSION = Version(jinja2.__version__)
 
+# The set of (saltenv, template) pairs loaded by SaltCacheLoader while a
+# caller is tracking the templates a render depends on.
+_tracked_templates = contextvars.ContextVar("tracked_templates", default=None)
+
+
+@contextlib.contextmanager
+def track_templates():
+    """
+    Context manager yielding a set which is filled with a ``(saltenv,
+    template)`` tuple for every template imported or included through
+    :class:`SaltCacheLoader` while the context is active.
+    """
+    tracked = set()
+    token = _tracked_templates.set(tracked)
+    try:
+        yield tracked
+    finally:
+        _tracked_templates.reset(token)
+
+
+# Compiled template code shared by every SaltBytecodeCache of the process,
+# maps a bucket key to a (source checksum, code object) tuple
+_bytecode_store = OrderedDict()
+_bytecode_lock = threading.Lock()
+
+
+class SaltBytecodeCache(jinja2.BytecodeCache):
+    """
+    Bytecode cache keeping the code compiled from jinja templates in memory
+    for the lifetime of the process, so that templates rendered again, and
+    templates imported or included by many others, are only compiled once.
+
+    Entries are keyed on the template name and path and on a digest of the
+    environment settings which affect compilation, and they are only used
+    when the checksum of the template source matches. The least recently used
+    entries are evicted once ``size`` entries are stored. When ``directory``
+    is set the compiled code is also written there, so that it survives
+    restarts.
+    """
+
+    def __init__(self, size, prefix="", directory=None):
+        self.size = size
+        self.prefix = prefix
+        self.fs_cache = None
+        if directory:
+            try:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+                self.fs_cache = jinja2.FileSystemBytecodeCache(directory)
+            except OSError as exc:
+                log.warning(
+                    "Unable to use %s as jinja bytecode cache: %s", directory, exc
+                )
+
+    @classmethod
+    def from_opts(cls, opts, env_args):
+        """
+        Return the bytecode cache configured in ``opts`` for an environment
+        created with ``env_args``, or ``None`` if it is disabled
+        """
+        size = opts.get("jinja_template_cache_size", 0)
+        if not size or size < 0:
+            return None
+        settings = sorted(
+            (key, repr(value))
+            for key, value in env_args.items()
+            if key not in ("loader", "bytecode_cache")
+        )
+        prefix = hashlib.sha256(f"{JINJA_VERSION}|{settings}".encode()).hexdigest()
+        directory = None
+        if opts.get("jinja_bytecode_cache") and opts.get("cachedir"):
+            directory = os.path.join(opts["cachedir"], "jinja_bytecode")
+        return cls(size, prefix=prefix, directory=directory)
+
+    def get_cache_key(self, name, filename=None):
+        return super().get_cache_key(f"{self.prefix}|{name}", filename)
+
+    def load_bytecode(self, bucket):
+        with _bytecode_lock:
+            entry = _bytecode_store.get(bucket.key)
+            if entry is not None:
+                _bytecode_store.move_to_end(bucket.key)
+        if entry is not None and entry[0] == bucket.checksum:
+            bucket.code = entry[1]
+            return
+        if self.fs_cache is not None:
+            self.fs_cache.load_bytecode(bucket)
+            if bucket.code is not None:
+                self._store(bucket)
+
+    def dump_bytecode(self, bucket):
+        self._store(bucket)
+        if self.fs_cache is not None:
+            try:
+                self.fs_cache.dump_bytecode(bucket)
+            except OSError as exc:
+                log.debug("Unable to write jinja bytecode cache: %s", exc)
+
+    def _store(self, bucket):
+        with _bytecode_lock:
+            _bytecode_store[bucket.key] = (bucket.checksum, bucket.code)
+            _bytecode_store.move_to_end(bucket.key)
+            while len(_bytecode_store) > self.size:
+                _bytecode_store.popitem(last=False)
+
+    def clear(self):
+        with _bytecode_lock:
+            _bytecode_store.clear()
+        if self.fs_cache is not None:
+            self.fs_cache.clear()
+
+    def from_string(self, environment, source):
+        """
+        Like :meth:`jinja2.Environment.from_string`, but reuse the code
+        compiled for an earlier template with the same source
+        """
+        checksum = self.get_source_checksum(source)
+        bucket = self.get_bucket(environment, f"<string:{checksum}>", None, source)
+        code = bucket.code
+        if code is None:
+            code = environment.compile(source)
+            bucket.code = code
+            self.set_bucket(bucket)
+        return environment.template_class.from_code(
+            environment, code, environment.make_globals(None)
+        )
+
 
 class SaltCacheLoader(BaseLoader):
     """
@@ -160,6 +290,9 @@ class SaltCacheLoader(BaseLoader):
                 _template = os.path.relpath(_template, base_path)
 
         self.check_cache(_template)
+        tracked = _tracked_templates.get()
+        if tracked is not None:
+            tracked.add((self.saltenv, _template))
 
         if environment and template:
             tpldir = os.path.dirname(_template).replace("\\", "/")
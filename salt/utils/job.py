@@ -103,16 +103,26 @@ def store_job(opts, load, event=None, mminion=None):
         return
 
     # otherwise, write to the master cache
+    _save_returns(opts, load["jid"], [load], endtime, mminion)
+
+
+def _save_returns(opts, jid, loads, endtime, mminion):
+    """
+    Write the returns of a job to the master_job_cache, saving the load of the
+    job first if it was not saved yet
+    """
+    job_cache = opts["master_job_cache"]
     savefstr = f"{job_cache}.save_load"
     getfstr = f"{job_cache}.get_load"
     fstr = f"{job_cache}.returner"
     updateetfstr = f"{job_cache}.update_endtime"
-    if "fun" not in load and load.get("return", {}):
-        ret_ = load.get("return", {})
-        if "fun" in ret_:
-            load.update({"fun": ret_["fun"]})
-        if "user" in ret_:
-            load.update({"user": ret_["user"]})
+    for load in loads:
+        if "fun" not in load and load.get("return", {}):
+            ret_ = load.get("return", {})
+            if "fun" in ret_:
+                load.update({"fun": ret_["fun"]})
+            if "user" in ret_:
+                load.update({"user": ret_["user"]})
 
     # Try to reach returner methods
     try:
@@ -125,13 +135,15 @@ def store_job(opts, load, event=None, mminion=None):
         raise KeyError(emsg)
 
     save_load = True
-    if job_cache == "local_cache" and mminion.returners[getfstr](load.get("jid", "")):
+    if job_cache in ("local_cache", "segment_cache") and mminion.returners[getfstr](
+        jid
+    ):
         # The job was saved previously.
         save_load = False
 
     if save_load:
         try:
-            mminion.returners[savefstr](load["jid"], load)
+            mminion.returners[savefstr](jid, loads[0])
         except KeyError as e:
             log.error("Load does not contain 'jid': %s", e)
         except Exception:  # pylint: disable=broad-except
@@ -141,6 +153,119 @@ def store_job(opts, load, event=None, mminion=None):
                 exc_info=True,
             )
 
+    for load in loads:
+        try:
+            mminion.returners[fstr](load)
+        except Exception:  # pylint: disable=broad-except
+            log.critical(
+                "The specified '%s' returner threw a stack trace",
+                job_cache,
+                exc_info=True,
+            )
+
+    if opts.get("job_cache_store_endtime") and updateetfstr in mminion.returners:
+        mminion.returners[updateetfstr](jid, endtime)
+
+
+def store_jobs(opts, loads, event=None, mminion=None, minion_events=True):
+    """
+    Store a batch of job returns using the configured master_job_cache
+
+    The returns are grouped by job: each job is prepared and its load saved
+    once for all of its returns, and a single ``salt/job/<jid>/ret_batch``
+    event is fired with all of them. The ``salt/job/<jid>/ret/<id>`` event of
+    each return is only fired when ``minion_events`` is True.
+    """
+    if mminion is None:
+        mminion = salt.minion.MasterMinion(opts, states=False, rend=False)
+    jobs = {}
+    for load in loads:
+        # If the return data is invalid, just ignore it
+        if any(key not in load for key in ("return", "jid", "id")):
+            continue
+        if not salt.utils.verify.valid_id(opts, load["id"]):
+            continue
+        if not salt.utils.jid.is_jid(load["jid"]):
+            # Standalone and uncached jobs are not batched
+            store_job(opts, load, event=event, mminion=mminion)
+            continue
+        jobs.setdefault(load["jid"], []).append(load)
+
+    job_cache = opts["master_job_cache"]
+    for jid, returns in jobs.items():
+        endtime = salt.utils.jid.jid_to_time(salt.utils.jid.gen_jid(opts))
+        jidstore_fstr = f"{job_cache}.prep_jid"
+        try:
+            mminion.returners[jidstore_fstr](False, passed_jid=jid)
+        except KeyError:
+            emsg = f"Returner '{job_cache}' does not support function prep_jid"
+            log.error(emsg)
+            raise KeyError(emsg)
+        except Exception:  # pylint: disable=broad-except
+            log.critical(
+                "The specified '%s' returner threw a stack trace",
+                job_cache,
+                exc_info=True,
+            )
+
+        if event:
+            log.info("Got %d returns for job %s", len(returns), jid)
+            for load in returns:
+                if minion_events:
+                    event.fire_event(
+                        load,
+                        salt.utils.event.tagify([jid, "ret", load["id"]], "job"),
+                    )
+                event.fire_ret_load(load)
+            event.fire_event(
+                {"jid": jid, "returns": returns},
+                salt.utils.event.tagify([jid, "ret_batch"], "job"),
+            )
+
+        if not opts["job_cache"] or opts.get("ext_job_cache"):
+            continue
+        _save_returns(opts, jid, returns, endtime, mminion)
+
+
+def store_partial(opts, load, event=None, mminion=None):
+    """
+    Store a batch of results streamed by a minion while the job is still
+    running, using the save_partial function of the master_job_cache
+    """
+    if any(key not in load for key in ("return", "jid", "id")):
+        return False
+    if not salt.utils.verify.valid_id(opts, load["id"]):
+        return False
+    if not salt.utils.jid.is_jid(load["jid"]):
+        return False
+
+    if event:
+        log.debug(
+            "Got partial return %s from %s for job %s",
+            load.get("seq"),
+            load["id"],
+            load["jid"],
+        )
+        event.fire_event(
+            {
+                "id": load["id"],
+                "jid": load["jid"],
+                "seq": load.get("seq"),
+                "ret": load["return"],
+            },
+            salt.utils.event.tagify([load["jid"], "partial", load["id"]], "job"),
+        )
+
+    if not opts["job_cache"] or opts.get("ext_job_cache"):
+        return
+
+    if mminion is None:
+        mminion = salt.minion.MasterMinion(opts, states=False, rend=False)
+    job_cache = opts["master_job_cache"]
+    fstr = f"{job_cache}.save_partial"
+    if fstr not in mminion.returners:
+        log.debug("Returner '%s' does not support function save_partial", job_cache)
+        return
     try:
         mminion.returners[fstr](load)
     except Exception:  # pylint: disable=broad-except
@@ -148,9 +273,6 @@ def store_job(opts, load, event=None, mminion=None):
             "The specified '%s' returner threw a stack trace", job_cache, exc_info=True
         )
 
-    if opts.get("job_cache_store_endtime") and updateetfstr in mminion.returners:
-        mminion.returners[updateetfstr](load["jid"], endtime)
-
 
 def store_minions(opts, jid, minions, mminion=None, syndic_id=None):
     """
@@ -18,6 +18,7 @@ import salt.payload
 import salt.pillar
 import salt.utils.atomicfile
 import salt.utils.files
+import salt.utils.histogram
 import salt.utils.minions
 import salt.utils.platform
 import salt.utils.stringutils
@@ -584,6 +585,126 @@ class MasterPillarUtil:
         return True
 
 
+def _worker_stats_dir(opts):
+    return os.path.join(opts["cachedir"], "master_stats")
+
+
+def clean_worker_stats(opts):
+    """
+    Remove the statistics written by the master workers of a previous run
+    """
+    stats_dir = _worker_stats_dir(opts)
+    if not os.path.isdir(stats_dir):
+        return
+    for fn_ in os.listdir(stats_dir):
+        try:
+            os.remove(os.path.join(stats_dir, fn_))
+        except OSError:
+            pass
+
+
+def write_worker_stats(opts, name, stats):
+    """
+    Write the statistics of a master worker, replacing the previous ones
+    """
+    stats_dir = _worker_stats_dir(opts)
+    os.makedirs(stats_dir, exist_ok=True)
+    path = os.path.join(stats_dir, f"{name}.p")
+    with salt.utils.atomicfile.atomic_open(path, "wb") as fp_:
+        fp_.write(salt.payload.dumps(stats))
+
+
+def get_worker_stats(opts):
+    """
+    Return the statistics of the master workers by worker name, with their
+    latency histograms per command
+    """
+    ret = {}
+    stats_dir = _worker_stats_dir(opts)
+    if not os.path.isdir(stats_dir):
+        return ret
+    for fn_ in sorted(os.listdir(stats_dir)):
+        if not fn_.endswith(".p"):
+            continue
+        try:
+            with salt.utils.files.fopen(os.path.join(stats_dir, fn_), "rb") as fp_:
+                stats = salt.payload.load(fp_)
+        except (OSError, SaltException) as exc:
+            log.debug("Failed to read the master worker stats %s: %s", fn_, exc)
+            continue
+        for key in ("latency", "queue_wait"):
+            stats[key] = {
+                cmd: salt.utils.histogram.Histogram.from_dict(hist)
+                for cmd, hist in stats[key].items()
+            }
+        ret[fn_[:-2]] = stats
+    return ret
+
+
+def merge_worker_stats(stats):
+    """
+    Merge the latency histograms of the master workers per command
+    """
+    ret = {"latency": {}, "queue_wait": {}}
+    for worker in stats.values():
+        for key, merged in ret.items():
+            for cmd, hist in worker[key].items():
+                merged.setdefault(cmd, salt.utils.histogram.Histogram()).merge(hist)
+    return ret
+
+
+def _prometheus_summary(name, doc, hists):
+    lines = [f"# HELP {name} {doc}", f"# TYPE {name} summary"]
+    for cmd, hist in sorted(hists.items()):
+        for percent in salt.utils.histogram.PERCENTILES:
+            lines.append(
+                '{}{{cmd="{}",quantile="{:g}"}} {!r}'.format(
+                    name, cmd, percent / 100.0, hist.percentile(percent)
+                )
+            )
+        lines.append(f'{name}_sum{{cmd="{cmd}"}} {hist.total!r}')
+        lines.append(f'{name}_count{{cmd="{cmd}"}} {hist.count}')
+    return lines
+
+
+def worker_stats_prometheus(stats):
+    """
+    Format the statistics of the master workers in the Prometheus text format
+    """
+    merged = merge_worker_stats(stats)
+    lines = _prometheus_summary(
+        "salt_master_request_duration_seconds",
+        "Time spent by the master workers handling the requests.",
+        merged["latency"],
+    )
+    lines += _prometheus_summary(
+        "salt_master_request_queue_wait_seconds",
+        "Time the requests waited in the master workers before being handled.",
+        merged["queue_wait"],
+    )
+    lines += [
+        "# HELP salt_master_worker_busy_seconds_total Time spent by the master "
+        "workers handling requests.",
+        "# TYPE salt_master_worker_busy_seconds_total counter",
+    ]
+    for name, worker in stats.items():
+        lines.append(
+            f'salt_master_worker_busy_seconds_total{{worker="{name}"}} {worker["busy"]!r}'
+        )
+    lines += [
+        "# HELP salt_master_worker_utilization Share of the time the master "
+        "workers spent handling requests since they started.",
+        "# TYPE salt_master_worker_utilization gauge",
+    ]
+    for name, worker in stats.items():
+        uptime = worker["time"] - worker["started"]
+        utilization = worker["busy"] / uptime if uptime > 0 else 0.0
+        lines.append(
+            f'salt_master_worker_utilization{{worker="{name}"}} {utilization!r}'
+        )
+    return "\n".join(lines) + "\n"
+
+
 class CacheTimer(Thread):
     """
     A basic timer class the fires timer-events every second.
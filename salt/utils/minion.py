@@ -13,6 +13,11 @@ import salt.utils.process
 
 log = logging.getLogger(__name__)
 
+# The priorities of the jobs in the job pool of the minion, jobs published by
+# the master are run before scheduled jobs
+JOB_PRIORITY_PUBLISH = 0
+JOB_PRIORITY_SCHEDULE = 1
+
 
 def running(opts):
     """
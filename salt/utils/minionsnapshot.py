@@ -0,0 +1,110 @@
+"""
+Warm start snapshot of the minion.
+
+When ``minion_warm_start`` is enabled, the minion writes the pillar it
+compiled, together with the grains it compiled it with, to the cachedir after
+each successful pillar compilation. On the next start the minion uses the
+pillar of the snapshot instead of waiting for the master to compile it, as long
+as the minion id, the master, the master's public key, the environments, the
+grains and the salt version are all unchanged and the snapshot is not older
+than ``minion_warm_start_max_age``. The pillar is then refreshed in the
+background.
+"""
+
+import logging
+import os
+import time
+
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.utils.hashutils
+import salt.version
+
+log = logging.getLogger(__name__)
+
+# Bump this when the layout of the snapshot file changes
+SNAPSHOT_VERSION = 1
+
+
+def _path(opts):
+    return os.path.join(opts["cachedir"], "minion_snapshot.p")
+
+
+def _digest(data):
+    try:
+        return salt.utils.hashutils.sha256_digest(salt.payload.dumps(data))
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def _master_pub_digest(opts):
+    path = os.path.join(opts["pki_dir"], "minion_master.pub")
+    if not os.path.isfile(path):
+        return None
+    return salt.utils.hashutils.get_hash(path, "sha256")
+
+
+def _key(opts):
+    """
+    Return the values a snapshot is only valid for
+    """
+    return {
+        "id": opts.get("id"),
+        "master": opts.get("master"),
+        "master_pub": _master_pub_digest(opts),
+        "saltenv": opts.get("saltenv"),
+        "pillarenv": opts.get("pillarenv"),
+        "grains": _digest(opts.get("grains", {})),
+        "saltversion": salt.version.__version__,
+    }
+
+
+def load(opts):
+    """
+    Return the pillar of a valid snapshot, or ``None``
+    """
+    path = _path(opts)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with salt.utils.files.fopen(path, "rb") as fp_:
+            data = salt.payload.load(fp_)
+    except Exception as exc:  # pylint: disable=broad-except
+        log.warning("Unable to read the minion snapshot %s: %s", path, exc)
+        return None
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        return None
+    age = time.time() - data.get("time", 0)
+    if age > opts.get("minion_warm_start_max_age", 86400):
+        log.debug("The minion snapshot is %d seconds old, not using it", age)
+        return None
+    if data.get("key") != _key(opts):
+        log.debug("The minion snapshot does not match the minion, not using it")
+        return None
+    log.info("Using the pillar of the minion snapshot from %d seconds ago", age)
+    return data["pillar"]
+
+
+def save(opts, pillar):
+    """
+    Write a snapshot of ``pillar`` and the minion's current state
+    """
+    key = _key(opts)
+    if key["grains"] is None or key["master_pub"] is None:
+        return
+    path = _path(opts)
+    try:
+        with salt.utils.files.set_umask(0o077):
+            with salt.utils.atomicfile.atomic_open(path, "wb") as fp_:
+                salt.payload.dump(
+                    {
+                        "version": SNAPSHOT_VERSION,
+                        "time": time.time(),
+                        "key": key,
+                        "pillar": pillar,
+                    },
+                    fp_,
+                )
+    except Exception as exc:  # pylint: disable=broad-except
+        log.error("Unable to write the minion snapshot %s: %s", path, exc)
@@ -2936,6 +2936,16 @@ class SaltCallOptionParser(
             default=False,
             help="Report only those states that have changed.",
         )
+        self.add_option(
+            "--profile-loader",
+            dest="loader_profile",
+            action="store_true",
+            default=False,
+            help=(
+                "Print the time spent importing each loaded module and running "
+                "its __virtual__ function once the call completes."
+            ),
+        )
 
     def _mixin_after_parsed(self):
         if not self.args and not self.options.grains_run and not self.options.doc:
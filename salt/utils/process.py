@@ -8,6 +8,7 @@ import errno
 import functools
 import inspect
 import io
+import itertools
 import json
 import logging
 import multiprocessing
@@ -428,14 +429,26 @@ class ThreadPool:
     in the majority of code from upstream or from http://bit.ly/1wTeJtM
     """
 
-    def __init__(self, num_threads=None, queue_size=0):
+    def __init__(self, num_threads=None, queue_size=0, priorities=False):
         # if no count passed, default to number of CPUs
         if num_threads is None:
             num_threads = multiprocessing.cpu_count()
         self.num_threads = num_threads
 
-        # create a task queue of queue_size
-        self._job_queue = queue.Queue(queue_size)
+        # create a task queue of queue_size. With priorities, tasks with a
+        # lower priority number are run first and tasks of the same priority
+        # are run in the order they were fired.
+        if priorities:
+            self._job_queue = queue.PriorityQueue(queue_size)
+        else:
+            self._job_queue = queue.Queue(queue_size)
+        self.priorities = priorities
+        self._counter = itertools.count()
+
+        self._stats_lock = threading.Lock()
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
 
         self._workers = []
 
@@ -449,23 +462,44 @@ class ThreadPool:
     # intentionally not called "apply_async"  since we aren't keeping track of
     # the return at all, if we want to make this API compatible with multiprocessing
     # threadpool we can in the future, and we won't have to worry about name collision
-    def fire_async(self, func, args=None, kwargs=None):
+    def fire_async(self, func, args=None, kwargs=None, priority=0):
         if args is None:
             args = []
         if kwargs is None:
             kwargs = {}
+        if self.priorities:
+            task = (priority, next(self._counter), func, args, kwargs)
+        else:
+            task = (func, args, kwargs)
         try:
-            self._job_queue.put_nowait((func, args, kwargs))
+            self._job_queue.put_nowait(task)
             return True
         except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
             return False
 
+    def stats(self):
+        """
+        Return the number of threads of the pool, the number of queued, running
+        and completed tasks, and the number of tasks which were rejected
+        because the queue was full
+        """
+        with self._stats_lock:
+            return {
+                "threads": self.num_threads,
+                "queued": self._job_queue.qsize(),
+                "active": self._active,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
     def _thread_target(self):
         while True:
             # 1s timeout so that if the parent dies this thread will die within 1s
             try:
                 try:
-                    func, args, kwargs = self._job_queue.get(timeout=1)
+                    task = self._job_queue.get(timeout=1)
                     self._job_queue.task_done()  # Mark the task as done once we get it
                 except queue.Empty:
                     continue
@@ -474,6 +508,9 @@ class ThreadPool:
                 # we have to catch a possible exception from our exception handler in
                 # order to avoid an unclean shutdown. Le sigh.
                 continue
+            func, args, kwargs = task[-3:]
+            with self._stats_lock:
+                self._active += 1
             try:
                 log.debug(
                     "ThreadPool executing func: %s with args=%s kwargs=%s",
@@ -484,6 +521,10 @@ class ThreadPool:
                 func(*args, **kwargs)
             except Exception as err:  # pylint: disable=broad-except
                 log.debug(err, exc_info=True)
+            finally:
+                with self._stats_lock:
+                    self._active -= 1
+                    self._completed += 1
 
 
 class ProcessManager:
@@ -6,15 +6,14 @@ handling and ordering of chunks by the State compiler
 from __future__ import annotations
 
 import fnmatch
+import heapq
 import logging
 import sys
 from collections import defaultdict
-from collections.abc import Generator, Iterable, Sequence
+from collections.abc import Callable, Generator, Iterable, Sequence
 from enum import Enum, auto
 from typing import TYPE_CHECKING, Any
 
-import networkx as nx
-
 log = logging.getLogger(__name__)
 
 # See https://docs.saltproject.io/en/latest/ref/states/layers.html for details on the naming
@@ -86,6 +85,153 @@ class RequisiteType(str, Enum):
     LISTEN = auto()
 
 
+class RequisiteCycleError(Exception):
+    """
+    Raised when the chunks cannot be ordered because the requisites
+    contain a cycle
+    """
+
+
+class _Node:
+    """
+    A node of the requisite graph
+    """
+
+    __slots__ = (
+        "chunk",
+        "state",
+        "allow_aggregate",
+        "aggregate",
+        "aggregated_nodes",
+        "child_min",
+    )
+
+    def __init__(self) -> None:
+        self.chunk: LowChunk | None = None
+        self.state: str | None = None
+        self.allow_aggregate = False
+        # the aggregate node that replaces this node
+        self.aggregate: str | None = None
+        # the nodes that are replaced by this aggregate node
+        self.aggregated_nodes: Iterable[str] | None = None
+        self.child_min: int | float | None = None
+
+
+class _RequisiteDAG:
+    """
+    Directed multigraph with at most one edge of each requisite type
+    between two nodes.
+
+    Nodes and edges are iterated in insertion order. The edges are stored
+    in adjacency dicts, ``succ[source][target]`` and ``pred[target][source]``
+    share the same dict of requisite types.
+    """
+
+    __slots__ = ("nodes", "succ", "pred")
+
+    def __init__(self) -> None:
+        self.nodes: dict[str, _Node] = {}
+        self.succ: dict[str, dict[str, dict[RequisiteType, None]]] = {}
+        self.pred: dict[str, dict[str, dict[RequisiteType, None]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.nodes
+
+    def add_node(self, node_id: str, **attrs: Any) -> _Node:
+        node = self.nodes.get(node_id)
+        if node is None:
+            node = self.nodes[node_id] = _Node()
+            self.succ[node_id] = {}
+            self.pred[node_id] = {}
+        for attr, value in attrs.items():
+            setattr(node, attr, value)
+        return node
+
+    def add_edge(self, source: str, target: str, req_type: RequisiteType) -> None:
+        if source not in self.nodes:
+            self.add_node(source)
+        if target not in self.nodes:
+            self.add_node(target)
+        req_types = self.succ[source].get(target)
+        if req_types is None:
+            req_types = self.succ[source][target] = self.pred[target][source] = {}
+        req_types[req_type] = None
+
+    def in_edges(
+        self, node_id: str
+    ) -> Generator[tuple[str, str, RequisiteType], None, None]:
+        for source, req_types in self.pred.get(node_id, {}).items():
+            for req_type in req_types:
+                yield source, node_id, req_type
+
+    def out_edges(
+        self, node_id: str
+    ) -> Generator[tuple[str, str, RequisiteType], None, None]:
+        for target, req_types in self.succ.get(node_id, {}).items():
+            for req_type in req_types:
+                yield node_id, target, req_type
+
+    def edges(self) -> Generator[tuple[str, str, RequisiteType], None, None]:
+        for node_id in self.nodes:
+            yield from self.out_edges(node_id)
+
+    def in_degree(self, node_id: str) -> int:
+        return sum(len(req_types) for req_types in self.pred[node_id].values())
+
+    def lexicographical_topological_sort(
+        self, key: Callable[[str], Any]
+    ) -> Generator[str, None, None]:
+        """
+        Yield the nodes in topological order, using ``key`` to break ties
+        in the same way as networkx's ``lexicographical_topological_sort``
+        """
+        nodeid_map = {node_id: idx for idx, node_id in enumerate(self.nodes)}
+        indegree_map = {}
+        zero_indegree = []
+        for node_id in self.nodes:
+            degree = self.in_degree(node_id)
+            if degree:
+                indegree_map[node_id] = degree
+        for node_id in self.nodes:
+            if node_id not in indegree_map:
+                zero_indegree.append((key(node_id), nodeid_map[node_id], node_id))
+        heapq.heapify(zero_indegree)
+
+        while zero_indegree:
+            _, _, node_id = heapq.heappop(zero_indegree)
+            for _, child, _ in self.out_edges(node_id):
+                try:
+                    indegree_map[child] -= 1
+                except KeyError as err:
+                    raise RuntimeError("Graph changed during iteration") from err
+                if indegree_map[child] == 0:
+                    heapq.heappush(
+                        zero_indegree, (key(child), nodeid_map[child], child)
+                    )
+                    del indegree_map[child]
+            yield node_id
+
+        if indegree_map:
+            raise RequisiteCycleError(
+                "Graph contains a cycle or graph changed during iteration"
+            )
+
+    def to_networkx(self):
+        """
+        Return a copy of the graph as a networkx MultiDiGraph
+        """
+        import networkx as nx  # pylint: disable=import-outside-toplevel
+
+        graph = nx.MultiDiGraph()
+        graph.add_nodes_from(self.nodes)
+        for source, target, req_type in self.edges():
+            graph.add_edge(source, target, req_type)
+        return graph
+
+
 class DependencyGraph:
     """
     Class used to track dependencies (requisites) among salt states.
@@ -96,37 +242,39 @@ class DependencyGraph:
     between the states.
     """
 
-    __slots__ = ("dag", "nodes_lookup_map", "sls_to_nodes")
+    __slots__ = ("dag", "nodes_lookup_map", "sls_to_nodes", "requisites_index")
 
     def __init__(self) -> None:
-        self.dag = nx.MultiDiGraph()
+        self.dag = _RequisiteDAG()
         # a mapping to node_id to be able to find nodes with
         # specific state type (module name), names, and/or IDs
         self.nodes_lookup_map: dict[tuple[str, str], set[str]] = {}
         self.sls_to_nodes: dict[str, set[str]] = {}
+        # the requisites of each node grouped by requisite type, filled
+        # by get_requisites and reset whenever the graph changes
+        self.requisites_index: dict[
+            str, dict[RequisiteType, tuple[list[LowChunk], list[str]]]
+        ] = {}
 
     def _add_prereq(self, node_tag: str, req_tag: str):
         # the prerequiring chunk is the state declaring the prereq
         # requisite; the prereq/prerequired state is the one that is
         # declared in the requisite prereq statement
-        self.dag.nodes[node_tag]["chunk"]["__prerequiring__"] = True
-        prereq_chunk = self.dag.nodes[req_tag]["chunk"]
+        self.dag.nodes[node_tag].chunk["__prerequiring__"] = True
+        prereq_chunk = self.dag.nodes[req_tag].chunk
         # set __prereq__ true to run the state in test mode
         prereq_chunk["__prereq__"] = True
         prereq_check_node = self._get_prereq_node_tag(req_tag)
-        if not self.dag.nodes.get(prereq_check_node):
+        check_node = self.dag.nodes.get(prereq_check_node)
+        if check_node is None or check_node.chunk is None:
             self.dag.add_node(
                 prereq_check_node, chunk=prereq_chunk, state=prereq_chunk["state"]
             )
             # all the dependencies of the node for the prerequired
             # chunk also need to be applied to its prereq check node
-            for dependency_node, _, req_type, data in self.dag.in_edges(
-                req_tag, data=True, keys=True
-            ):
+            for dependency_node, _, req_type in list(self.dag.in_edges(req_tag)):
                 if req_type != RequisiteType.PREREQ:
-                    self.dag.add_edge(
-                        dependency_node, prereq_check_node, req_type, **data
-                    )
+                    self.dag.add_edge(dependency_node, prereq_check_node, req_type)
         self.dag.add_edge(prereq_check_node, node_tag, RequisiteType.PREREQ)
         self.dag.add_edge(node_tag, req_tag, RequisiteType.REQUIRE)
 
@@ -146,19 +294,15 @@ class DependencyGraph:
                     # prereq check then also add the requisites to the
                     # prereq node.
                     prereq_node_tag = self._get_prereq_node_tag(node_tag)
-                    self.dag.add_edge(req_tag, prereq_node_tag, key=req_type)
-                self.dag.add_edge(req_tag, node_tag, key=req_type)
+                    self.dag.add_edge(req_tag, prereq_node_tag, req_type)
+                self.dag.add_edge(req_tag, node_tag, req_type)
 
     def _copy_edges(self, source: str, dest: str) -> None:
         """Add the edges from source node to dest node"""
-        for dependency, _, req_type, data in self.dag.in_edges(
-            source, data=True, keys=True
-        ):
-            self.dag.add_edge(dependency, dest, req_type, **data)
-        for _, dependent, req_type, data in self.dag.out_edges(
-            source, data=True, keys=True
-        ):
-            self.dag.add_edge(dest, dependent, req_type, **data)
+        for dependency, _, req_type in list(self.dag.in_edges(source)):
+            self.dag.add_edge(dependency, dest, req_type)
+        for _, dependent, req_type in list(self.dag.out_edges(source)):
+            self.dag.add_edge(dest, dependent, req_type)
 
     def _get_chunk_order(self, cap: int, node: str) -> tuple[int | float, int | float]:
         dag = self.dag
@@ -170,7 +314,7 @@ class DependencyGraph:
         while stack:
             node, is_processing_children, child_min, req_order = stack[-1]
             node_data = dag.nodes[node]
-            chunk = node_data.get("chunk", {})
+            chunk = node_data.chunk or {}
             if not is_processing_children:  # initial stage
                 order = chunk.get("order")
                 if order is None or not isinstance(order, (int, float)):
@@ -192,18 +336,15 @@ class DependencyGraph:
                 # update stage
                 stack.append((node, True, child_min, req_order))
             else:  # after processing node
-                child_min_node = node_data.get("child_min")
-                if child_min_node is None:
-                    for _, child, req_type in dag.out_edges(node, keys=True):
+                if node_data.child_min is None:
+                    for _, child, req_type in dag.out_edges(node):
                         if req_order <= req_type.weight:
                             req_order = req_type.weight
-                            child_order = (
-                                dag.nodes[child]
-                                .get("chunk", {})
-                                .get("order", float("inf"))
+                            child_order = (dag.nodes[child].chunk or {}).get(
+                                "order", float("inf")
                             )
                             child_min = min(child_min, child_order)
-                    node_data["child_min"] = child_min
+                    node_data.child_min = child_min
                     if order > child_min:
                         order = child_min
                 stack.pop()
@@ -225,6 +366,7 @@ class DependencyGraph:
         return str(node_dict)
 
     def add_chunk(self, low: LowChunk, allow_aggregate: bool) -> None:
+        self.requisites_index.clear()
         node_id = _gen_tag(low)
         self.dag.add_node(
             node_id, allow_aggregate=allow_aggregate, chunk=low, state=low["state"]
@@ -289,6 +431,7 @@ class DependencyGraph:
                 break
         if not present:
             return None
+        self.requisites_index.clear()
         reqs = {
             rtype: []
             for rtype in (
@@ -345,43 +488,82 @@ class DependencyGraph:
         :param cap: the maximum order value configured in the states
         :return: the ordered chunks
         """
-        dag: nx.MultiDiGraph = self.dag
+        dag = self.dag
+        self.requisites_index.clear()
         # dict for tracking topo order and for mapping each node that
         # was aggregated to the aggregated node that replaces it
         topo_order = {}
 
         max_group_size = 500
         groups_by_type = defaultdict(list)
+        # Reachability is tracked incrementally with bitsets of aggregation
+        # groups instead of searching the graph for each candidate group.
+        # Every group gets a bit; node_ancestors maps each visited node to
+        # the groups which contain one of its ancestors, and group_ancestors
+        # holds, for each group in the order the bits were assigned, the
+        # groups which contain an ancestor of one of its members. Since the
+        # members of a group run as a single state, a group reaches a node
+        # if it is in the transitive closure of the node's ancestor groups.
+        node_ancestors: dict[str, int] = {}
+        node_group: dict[str, int] = {}
+        group_ancestors: list[int] = []
+        group_bits: dict[str, list[int]] = defaultdict(list)
 
         def _get_order(node):
-            chunk = dag.nodes[node].get("chunk", {})
+            chunk = dag.nodes[node].chunk
             chunk_label = "{0[state]}{0[name]}{0[fun]}".format(chunk) if chunk else ""
             chunk_order = self._get_chunk_order(cap, node)
             return (chunk_order, chunk_label)
 
+        def _get_ancestors(node):
+            ancestors = 0
+            for pred in dag.pred[node]:
+                if (group_bit := node_group.get(pred)) is not None:
+                    ancestors |= group_bit | group_ancestors[group_bit.bit_length() - 1]
+                ancestors |= node_ancestors.get(pred, 0)
+            return ancestors
+
+        def _reachable_groups(ancestors):
+            reachable = 0
+            frontier = ancestors
+            while frontier:
+                reachable |= frontier
+                expanded = 0
+                while frontier:
+                    group_bit = frontier & -frontier
+                    frontier ^= group_bit
+                    expanded |= group_ancestors[group_bit.bit_length() - 1]
+                frontier = expanded & ~reachable
+            return reachable
+
         # Iterate over the nodes in topological order to get the correct
         # ordering which takes requisites into account
-        for node in nx.lexicographical_topological_sort(dag, key=_get_order):
+        for node in dag.lexicographical_topological_sort(key=_get_order):
             topo_order[node] = None
+            ancestors = node_ancestors[node] = _get_ancestors(node)
             data = dag.nodes[node]
-            if not data.get("allow_aggregate"):
+            if not data.allow_aggregate:
                 continue
 
-            node_type = data["state"]
+            node_type = data.state
             added = False
+            reachable = None
             for idx, group in enumerate(groups_by_type[node_type]):
                 if len(group) >= max_group_size:
                     continue
-                # Check if the node can be reached from any node in the group
-                first_node = next(iter(group))
-                agg_node = topo_order.get(first_node)
                 # Since we are iterating in topological order we know
                 # that there is no path from the current node to the
                 # node in the group; so we only need to check the path
-                # from the group node to the current node
-                reachable = nx.has_path(dag, agg_node or first_node, node)
-                if not reachable:
+                # from the group to the current node
+                group_bit = group_bits[node_type][idx]
+                if ancestors & group_bit:
+                    continue
+                if reachable is None:
+                    reachable = _reachable_groups(ancestors)
+                if not reachable & group_bit:
                     # If not, add the node to the group
+                    first_node = next(iter(group))
+                    agg_node = topo_order.get(first_node)
                     if agg_node is None:
                         # there is now more than one node for this
                         # group so aggregate them
@@ -392,34 +574,45 @@ class DependencyGraph:
                         # add the edges of the first node in the group to
                         # the aggregate
                         self._copy_edges(first_node, agg_node)
-                        dag.nodes[first_node]["aggregate"] = agg_node
+                        dag.nodes[first_node].aggregate = agg_node
                         topo_order[first_node] = agg_node
+                        node_group[agg_node] = group_bit
 
                     self._copy_edges(node, agg_node)
-                    dag.nodes[node]["aggregate"] = agg_node
+                    dag.nodes[node].aggregate = agg_node
                     topo_order[node] = agg_node
                     group[node] = None
+                    node_group[node] = group_bit
+                    group_ancestors[group_bit.bit_length() - 1] |= ancestors
                     added = True
                     break
 
             # If the node was not added to any set, create a new set
             if not added:
                 # use a dict instead of set to retain insertion ordering
+                group_bit = 1 << len(group_ancestors)
+                group_bits[node_type].append(group_bit)
                 groups_by_type[node_type].append({node: None})
+                group_ancestors.append(ancestors)
+                node_group[node] = group_bit
 
-        ordered_chunks = [dag.nodes[node].get("chunk", {}) for node in topo_order]
+        ordered_chunks = [dag.nodes[node].chunk or {} for node in topo_order]
         return ordered_chunks
 
     def find_cycle_edges(self) -> list[tuple[LowChunk, RequisiteType, LowChunk]]:
         """
         Find the cycles if the graph is not a Directed Acyclic Graph
         """
-        dag = self.dag
+        # networkx is only needed to report the cycles, import it lazily
+        import networkx as nx  # pylint: disable=import-outside-toplevel
+
         try:
             cycle_edges = []
-            for dependency, dependent, req_type in nx.find_cycle(dag):
-                dependency_chunk = self.dag.nodes[dependency]["chunk"]
-                dependent_chunk = self.dag.nodes[dependent]["chunk"]
+            for dependency, dependent, req_type in nx.find_cycle(
+                self.dag.to_networkx()
+            ):
+                dependency_chunk = self.dag.nodes[dependency].chunk
+                dependent_chunk = self.dag.nodes[dependent].chunk
                 if (
                     req_type not in dependent_chunk
                     and req_type == RequisiteType.REQUIRE
@@ -439,10 +632,10 @@ class DependencyGraph:
         this low chunk.
         """
         low_tag = _gen_tag(low)
-        if aggregate_node := self.dag.nodes[low_tag].get("aggregate"):
+        if aggregate_node := self.dag.nodes[low_tag].aggregate:
             return [
-                self.dag.nodes[node]["chunk"]
-                for node in self.dag.nodes[aggregate_node]["aggregated_nodes"]
+                self.dag.nodes[node].chunk
+                for node in self.dag.nodes[aggregate_node].aggregated_nodes
             ]
         return []
 
@@ -462,9 +655,32 @@ class DependencyGraph:
             # if the low chunk is set to run in test mode for a
             # prereq check then return the reqs for prereq test node.
             low_tag = self._get_prereq_node_tag(low_tag)
-        for req_id, _, req_type in self.dag.in_edges(low_tag, keys=True):
-            if chunk := self.dag.nodes[req_id].get("chunk"):
+        for req_id, _, req_type in self.dag.in_edges(low_tag):
+            if chunk := self.dag.nodes[req_id].chunk:
                 yield req_type, chunk
             else:
-                for node in self.dag.nodes[req_id]["aggregated_nodes"]:
-                    yield req_type, self.dag.nodes[node].get("chunk")
+                for node in self.dag.nodes[req_id].aggregated_nodes:
+                    yield req_type, self.dag.nodes[node].chunk
+
+    def get_requisites(
+        self, low: LowChunk
+    ) -> dict[RequisiteType, tuple[list[LowChunk], list[str]]]:
+        """
+        Get the dependency chunks of low and their tags grouped by
+        requisite type.
+
+        The result is computed once per node and kept until the graph
+        is modified, so it must not be changed by the caller.
+        """
+        low_tag = _gen_tag(low)
+        if low.get("__prereq__"):
+            low_tag = self._get_prereq_node_tag(low_tag)
+        reqs = self.requisites_index.get(low_tag)
+        if reqs is None:
+            reqs = {}
+            for req_type, chunk in self.get_dependencies(low):
+                chunks, tags = reqs.setdefault(req_type, ([], []))
+                chunks.append(chunk)
+                tags.append(_gen_tag(chunk))
+            self.requisites_index[low_tag] = reqs
+        return reqs
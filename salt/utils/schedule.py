@@ -185,6 +185,9 @@ class Schedule:
             self._subprocess_list = salt.utils.process.SubprocessList()
         else:
             self._subprocess_list = _subprocess_list
+        # The job pool of the minion, used to run the jobs when multiprocessing
+        # is disabled
+        self.job_pool = None
 
     def __getnewargs__(self):
         return self.opts, self.functions, self.returners, self.intervals, None
@@ -1863,6 +1866,17 @@ class Schedule:
                     )
                     proc.start()
                     self._subprocess_list.add(proc)
+            elif self.job_pool is not None:
+                if not self.job_pool.fire_async(
+                    self.handle_func,
+                    args=(multiprocessing_enabled, func, data, jid),
+                    priority=salt.utils.minion.JOB_PRIORITY_SCHEDULE,
+                ):
+                    log.warning(
+                        "The job queue is full, skipping job %s. %s",
+                        data["name"],
+                        self.job_pool.stats(),
+                    )
             else:
                 proc = thread_cls(
                     target=self.handle_func,
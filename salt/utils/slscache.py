@@ -0,0 +1,154 @@
+"""
+Persistent cache of rendered SLS data used by the state compiler.
+
+When ``state_render_cache`` is enabled, the rendered data of each SLS file is
+kept in the minion cachedir together with the hash of the SLS file, the hashes
+of the templates it imported and digests of the pillar and grains it was
+rendered with. An SLS file whose inputs have not changed since the last run is
+then loaded from the cache instead of being passed through the renderers.
+"""
+
+import copy
+import logging
+import os
+
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.url
+
+log = logging.getLogger(__name__)
+
+# Bump this when the layout of the cache file changes
+CACHE_VERSION = 1
+
+
+def data_digest(data):
+    """
+    Return a sha256 digest of a serializable data structure, or ``None`` if
+    the data cannot be serialized.
+    """
+    try:
+        return salt.utils.hashutils.sha256_digest(salt.payload.dumps(data))
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+class SLSRenderCache:
+    """
+    Cache of rendered SLS data keyed on ``<saltenv>:<sls>``.
+
+    An entry is only returned when the SLS file, every template it imported,
+    the pillar, the grains and the renderer pipeline all match the values
+    recorded when the entry was stored.
+    """
+
+    def __init__(self, opts, file_client, pillar, grains):
+        self.opts = opts
+        self.client = file_client
+        self.path = os.path.join(opts["cachedir"], "state_render.cache.p")
+        self.pillar_digest = data_digest(pillar)
+        self.grains_digest = data_digest(grains)
+        self._entries = None
+        self._dirty = False
+        # Template hashes already checked against the fileserver in this run
+        self._template_hashes = {}
+
+    @property
+    def enabled(self):
+        return self.pillar_digest is not None and self.grains_digest is not None
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            if os.path.isfile(self.path):
+                try:
+                    with salt.utils.files.fopen(self.path, "rb") as fp_:
+                        data = salt.payload.load(fp_)
+                    if isinstance(data, dict) and data.get("version") == CACHE_VERSION:
+                        self._entries = data.get("entries") or {}
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.warning(
+                        "Unable to read the state render cache %s: %s", self.path, exc
+                    )
+        return self._entries
+
+    def _template_hash(self, saltenv, template):
+        """
+        Make sure the cached copy of the template is up to date with the
+        fileserver and return its hash.
+        """
+        key = (saltenv, template)
+        if key not in self._template_hashes:
+            path = self.client.cache_file(salt.utils.url.create(template), saltenv)
+            self._template_hashes[key] = (
+                salt.utils.hashutils.get_hash(path) if path else None
+            )
+        return self._template_hashes[key]
+
+    def get(self, sls, saltenv, path, renderer):
+        """
+        Return a copy of the cached rendered data of the SLS file found at
+        ``path``, or ``None`` if there is no valid cache entry.
+        """
+        if not self.enabled:
+            return None
+        entry = self._load().get(f"{saltenv}:{sls}")
+        if not entry:
+            return None
+        if (
+            entry.get("pillar") != self.pillar_digest
+            or entry.get("grains") != self.grains_digest
+            or entry.get("renderer") != renderer
+            or entry.get("hash") != salt.utils.hashutils.get_hash(path)
+        ):
+            return None
+        for tpl_env, template, hsum in entry.get("templates", []):
+            if self._template_hash(tpl_env, template) != hsum:
+                return None
+        log.debug("Using cached render of SLS '%s:%s'", saltenv, sls)
+        return copy.deepcopy(entry["state"])
+
+    def set(self, sls, saltenv, path, renderer, templates, state):
+        """
+        Store the rendered data of the SLS file found at ``path`` along with
+        the ``(saltenv, template)`` pairs it imported.
+        """
+        if not self.enabled:
+            return
+        try:
+            # Round trip the data so that the cache does not share any
+            # objects with the high data which is modified further on
+            state = salt.payload.loads(salt.payload.dumps(state))
+        except Exception:  # pylint: disable=broad-except
+            log.debug("Rendered SLS '%s:%s' cannot be cached", saltenv, sls)
+            return
+        self._load()[f"{saltenv}:{sls}"] = {
+            "hash": salt.utils.hashutils.get_hash(path),
+            "pillar": self.pillar_digest,
+            "grains": self.grains_digest,
+            "renderer": renderer,
+            "templates": [
+                [tpl_env, template, self._template_hash(tpl_env, template)]
+                for tpl_env, template in sorted(templates)
+            ],
+            "state": state,
+        }
+        self._dirty = True
+
+    def save(self):
+        """
+        Write the cache to disk if it was modified
+        """
+        if not self._dirty:
+            return
+        try:
+            with salt.utils.files.set_umask(0o077):
+                with salt.utils.atomicfile.atomic_open(self.path, "wb") as fp_:
+                    salt.payload.dump(
+                        {"version": CACHE_VERSION, "entries": self._entries}, fp_
+                    )
+            self._dirty = False
+        except OSError as exc:
+            log.error("Unable to write the state render cache %s: %s", self.path, exc)
@@ -0,0 +1,133 @@
+"""
+Per-phase timing of state runs.
+
+When ``state_profile`` is enabled, the state compiler times each phase of a
+state run, such as matching the top file, rendering each SLS file, compiling
+the high data and running each state. The phases nest, and the resulting
+report is written to the ``state_profile`` directory of the minion cachedir
+both as JSON and in the collapsed stack format read by flamegraph tools.
+"""
+
+import contextlib
+import contextvars
+import logging
+import os
+import time
+
+import salt.utils.atomicfile
+import salt.utils.json
+
+log = logging.getLogger(__name__)
+
+# The profiler of the phase currently running, so that code which has no
+# access to the state compiler can record sub phases
+_current_profiler = contextvars.ContextVar("state_profiler", default=None)
+
+
+def phase(name):
+    """
+    Return a context manager timing ``name`` as a sub phase of the phase
+    currently being profiled. Nothing is recorded outside of a profiled phase.
+    """
+    profiler = _current_profiler.get()
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.phase(name)
+
+
+class StateProfiler:
+    """
+    Record the time spent in nested phases of a state run
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._stack = []
+        # Maps the tuple of nested phase names to [seconds, calls]
+        self._totals = {}
+
+    def phase(self, name):
+        """
+        Return a context manager timing the phase ``name``
+        """
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._phase(name)
+
+    @contextlib.contextmanager
+    def _phase(self, name):
+        token = _current_profiler.set(self)
+        self._stack.append(str(name))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self._totals.setdefault(tuple(self._stack), [0.0, 0])
+            entry[0] += elapsed
+            entry[1] += 1
+            self._stack.pop()
+            _current_profiler.reset(token)
+
+    def clear(self):
+        self._totals = {}
+
+    def report(self):
+        """
+        Return the recorded phases, with their total and self durations in
+        milliseconds
+        """
+        children = {}
+        for path, (seconds, _) in self._totals.items():
+            if len(path) > 1:
+                children[path[:-1]] = children.get(path[:-1], 0.0) + seconds
+        phases = []
+        for path, (seconds, calls) in self._totals.items():
+            phases.append(
+                {
+                    "path": list(path),
+                    "duration": round(seconds * 1000, 3),
+                    "self": round(max(seconds - children.get(path, 0.0), 0) * 1000, 3),
+                    "calls": calls,
+                }
+            )
+        duration = sum(
+            seconds for path, (seconds, _) in self._totals.items() if len(path) == 1
+        )
+        return {"duration": round(duration * 1000, 3), "phases": phases}
+
+    def collapsed(self, report=None):
+        """
+        Return the phases in the collapsed stack format, one line per phase
+        with its self time in microseconds
+        """
+        if report is None:
+            report = self.report()
+        lines = []
+        for item in report["phases"]:
+            stack = ";".join(name.replace(";", ":") for name in item["path"])
+            lines.append(f"{stack} {int(item['self'] * 1000)}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, cachedir, name):
+        """
+        Write the report to ``<cachedir>/state_profile/<name>.json`` and
+        ``<name>.folded`` and return the report
+        """
+        report = self.report()
+        profile_dir = os.path.join(cachedir, "state_profile")
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, f"{name}.json")
+            with salt.utils.atomicfile.atomic_open(path, "w") as fp_:
+                salt.utils.json.dump(report, fp_, indent=2)
+            with salt.utils.atomicfile.atomic_open(
+                os.path.join(profile_dir, f"{name}.folded"), "w"
+            ) as fp_:
+                fp_.write(self.collapsed(report))
+            log.info(
+                "State run profile (%s ms) written to %s", report["duration"], path
+            )
+        except OSError as exc:
+            log.error("Unable to write the state run profile: %s", exc)
+        return report
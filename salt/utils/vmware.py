@@ -81,6 +81,7 @@ from http.client import BadStatusLine
 
 import salt.exceptions
 import salt.modules.cmdmod
+import salt.utils.http
 import salt.utils.path
 import salt.utils.platform
 import salt.utils.stringutils
@@ -90,6 +90,22 @@ SafeOrderedDumper.add_representer(
     salt.utils.context.NamespacedDictWrapper,
     yaml.representer.SafeRepresenter.represent_dict,
 )
+OrderedDumper.add_representer(
+    salt.utils.context.CopyOnWriteDict,
+    yaml.representer.SafeRepresenter.represent_dict,
+)
+SafeOrderedDumper.add_representer(
+    salt.utils.context.CopyOnWriteDict,
+    yaml.representer.SafeRepresenter.represent_dict,
+)
+OrderedDumper.add_representer(
+    salt.utils.context.CopyOnWriteList,
+    yaml.representer.SafeRepresenter.represent_list,
+)
+SafeOrderedDumper.add_representer(
+    salt.utils.context.CopyOnWriteList,
+    yaml.representer.SafeRepresenter.represent_list,
+)
 
 OrderedDumper.add_representer(
     "tag:yaml.org,2002:timestamp", OrderedDumper.represent_scalar
@@ -0,0 +1,49 @@
+import asyncio
+
+import zmq
+import zmq.asyncio
+
+import salt.payload
+import salt.transport.zeromq
+
+
+async def test_request_server_concurrent_requests(io_loop, master_opts, tmp_path):
+    """
+    Validate that a worker with worker_blocking_threads replies to a request
+    while an earlier one is still being handled.
+    """
+    opts = master_opts.copy()
+    opts.update(
+        sock_dir=str(tmp_path),
+        ipc_mode="ipc",
+        worker_blocking_threads=1,
+        worker_max_inflight=4,
+    )
+    # The backend of the ReqServer device
+    ctx = zmq.asyncio.Context()
+    device = ctx.socket(zmq.DEALER)
+    device.bind("ipc://{}".format(tmp_path / "workers.ipc"))
+
+    fast_done = asyncio.Event()
+
+    async def message_handler(payload):
+        if payload == "slow":
+            await fast_done.wait()
+        else:
+            fast_done.set()
+        return payload
+
+    server = salt.transport.zeromq.RequestServer(opts)
+    server.post_fork(message_handler, io_loop)
+    try:
+        for client, payload in ((b"client1", "slow"), (b"client2", "fast")):
+            await device.send_multipart([client, b"", salt.payload.dumps(payload)])
+        replies = []
+        for _ in range(2):
+            frames = await asyncio.wait_for(device.recv_multipart(), 10)
+            replies.append((frames[0], salt.payload.loads(frames[-1])))
+        assert replies == [(b"client2", "fast"), (b"client1", "slow")]
+    finally:
+        server.close()
+        device.close(0)
+        ctx.term()
@@ -1,6 +1,8 @@
 import pathlib
 
+import salt.minion
 import salt.utils.job
+from tests.support.mock import MagicMock
 
 
 def test_store_job_save_load(minion_opts, tmp_path):
@@ -36,3 +38,45 @@ def test_store_job_save_load(minion_opts, tmp_path):
     assert return_p.is_file()
     assert load_p.is_file()
     assert jid.is_file()
+
+
+def test_store_jobs(minion_opts):
+    """
+    Test that the returns of a batch are stored and fired per job
+    """
+    opts = minion_opts.copy()
+    opts["master_job_cache"] = "local_cache"
+    opts["job_cache"] = True
+    opts["ext_job_cache"] = ""
+    jid = "20230822145508520091"
+    loads = [
+        {"id": f"minion{idx}", "jid": jid, "fun": "test.ping", "return": True}
+        for idx in range(3)
+    ]
+    # Invalid returns are ignored
+    loads.append({"id": "minion4", "jid": jid})
+    event = MagicMock()
+    mminion = salt.minion.MasterMinion(opts, states=False, rend=False)
+    salt.utils.job.store_jobs(opts, loads, event=event, mminion=mminion)
+    assert sorted(mminion.returners["local_cache.get_jid"](jid)) == [
+        "minion0",
+        "minion1",
+        "minion2",
+    ]
+    tags = [call.args[1] for call in event.fire_event.call_args_list]
+    assert tags == [
+        f"salt/job/{jid}/ret/minion0",
+        f"salt/job/{jid}/ret/minion1",
+        f"salt/job/{jid}/ret/minion2",
+        f"salt/job/{jid}/ret_batch",
+    ]
+    assert event.fire_event.call_args.args[0] == {"jid": jid, "returns": loads[:3]}
+
+    event.reset_mock()
+    jid = "20230822145508520092"
+    loads = [dict(load, jid=jid) for load in loads[:3]]
+    salt.utils.job.store_jobs(
+        opts, loads, event=event, mminion=mminion, minion_events=False
+    )
+    tags = [call.args[1] for call in event.fire_event.call_args_list]
+    assert tags == [f"salt/job/{jid}/ret_batch"]
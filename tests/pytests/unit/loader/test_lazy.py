@@ -10,6 +10,7 @@ import salt.loader
 import salt.loader.context
 import salt.loader.lazy
 import salt.utils.files
+from tests.support.mock import patch
 
 
 @pytest.fixture
@@ -151,3 +152,38 @@ async def test_loader_async(loader_dir):
     myasync = loader["mod_a.myasync"]
     ret = await myasync("foo")
     assert ret == "foo"
+
+
+def test_module_dir_index_reused(loader_dir):
+    """
+    Loaders share the listing of a module directory until it changes
+    """
+    opts = {"optimization_order": [0, 1, 2]}
+    salt.loader.lazy.LazyLoader([loader_dir], opts)
+    with patch("os.listdir", side_effect=AssertionError("listdir called")):
+        loader = salt.loader.lazy.LazyLoader([loader_dir], opts)
+    assert "mod_a" in loader.file_mapping
+    with pytest.helpers.temp_file(
+        "mod_c.py", directory=loader_dir, contents="def ping():\n    return True\n"
+    ):
+        loader = salt.loader.lazy.LazyLoader([loader_dir], opts)
+        assert "mod_c" in loader.file_mapping
+
+
+def test_loader_copy_on_write(loader_dir):
+    """
+    With loader_copy_on_write, loaders share the pillar of the opts they were
+    created from without changing it
+    """
+    pillar = {"nested": {"key": "value"}}
+    opts = {
+        "optimization_order": [0, 1, 2],
+        "loader_copy_on_write": True,
+        "pillar": pillar,
+    }
+    loader = salt.loader.lazy.LazyLoader([loader_dir], opts)
+    assert loader.opts["pillar"] == pillar
+    assert loader.pack["__pillar__"] is loader.opts["pillar"]
+    loader.pack["__pillar__"]["nested"]["key"] = "changed"
+    assert loader.opts["pillar"]["nested"]["key"] == "changed"
+    assert pillar == {"nested": {"key": "value"}}
@@ -55,6 +55,71 @@ def test_custom_grain_with_annotations(minion_opts, grains_dir):
     assert grains.get("example") == "42"
 
 
+def test_parallel_grains(minion_opts, tmp_path):
+    """
+    Grains functions run on threads are merged in order, and the ones which
+    time out are left out.
+    """
+    grains_dir = tmp_path / "parallel_grains"
+    grains_dir.mkdir()
+    (grains_dir / "parallel.py").write_text(
+        textwrap.dedent(
+            """
+            import time
+
+            def fast():
+                return {"fast": True, "order": "fast"}
+
+            def slow():
+                time.sleep(30)
+                return {"slow": True}
+
+            def use_fast(grains):
+                return {"order": "use_fast", "saw_fast": grains.get("fast")}
+            """
+        )
+    )
+    minion_opts["grains_dirs"] = [str(grains_dir)]
+    minion_opts["grains_parallel_workers"] = 4
+    minion_opts["grains_parallel_timeout"] = 1
+    grains = salt.loader.grains(minion_opts, force_refresh=True)
+    assert "saltversion" in grains
+    assert grains["fast"] is True
+    assert grains["saw_fast"] is True
+    assert grains["order"] == "use_fast"
+    assert "slow" not in grains
+
+
+def test_grains_function_ttl(minion_opts, tmp_path):
+    """
+    Grains functions with a TTL are only run again once their result is stale
+    """
+    grains_dir = tmp_path / "ttl_grains"
+    grains_dir.mkdir()
+    (grains_dir / "counted.py").write_text(
+        textwrap.dedent(
+            """
+            import uuid
+
+            def cached():
+                return {"cached": uuid.uuid4().hex}
+
+            def uncached():
+                return {"uncached": uuid.uuid4().hex}
+            """
+        )
+    )
+    minion_opts["grains_dirs"] = [str(grains_dir)]
+    minion_opts["grains_function_ttl"] = {"counted.cached": 3600}
+    first = salt.loader.grains(minion_opts, force_refresh=True)
+    second = salt.loader.grains(minion_opts, force_refresh=True)
+    assert second["cached"] == first["cached"]
+    assert second["uncached"] != first["uncached"]
+    assert os.path.isfile(
+        os.path.join(minion_opts["cachedir"], "grains.functions.cache.p")
+    )
+
+
 def test_raw_mod_functions():
     "Ensure functions loaded by raw_mod are LoaderFunc instances"
     opts = {
@@ -0,0 +1,67 @@
+"""
+Tests for salt.loader.profiler
+"""
+
+import json
+
+import salt.loader.lazy
+import salt.loader.profiler
+
+
+def test_report_sorted_by_total():
+    profiler = salt.loader.profiler.LoaderProfiler()
+    profiler.record_import("module", "fast", 0.001, 2048)
+    profiler.record_import("module", "slow", 0.5)
+    profiler.record_virtual("module", "slow", 0.25)
+    report = profiler.report()
+    assert report["duration"] == 751.0
+    assert report["modules"] == [
+        {
+            "tag": "module",
+            "module": "slow",
+            "total": 750.0,
+            "import": 500.0,
+            "virtual": 250.0,
+            "memory": None,
+            "loads": 1,
+        },
+        {
+            "tag": "module",
+            "module": "fast",
+            "total": 1.0,
+            "import": 1.0,
+            "virtual": 0.0,
+            "memory": 2,
+            "loads": 1,
+        },
+    ]
+    text = profiler.format_report(limit=1)
+    assert "module.slow" in text
+    assert "module.fast" not in text
+
+
+def test_write(tmp_path):
+    profiler = salt.loader.profiler.LoaderProfiler()
+    profiler.record_import("states", "pkg", 0.1)
+    report = profiler.write(str(tmp_path), name="call")
+    path = tmp_path / "loader_profile" / "call.json"
+    assert json.loads(path.read_text()) == report
+
+
+def test_loader_records_modules(tmp_path):
+    mod_dir = tmp_path / "modules"
+    mod_dir.mkdir()
+    (mod_dir / "mod_a.py").write_text(
+        "def __virtual__():\n    return True\n\ndef ping():\n    return True\n"
+    )
+    opts = {"optimization_order": [0, 1, 2], "loader_profile": True}
+    salt.loader.profiler.PROFILER.clear()
+    try:
+        loader = salt.loader.lazy.LazyLoader([str(mod_dir)], opts, tag="module")
+        assert loader["mod_a.ping"]()
+        (entry,) = salt.loader.profiler.PROFILER.report()["modules"]
+        assert entry["tag"] == "module"
+        assert entry["module"] == "mod_a"
+        assert entry["loads"] == 1
+    finally:
+        salt.loader.profiler.PROFILER.clear()
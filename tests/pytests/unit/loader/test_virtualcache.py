@@ -0,0 +1,173 @@
+"""
+Tests for salt.loader.virtualcache
+"""
+
+import os
+
+import pytest
+
+import salt.loader.lazy
+import salt.loader.virtualcache
+import salt.utils.files
+
+
+@pytest.fixture
+def module_file(tmp_path):
+    path = tmp_path / "mod_a.py"
+    path.write_text("def __virtual__():\n    return True\n")
+    return str(path)
+
+
+def test_roundtrip(tmp_path, module_file):
+    cache = salt.loader.virtualcache.VirtualCache(str(tmp_path), "module", 3600)
+    cache.set(module_file, False, ["mod_a"], "missing dependency")
+    cache.save()
+
+    cache = salt.loader.virtualcache.VirtualCache(str(tmp_path), "module", 3600)
+    assert cache.get(module_file) == (False, ["mod_a"], "missing dependency")
+
+
+def test_module_change_invalidates(tmp_path, module_file):
+    cache = salt.loader.virtualcache.VirtualCache(str(tmp_path), "module", 3600)
+    cache.set(module_file, True, ["mod_a"])
+    with salt.utils.files.fopen(module_file, "a") as fp_:
+        fp_.write("# changed\n")
+    assert cache.get(module_file) is None
+
+
+def test_grains_change_invalidates(tmp_path, module_file):
+    cache = salt.loader.virtualcache.VirtualCache(
+        str(tmp_path), "module", 3600, grains={"os": "Debian"}
+    )
+    cache.set(module_file, True, ["mod_a"])
+    cache.save()
+
+    cache = salt.loader.virtualcache.VirtualCache(
+        str(tmp_path), "module", 3600, grains={"os": "Fedora"}
+    )
+    assert cache.get(module_file) is None
+
+
+def test_expired_entry(tmp_path, module_file):
+    cache = salt.loader.virtualcache.VirtualCache(str(tmp_path), "module", 3600)
+    cache.set(module_file, True, ["mod_a"])
+    cache._entries[module_file]["time"] -= 7200
+    assert cache.get(module_file) is None
+
+
+@pytest.fixture
+def loader_dir(tmp_path):
+    mod_dir = tmp_path / "modules"
+    mod_dir.mkdir()
+    (mod_dir / "mod_a.py").write_text(
+        "def __virtual__():\n    return True\n\ndef ping():\n    return 'a'\n"
+    )
+    (mod_dir / "mod_b.py").write_text(
+        "def __virtual__():\n    return (False, 'not here')\n\ndef ping():\n"
+        "    return 'b'\n"
+    )
+    return str(mod_dir)
+
+
+def test_loader_uses_cache(tmp_path, loader_dir):
+    """
+    Modules known not to load are not imported again, and modules which load
+    are only imported when one of their names is used
+    """
+    opts = {
+        "optimization_order": [0, 1, 2],
+        "cachedir": str(tmp_path / "cache"),
+        "loader_virtual_cache_ttl": 3600,
+    }
+    loader = salt.loader.lazy.LazyLoader([loader_dir], opts)
+    loader._load_all()
+    assert loader["mod_a.ping"]() == "a"
+    assert loader.missing_modules["mod_b"] == "not here"
+    assert os.path.isfile(loader._virtual_cache.path)
+
+    loader = salt.loader.lazy.LazyLoader([loader_dir], opts)
+    with pytest.raises(KeyError):
+        loader["mod_b.ping"]  # pylint: disable=pointless-statement
+    assert loader.missing_modules["mod_b"] == "not here"
+    assert "mod_a" not in loader.loaded_files
+    assert loader["mod_a.ping"]() == "a"
+    assert "mod_a" in loader.loaded_files
+
+
+def test_opts_change_invalidates(tmp_path, module_file):
+    cache = salt.loader.virtualcache.VirtualCache(
+        str(tmp_path), "module", 3600, opts={"virtualenv": "a", "fun": "test.ping"}
+    )
+    cache.set(module_file, True, ["mod_a"])
+    cache.save()
+
+    cache = salt.loader.virtualcache.VirtualCache(
+        str(tmp_path), "module", 3600, opts={"virtualenv": "a", "fun": "test.arg"}
+    )
+    assert cache.get(module_file) == (True, ["mod_a"], None)
+    cache = salt.loader.virtualcache.VirtualCache(
+        str(tmp_path), "module", 3600, opts={"virtualenv": "b", "fun": "test.arg"}
+    )
+    assert cache.get(module_file) is None
+
+
+def test_invalidate(tmp_path, module_file):
+    cache = salt.loader.virtualcache.VirtualCache(str(tmp_path), "module", 3600)
+    cache.set(module_file, True, ["mod_a"])
+    cache.save()
+    salt.loader.virtualcache.invalidate(str(tmp_path))
+
+    cache = salt.loader.virtualcache.VirtualCache(str(tmp_path), "module", 3600)
+    assert cache.get(module_file) is None
+
+
+@pytest.mark.skip_on_windows(reason="The test binary is a shell script")
+def test_dependency_installed(tmp_path, monkeypatch):
+    """
+    A module which did not load because a binary was missing is loaded once
+    the binary is installed, and after a refresh of the modules
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setenv("PATH", str(bin_dir))
+    mod_dir = tmp_path / "modules"
+    mod_dir.mkdir()
+    (mod_dir / "mod_c.py").write_text(
+        "import salt.utils.path\n\n"
+        "def __virtual__():\n"
+        "    if salt.utils.path.which('needed-binary'):\n"
+        "        return True\n"
+        "    return (False, 'needed-binary is missing')\n\n"
+        "def ping():\n    return 'c'\n"
+    )
+    opts = {
+        "optimization_order": [0, 1, 2],
+        "cachedir": str(tmp_path / "cache"),
+        "loader_virtual_cache_ttl": 3600,
+    }
+    loader = salt.loader.lazy.LazyLoader([str(mod_dir)], opts)
+    loader._load_all()
+    assert loader.missing_modules["mod_c"] == "needed-binary is missing"
+
+    binary = bin_dir / "needed-binary"
+    binary.write_text("#!/bin/sh\n")
+    binary.chmod(0o755)
+    # Make sure the mtime of the directory changes on coarse filesystems
+    stat = os.stat(bin_dir)
+    os.utime(bin_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    loader = salt.loader.lazy.LazyLoader([str(mod_dir)], opts)
+    assert loader["mod_c.ping"]() == "c"
+
+    # A refresh discards the results, whatever changed
+    binary.unlink()
+    os.utime(bin_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    loader = salt.loader.lazy.LazyLoader([str(mod_dir)], opts)
+    loader._load_all()
+    assert loader.missing_modules["mod_c"] == "needed-binary is missing"
+    binary.write_text("#!/bin/sh\n")
+    binary.chmod(0o755)
+    os.utime(bin_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    salt.loader.virtualcache.invalidate(opts["cachedir"])
+    loader = salt.loader.lazy.LazyLoader([str(mod_dir)], opts)
+    assert loader["mod_c.ping"]() == "c"
@@ -8,12 +8,15 @@ import time
 
 import pytest
 
+import salt.client
+import salt.minion
 import salt.returners.local_cache as local_cache
+import salt.runners.jobs as jobs
 import salt.utils.files
 import salt.utils.jid
 import salt.utils.job
 import salt.utils.platform
-from tests.support.mock import patch
+from tests.support.mock import MagicMock, patch
 
 log = logging.getLogger(__name__)
 
@@ -25,8 +28,17 @@ def configure_loader_modules(tmp_cache_dir):
             "__opts__": {
                 "cachedir": str(tmp_cache_dir),
                 "keep_jobs_seconds": 0.0000000010,
+                "hash_type": "sha256",
             }
-        }
+        },
+        jobs: {
+            "__opts__": {
+                "conf_file": "",
+                "timeout": 5,
+                "ext_job_cache": None,
+                "master_job_cache": "local_cache",
+            }
+        },
     }
 
 
@@ -221,3 +233,113 @@ def test_empty_jid_dir(jobs_dir):
 
     # check jid dir is removed
     _check_dir_files("new_jid_dir was not removed", empty_jid_dir, status="removed")
+
+
+def test_partial_returns():
+    """
+    test that the results streamed by a minion are returned by get_partials,
+    not get_jid, until the minion returns
+    """
+    jid = local_cache.prep_jid()
+    for seq, batch in enumerate(({"a": 1, "b": 2}, {"c": 3})):
+        local_cache.save_partial(
+            {"jid": jid, "id": "minion", "return": batch, "seq": seq}
+        )
+    assert local_cache.get_jid(jid) == {}
+    assert local_cache.get_partials(jid) == {
+        "minion": {"return": {"a": 1, "b": 2, "c": 3}, "partial": True}
+    }
+
+    local_cache.returner({"jid": jid, "id": "minion", "return": {"full": True}})
+    assert local_cache.get_jid(jid) == {"minion": {"return": {"full": True}}}
+    assert local_cache.get_partials(jid) == {}
+    assert (
+        local_cache.save_partial(
+            {"jid": jid, "id": "minion", "return": {"d": 4}, "seq": 2}
+        )
+        is False
+    )
+    assert local_cache.get_jid(jid) == {"minion": {"return": {"full": True}}}
+
+
+def test_partial_returns_are_not_returned():
+    """
+    test that a minion which only streamed partial results is not reported as
+    returned by the client and the jobs runner
+    """
+    jid = local_cache.prep_jid()
+    local_cache.save_load(jid, {"jid": jid, "fun": "state.apply", "arg": []})
+    local_cache.save_partial({"jid": jid, "id": "minion", "return": {"a": 1}, "seq": 0})
+    returners = {
+        "local_cache.get_jid": local_cache.get_jid,
+        "local_cache.get_partials": local_cache.get_partials,
+    }
+
+    client = MagicMock(opts={"master_job_cache": "local_cache"}, returners=returners)
+    assert salt.client.LocalClient.get_cache_returns(client, jid) == {}
+
+    local_client = MagicMock()
+    local_client.__enter__.return_value.cmd.return_value = {
+        "minion": [{"jid": jid, "fun": "state.apply", "arg": [], "pid": 1234}]
+    }
+    mminion = MagicMock(returners=returners)
+    with patch.object(
+        salt.client, "get_local_client", return_value=local_client
+    ), patch.object(salt.minion, "MasterMinion", return_value=mminion):
+        active = jobs.active()
+        assert active[jid]["Running"] == [{"minion": 1234}]
+        assert active[jid]["Returned"] == []
+        assert jobs.lookup_partials(jid) == {"minion": {"a": 1}}
+
+
+def test_get_jids_from_index(tmp_cache_dir):
+    """
+    test that the jobs are listed from the jid index, without reading their
+    loads, and that the jobs saved before the index existed are indexed
+    """
+    jids = []
+    for fun in ("test.ping", "saltutil.find_job", "test.version"):
+        jid = local_cache.prep_jid()
+        load = {"jid": jid, "fun": fun, "arg": [], "tgt": "*", "tgt_type": "glob"}
+        local_cache.save_load(jid, load)
+        jids.append(jid)
+    # A cache written before the index is indexed once
+    os.remove(tmp_cache_dir / local_cache.JID_INDEX)
+    assert sorted(local_cache.get_jids()) == jids
+
+    jid = local_cache.prep_jid()
+    local_cache.save_load(
+        jid,
+        {
+            "jid": jid,
+            "fun": "test.arg",
+            "arg": [1],
+            "kwargs": {"metadata": {"a": 1}},
+        },
+    )
+    jids.append(jid)
+    with patch.object(
+        local_cache, "_walk_through", side_effect=AssertionError
+    ), patch("salt.payload.load", side_effect=AssertionError):
+        ret = local_cache.get_jids()
+        assert sorted(ret) == jids
+        assert ret[jid]["Function"] == "test.arg"
+        assert ret[jid]["Metadata"] == {"a": 1}
+        ret = local_cache.get_jids_filter(2)
+        assert [job["JID"] for job in ret] == [jids[2], jids[3]]
+        ret = local_cache.get_jids_filter(3)
+        assert [job["JID"] for job in ret] == [jids[0], jids[2], jids[3]]
+        ret = local_cache.get_jids_filter(3, filter_find_job=False)
+        assert [job["JID"] for job in ret] == jids[1:]
+
+
+def test_clean_old_jobs_prunes_index():
+    """
+    test that the removed jobs are dropped from the jid index
+    """
+    jid = local_cache.prep_jid()
+    local_cache.save_load(jid, {"jid": jid, "fun": "test.ping"})
+    assert jid in local_cache.get_jids()
+    time.sleep(0.01)
+    local_cache.clean_old_jobs()
+    assert local_cache.get_jids() == {}
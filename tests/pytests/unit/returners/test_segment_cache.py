@@ -0,0 +1,153 @@
+"""
+Unit tests for the segment_cache job cache
+"""
+
+import calendar
+import os
+import time
+
+import pytest
+
+import salt.returners.segment_cache as segment_cache
+import salt.utils.jid
+
+pytestmark = [
+    pytest.mark.skip_on_windows(reason="segment_cache requires fcntl"),
+]
+
+
+@pytest.fixture
+def configure_loader_modules(tmp_path):
+    return {
+        segment_cache: {
+            "__opts__": {
+                "cachedir": str(tmp_path / "cache"),
+                "keep_jobs_seconds": 3600,
+                "hash_type": "sha256",
+            }
+        }
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_index():
+    segment_cache._INDEX.clear()
+    yield
+    segment_cache._INDEX.clear()
+
+
+def _load(jid, fun="test.ping"):
+    return {"jid": jid, "fun": fun, "arg": [], "tgt": "*", "tgt_type": "glob"}
+
+
+def test_save_and_get_load():
+    jid = segment_cache.prep_jid()
+    segment_cache.save_load(jid, _load(jid), minions=["minion1", "minion2"])
+    segment_cache.save_minions(jid, ["minion3"], syndic_id="syndic")
+    ret = segment_cache.get_load(jid)
+    assert ret["fun"] == "test.ping"
+    assert ret["Minions"] == ["minion1", "minion2", "minion3"]
+    assert segment_cache.get_load("20000101000000000000") == {}
+
+
+def test_returner_and_get_jid():
+    jid = segment_cache.prep_jid()
+    segment_cache.save_load(jid, _load(jid), minions=["minion1", "minion2"])
+    segment_cache.save_partial(
+        {"jid": jid, "id": "minion2", "seq": 0, "return": {"a": 1}}
+    )
+    segment_cache.returner(
+        {"jid": jid, "id": "minion1", "return": True, "retcode": 0, "out": "txt"}
+    )
+    # A second return from the same minion is dropped
+    assert (
+        segment_cache.returner({"jid": jid, "id": "minion1", "return": False})
+        is False
+    )
+    assert segment_cache.get_jid(jid) == {
+        "minion1": {"return": True, "retcode": 0, "out": "txt"},
+    }
+    assert segment_cache.get_partials(jid) == {
+        "minion2": {"return": {"a": 1}, "partial": True},
+    }
+    # Only two files for the whole hour
+    assert sorted(os.listdir(segment_cache._segment_dir(jid))) == ["data", "index"]
+
+
+def test_returner_unknown_and_nocache_jid():
+    jid = salt.utils.jid.gen_jid({})
+    assert segment_cache.returner({"jid": jid, "id": "minion1", "return": 1}) is False
+    jid = segment_cache.prep_jid(nocache=True)
+    segment_cache.returner({"jid": jid, "id": "minion1", "return": 1})
+    assert segment_cache.get_jid(jid) == {}
+
+
+def test_get_jids():
+    jids = []
+    for fun in ("test.ping", "saltutil.find_job", "test.version"):
+        jid = segment_cache.prep_jid()
+        segment_cache.save_load(jid, _load(jid, fun), minions=["minion1"])
+        jids.append(jid)
+    assert sorted(segment_cache.get_jids()) == sorted(jids)
+    ret = segment_cache.get_jids_filter(5)
+    assert [job["JID"] for job in ret] == [jids[0], jids[2]]
+    ret = segment_cache.get_jids_filter(1, filter_find_job=False)
+    assert [job["JID"] for job in ret] == [jids[2]]
+
+
+def test_endtime():
+    jid = segment_cache.prep_jid()
+    assert segment_cache.get_endtime(jid) is False
+    segment_cache.update_endtime(jid, "2024, Jan 01 00:00:00.000000")
+    assert segment_cache.get_endtime(jid) == "2024, Jan 01 00:00:00.000000"
+
+
+def test_clean_old_jobs():
+    old_jid = "20000101000000000000"
+    segment_cache.prep_jid(passed_jid=old_jid)
+    segment_cache.save_load(old_jid, _load(old_jid), minions=["minion1"])
+    jid = segment_cache.prep_jid()
+    segment_cache.save_load(jid, _load(jid), minions=["minion1"])
+    other = segment_cache._segment_dir("custom")
+    segment_cache.prep_jid(passed_jid="custom")
+    os.utime(os.path.join(other, "index"), (0, 0))
+
+    segment_cache.clean_old_jobs()
+    assert not os.path.exists(segment_cache._segment_dir(old_jid))
+    assert not os.path.exists(other)
+    assert segment_cache.get_load(old_jid) == {}
+    assert segment_cache.get_load(jid)["jid"] == jid
+    # A new segment is started after the old one was removed
+    segment_cache.prep_jid(passed_jid=old_jid)
+    assert segment_cache.get_load(old_jid) == {}
+
+
+def test_segment_time():
+    start = time.strptime("2024010112", "%Y%m%d%H")
+    end = segment_cache._segment_time("2024010112")
+    assert end >= calendar.timegm(start) + 3600
+    assert end >= time.mktime(start) + 3600
+    assert segment_cache._segment_time(segment_cache.OTHER_SEGMENT) is None
+
+
+def test_torn_index_entry():
+    """
+    test that an index entry torn by a writer which died does not hide the
+    entries appended after it
+    """
+    jid = segment_cache.prep_jid()
+    segment_cache.save_load(jid, _load(jid), minions=["minion1"])
+    seg_dir = segment_cache._segment_dir(jid)
+    index = os.path.join(seg_dir, "index")
+    size = os.path.getsize(index)
+    # A complete entry whose checksum does not match, then a short one
+    with open(index, "ab") as fp_:
+        fp_.write(segment_cache._HEADER.pack(4, 0) + b"junk")
+        fp_.write(segment_cache._HEADER.pack(64, 0)[:5])
+    segment_cache._INDEX.clear()
+    assert segment_cache.get_load(jid)["jid"] == jid
+
+    segment_cache.returner({"jid": jid, "id": "minion1", "return": True})
+    segment_cache._INDEX.clear()
+    assert segment_cache.get_jid(jid) == {"minion1": {"return": True}}
+    assert os.path.getsize(index) > size
@@ -0,0 +1,72 @@
+"""
+Tests for the master_stats runner
+"""
+
+import pytest
+
+import salt.runners.master_stats as master_stats
+import salt.utils.master
+from salt.utils.histogram import Histogram
+
+
+@pytest.fixture
+def configure_loader_modules(tmp_path):
+    return {master_stats: {"__opts__": {"cachedir": str(tmp_path)}}}
+
+
+@pytest.fixture
+def worker_stats():
+    opts = master_stats.__opts__
+    for idx, values in enumerate(((0.01, 0.02), (0.03,))):
+        latency = Histogram()
+        for value in values:
+            latency.record(value)
+        queue_wait = Histogram()
+        queue_wait.record(0.001)
+        salt.utils.master.write_worker_stats(
+            opts,
+            f"MWorker-{idx}",
+            {
+                "pid": 1000 + idx,
+                "started": 100.0,
+                "time": 110.0,
+                "busy": sum(values),
+                "latency": {"_pillar": latency.to_dict()},
+                "queue_wait": {"_pillar": queue_wait.to_dict()},
+            },
+        )
+
+
+def test_latency(worker_stats):
+    ret = master_stats.latency()
+    assert list(ret) == ["_pillar"]
+    assert ret["_pillar"]["latency"]["count"] == 3
+    assert ret["_pillar"]["latency"]["max"] == 0.03
+    assert ret["_pillar"]["queue_wait"]["count"] == 2
+    ret = master_stats.latency(worker="MWorker-1")
+    assert ret["_pillar"]["latency"]["count"] == 1
+    assert master_stats.latency(cmd="_file_hash") == {}
+
+
+def test_workers(worker_stats):
+    ret = master_stats.workers()
+    assert sorted(ret) == ["MWorker-0", "MWorker-1"]
+    assert ret["MWorker-1"]["requests"] == 1
+    assert ret["MWorker-1"]["utilization"] == pytest.approx(0.003)
+
+
+def test_prometheus(worker_stats):
+    lines = master_stats.prometheus().splitlines()
+    assert "# TYPE salt_master_request_duration_seconds summary" in lines
+    assert 'salt_master_request_duration_seconds_count{cmd="_pillar"} 3' in lines
+    assert 'salt_master_request_queue_wait_seconds_count{cmd="_pillar"} 2' in lines
+    assert any(
+        line.startswith(
+            'salt_master_request_duration_seconds{cmd="_pillar",quantile="0.99"}'
+        )
+        for line in lines
+    )
+    assert 'salt_master_worker_busy_seconds_total{worker="MWorker-1"} 0.03' in lines
+
+    salt.utils.master.clean_worker_stats(master_stats.__opts__)
+    assert master_stats.workers() == {}
@@ -3,6 +3,7 @@
 """
 
 import logging
+import os
 from typing import Any
 
 import pytest
@@ -10,6 +11,7 @@ import pytest
 import salt.exceptions
 import salt.state
 import salt.utils.files
+import salt.utils.json
 import salt.utils.platform
 from salt.exceptions import CommandExecutionError
 from tests.support.mock import MagicMock, patch
@@ -1249,3 +1251,236 @@ def test_module_refresh_typeerror(minion_opts, caplog):
             "Error encountered during module reload. Modules were not reloaded."
             in caplog.text
         )
+
+
+@pytest.mark.skip_on_spawning_platform(
+    reason="Skipped until parallel states can be fixed on spawning platforms."
+)
+def test_call_chunks_wavefront(minion_opts):
+    """
+    Test that with state_parallel_workers set the independent states run in
+    parallel while the requisites and barrier states are respected
+    """
+    minion_opts["state_parallel_workers"] = 2
+    high_data = {
+        "first": {
+            "test": ["succeed_with_changes", {"order": 1}],
+            "__env__": "base",
+            "__sls__": "wavefront",
+        },
+        "second": {
+            "test": ["succeed_with_changes", {"order": 2}],
+            "__env__": "base",
+            "__sls__": "wavefront",
+        },
+        "requires-both": {
+            "test": [
+                "succeed_without_changes",
+                {"require": [{"test": "first"}, {"test": "second"}]},
+                {"order": 3},
+            ],
+            "__env__": "base",
+            "__sls__": "wavefront",
+        },
+        "barrier": {
+            "test": ["succeed_without_changes", {"parallel": False}, {"order": 4}],
+            "__env__": "base",
+            "__sls__": "wavefront",
+        },
+    }
+    with patch("salt.state.State._gather_pillar"):
+        state_obj = salt.state.State(minion_opts)
+        state_obj.jid = "123"
+        ret = state_obj.call_high(high_data)
+    by_id = {val["__id__"]: val for val in ret.values()}
+    assert all(val["result"] is True for val in by_id.values())
+    for id_ in ("first", "second", "requires-both"):
+        assert by_id[id_]["__parallel__"] is True
+    assert "__parallel__" not in by_id["barrier"]
+    assert by_id["first"]["changes"]
+    assert by_id["second"]["changes"]
+
+
+@pytest.mark.skip_on_spawning_platform(
+    reason="Skipped until parallel states can be fixed on spawning platforms."
+)
+def test_call_chunks_wavefront_kill(minion_opts):
+    """
+    Test that the states already started in parallel are collected when the
+    wavefront run is killed
+    """
+    minion_opts["state_parallel_workers"] = 2
+    high_data = {
+        "first": {
+            "test": ["succeed_with_changes", {"order": 1}],
+            "__env__": "base",
+            "__sls__": "wavefront",
+        },
+        "second": {
+            "test": ["succeed_with_changes", {"order": 2}],
+            "__env__": "base",
+            "__sls__": "wavefront",
+        },
+    }
+
+    def check_pause(low):
+        return "kill" if low["__id__"] == "second" else "run"
+
+    with patch("salt.state.State._gather_pillar"):
+        state_obj = salt.state.State(minion_opts)
+        state_obj.jid = "123"
+        with patch.object(state_obj, "check_pause", side_effect=check_pause):
+            ret = state_obj.call_high(high_data)
+    by_id = {val["__id__"]: val for val in ret.values()}
+    assert list(by_id) == ["first"]
+    assert "proc" not in by_id["first"]
+    assert by_id["first"]["result"] is True
+    assert by_id["first"]["__parallel__"] is True
+
+
+@pytest.mark.skip_on_spawning_platform(
+    reason="Skipped until parallel states can be fixed on spawning platforms."
+)
+def test_call_parallel_pool(minion_opts):
+    """
+    Test that with state_parallel_pool set the parallel states are run by the
+    pool workers and their results are returned over the pipe
+    """
+    minion_opts["state_parallel_pool"] = 2
+    high_data = {
+        f"parallel-{idx}": {
+            "test": ["succeed_with_changes", {"parallel": True}],
+            "__env__": "base",
+            "__sls__": "parallel_pool",
+        }
+        for idx in range(5)
+    }
+    high_data["requires-all"] = {
+        "test": [
+            "succeed_without_changes",
+            {"require": [{"test": f"parallel-{idx}"} for idx in range(5)]},
+        ],
+        "__env__": "base",
+        "__sls__": "parallel_pool",
+    }
+    with patch("salt.state.State._gather_pillar"):
+        state_obj = salt.state.State(minion_opts)
+        state_obj.jid = "123"
+        with patch(
+            "salt.state.State._call_parallel_target",
+            side_effect=AssertionError("not run in the pool"),
+        ):
+            ret = state_obj.call_high(high_data)
+    assert state_obj._parallel_pool is None
+    by_id = {val["__id__"]: val for val in ret.values()}
+    assert all(val["result"] is True for val in by_id.values())
+    for idx in range(5):
+        assert by_id[f"parallel-{idx}"]["__parallel__"] is True
+        assert by_id[f"parallel-{idx}"]["changes"]
+    assert by_id["requires-all"]["comment"] == "Success!"
+    # No result was written to the cachedir
+    assert not os.path.exists(
+        os.path.join(minion_opts["cachedir"], state_obj.invocation_id)
+    )
+
+
+def test_guard_cache(minion_opts):
+    """
+    Test that with state_guard_cache set the retcodes of identical unless
+    commands are reused until a state reports changes
+    """
+    minion_opts["state_guard_cache"] = True
+    high_data = {
+        f"state-{idx}": {
+            "test": [fun, {"unless": "somecommand"}, {"order": idx}],
+            "__env__": "base",
+            "__sls__": "guard_cache",
+        }
+        for idx, fun in enumerate(
+            ["nop", "nop", "succeed_with_changes", "nop"], start=1
+        )
+    }
+    with patch("salt.state.State._gather_pillar"):
+        state_obj = salt.state.State(minion_opts)
+        mock = MagicMock(return_value=1)
+        with patch.dict(state_obj.functions, {"cmd.retcode": mock}):
+            ret = state_obj.call_high(high_data)
+    by_id = {val["__id__"]: val for val in ret.values()}
+    assert mock.call_count == 2
+    assert "guard_cache_hits" not in by_id["state-1"]
+    assert by_id["state-2"]["guard_cache_hits"] == 1
+    assert by_id["state-3"]["guard_cache_hits"] == 1
+    assert "guard_cache_hits" not in by_id["state-4"]
+
+
+def test_call_high_state_profile(minion_opts):
+    """
+    Test that with state_profile set call_high writes the time spent in each
+    phase of the run
+    """
+    minion_opts["state_profile"] = True
+    high_data = {
+        "profiled": {
+            "test": ["succeed_without_changes", {"unless": "false"}],
+            "__env__": "base",
+            "__sls__": "profile",
+        }
+    }
+    with patch("salt.state.State._gather_pillar"):
+        state_obj = salt.state.State(minion_opts)
+        state_obj.jid = "123"
+        with patch.dict(
+            state_obj.functions, {"cmd.retcode": MagicMock(return_value=1)}
+        ):
+            state_obj.call_high(high_data)
+    profile_path = os.path.join(minion_opts["cachedir"], "state_profile", "123.json")
+    with salt.utils.files.fopen(profile_path) as fp_:
+        report = salt.utils.json.load(fp_)
+    tag = "test_|-profiled_|-profiled_|-succeed_without_changes"
+    paths = [phase["path"] for phase in report["phases"]]
+    for path in (
+        ["requisite_in"],
+        ["compile_high_data", "order_chunks"],
+        ["compile_high_data"],
+        ["call_chunks", tag, "guard_checks"],
+        ["call_chunks", tag, "function"],
+        ["call_chunks", tag],
+        ["call_chunks"],
+    ):
+        assert path in paths
+    assert os.path.isfile(profile_path[: -len(".json")] + ".folded")
+
+
+def test_call_high_state_stream_batch(minion_opts):
+    """
+    Test that with state_stream_batch set the chunk results are sent to the
+    master in batches while the state run is in progress
+    """
+    minion_opts.update(
+        {"state_stream_batch": 2, "file_client": "remote", "__cli": "salt-minion"}
+    )
+    high_data = {
+        f"state-{idx}": {
+            "test": ["succeed_without_changes", {"order": idx}],
+            "__env__": "base",
+            "__sls__": "stream",
+        }
+        for idx in range(3)
+    }
+    event = MagicMock()
+    with patch("salt.state.State._gather_pillar"):
+        state_obj = salt.state.State(minion_opts, jid="20261016120000000000")
+        with patch("salt.utils.event.get_event") as get_event:
+            get_event.return_value.__enter__.return_value = event
+            ret = state_obj.call_high(high_data)
+    loads = [call.args[0] for call in event.fire_event.call_args_list]
+    assert [load["seq"] for load in loads] == [0, 1]
+    assert all(load["cmd"] == "_return" and load["partial"] for load in loads)
+    assert all(load["jid"] == "20261016120000000000" for load in loads)
+    assert [len(load["return"]) for load in loads] == [2, 1]
+    streamed = {}
+    for load in loads:
+        streamed.update(load["return"])
+    assert streamed == ret
+    tags = [call.args[1] for call in event.fire_event.call_args_list]
+    assert all(tag.startswith("__master_req_channel_payload/") for tag in tags)
@@ -9,6 +9,7 @@ import pytest  # pylint: disable=unused-import
 
 import salt.state
 from salt.utils.odict import DefaultOrderedDict, OrderedDict
+from tests.support.mock import patch
 
 log = logging.getLogger(__name__)
 
@@ -418,3 +419,27 @@ def test_verify_tops_match_none(highstate):
     tops["base"] = OrderedDict([("*", [OrderedDict([("match", "")]), "test", "test2"])])
     matches = highstate.verify_tops(tops)
     assert "Improperly formatted top file matcher in saltenv" in matches[0]
+
+
+def test_render_state_uses_render_cache(highstate, state_tree_dir):
+    """
+    With state_render_cache enabled an unchanged SLS file is only rendered once
+    """
+    highstate.opts["state_render_cache"] = True
+    sls = pytest.helpers.temp_file(
+        "foo.sls", "foo:\n  test.succeed_without_changes", str(state_tree_dir)
+    )
+    with sls:
+        with patch(
+            "salt.state.compile_template", wraps=salt.state.compile_template
+        ) as compile_template:
+            first, errors = highstate.render_state("foo", "base", set(), None)
+            assert not errors
+            # Start over from the cache file written to disk
+            highstate._render_cache.save()
+            highstate._render_cache = None
+            second, errors = highstate.render_state("foo", "base", set(), None)
+            assert not errors
+        assert compile_template.call_count == 1
+        assert list(second) == list(first) == ["foo"]
+        assert second["foo"]["test"][0] == "succeed_without_changes"
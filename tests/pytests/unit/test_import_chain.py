@@ -0,0 +1,52 @@
+"""
+Make sure the modules behind the CLI entry points do not pull in heavy
+libraries they only need for some of their code paths.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+# The third party libraries and salt modules which must only be imported when
+# they are actually used
+HEAVY_MODULES = ("jinja2", "requests", "salt.state", "salt.utils.templates")
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "salt.config",
+        "salt.fileclient",
+        "salt.cli.call",
+        "salt.cli.cp",
+        "salt.cli.daemons",
+        "salt.cli.key",
+        "salt.cli.run",
+        "salt.cli.salt",
+    ],
+)
+def test_no_heavy_imports(module):
+    code = (
+        "import sys\n"
+        f"import {module}\n"
+        f"print(' '.join(mod for mod in {HEAVY_MODULES!r} if mod in sys.modules))\n"
+    )
+    ret = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert ret.stdout.split() == []
+
+
+def test_config_does_not_import_crypt():
+    code = "import sys\nimport salt.config\nprint('salt.crypt' in sys.modules)\n"
+    ret = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert ret.stdout.strip() == "False"
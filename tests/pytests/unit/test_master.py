@@ -1,3 +1,4 @@
+import asyncio
 import os
 import pathlib
 import stat
@@ -7,6 +8,7 @@ import time
 import pytest
 
 import salt.master
+import salt.utils.master
 import salt.utils.platform
 from tests.support.mock import MagicMock, patch
 
@@ -232,6 +234,100 @@ def test_aes_funcs_white(master_opts):
         aes_funcs.destroy()
 
 
+def test_aes_funcs_batched_returns(master_opts):
+    """
+    Validate that the returns are stored in batches when
+    master_return_batch_interval is set
+    """
+    opts = master_opts.copy()
+    opts.update(master_return_batch_interval=1, master_return_batch_size=2)
+    aes_funcs = salt.master.AESFuncs(opts)
+    loads = [
+        {"id": f"minion{idx}", "jid": "20240101000000000000", "return": True}
+        for idx in range(3)
+    ]
+    try:
+        with patch("salt.utils.job.store_jobs") as store_jobs, patch(
+            "salt.utils.job.store_job"
+        ) as store_job:
+            aes_funcs._return(loads[0])
+            store_jobs.assert_not_called()
+            aes_funcs._return(loads[1])
+            store_jobs.assert_called_once()
+            assert store_jobs.call_args.args[1] == loads[:2]
+            assert store_jobs.call_args.kwargs["minion_events"] is True
+            aes_funcs._return(loads[2])
+            aes_funcs.flush_returns()
+            assert store_jobs.call_args.args[1] == loads[2:]
+            aes_funcs.flush_returns()
+            assert store_jobs.call_count == 2
+            store_job.assert_not_called()
+    finally:
+        aes_funcs.destroy()
+
+
+async def test_mworker_latency_stats(master_opts):
+    """
+    Validate that the master workers record the latency of the requests
+    """
+    opts = master_opts.copy()
+    opts.update(master_stats=True, master_stats_event_iter=0)
+    worker = salt.master.MWorker(opts, {}, {}, [], name="MWorker-0")
+    worker.aes_funcs = MagicMock(async_methods=())
+    worker.aes_funcs.run_func.return_value = {}, {"fun": "send"}
+    received = time.time() - 1
+    await worker._handle_aes({"cmd": "_pillar"}, received=received)
+    assert worker.latency["_pillar"].count == 1
+    assert worker.queue_wait["_pillar"].min >= 1
+    event = worker.aes_funcs.event.fire_event.call_args.args[0]
+    assert event["stats"]["_pillar"]["runs"] == 1
+    assert "utilization" in event
+    stats = salt.utils.master.get_worker_stats(opts)
+    assert stats["MWorker-0"]["latency"]["_pillar"].count == 1
+    assert stats["MWorker-0"]["queue_wait"]["_pillar"].count == 1
+
+
+async def test_mworker_blocking_threads(master_opts):
+    """
+    Validate that the worker keeps handling requests while a pillar or file
+    serving request blocks on its thread pool
+    """
+    opts = master_opts.copy()
+    opts.update(worker_blocking_threads=2)
+    worker = salt.master.MWorker(opts, {}, {}, [], name="MWorker-0")
+    worker.aes_funcs = salt.master.AESFuncs(opts)
+    unblock = threading.Event()
+    threads = []
+
+    def serve_file(load):
+        threads.append(threading.current_thread().name)
+        assert unblock.wait(10)
+        return {"data": "contents", "dest": load["path"]}
+
+    def file_hash(load):
+        unblock.set()
+        return {"hsum": "abc", "hash_type": "sha256"}
+
+    try:
+        with patch.object(worker.aes_funcs, "_serve_file", serve_file), patch.object(
+            worker.aes_funcs, "_file_hash", file_hash
+        ):
+            ret = await asyncio.wait_for(
+                asyncio.gather(
+                    worker._handle_aes({"cmd": "_serve_file", "path": "top.sls"}),
+                    worker._handle_aes({"cmd": "_file_hash", "path": "top.sls"}),
+                ),
+                10,
+            )
+        assert ret == [
+            ({"data": "contents", "dest": "top.sls"}, {"fun": "send"}),
+            ({"hsum": "abc", "hash_type": "sha256"}, {"fun": "send"}),
+        ]
+        assert threads[0].startswith("AESFuncs")
+    finally:
+        worker.aes_funcs.destroy()
+
+
 def test_transport_methods():
     class Foo(salt.master.TransportMethods):
         expose_methods = ["bar"]
@@ -259,6 +355,7 @@ def test_aes_funcs_black(master_opts):
         "_AESFuncs__verify_load",
         "_AESFuncs__verify_minion",
         "_AESFuncs__verify_minion_publish",
+        "_fire_event",
         "__class__",
         "__delattr__",
         "__dir__",
@@ -283,8 +380,10 @@ def test_aes_funcs_black(master_opts):
         "__str__",
         "__subclasshook__",
         "destroy",
+        "flush_returns",
         "get_method",
         "run_func",
+        "run_func_async",
     ]
     try:
         for name in dir(aes_funcs):
@@ -514,6 +514,30 @@ async def test_process_count_max(minion_opts, io_loop):
             minion.destroy()
 
 
+async def test_job_pool_reject_policy(minion_opts, io_loop):
+    """
+    Tests that with minion_job_threads, jobs are queued for the job pool and
+    rejected once its queue is full when minion_job_queue_policy is reject.
+    """
+    minion_opts["multiprocessing"] = False
+    minion_opts["minion_job_threads"] = 1
+    minion_opts["minion_job_queue_policy"] = "reject"
+    minion = salt.minion.Minion(minion_opts, jid_queue=[], io_loop=io_loop)
+    try:
+        # A pool without threads, so that the queue fills up
+        minion.job_pool = salt.utils.process.ThreadPool(0, 1, priorities=True)
+        reject_job = MagicMock(return_value=asyncio.sleep(0))
+        with patch.object(minion, "_reject_job", reject_job):
+            await minion._handle_decoded_payload({"fun": "foo.bar", "jid": 1})
+            reject_job.assert_not_called()
+            await minion._handle_decoded_payload({"fun": "foo.bar", "jid": 2})
+            reject_job.assert_called_once_with({"fun": "foo.bar", "jid": 2})
+        assert minion.job_pool.stats()["queued"] == 1
+        assert minion.job_pool.stats()["rejected"] == 1
+    finally:
+        minion.destroy()
+
+
 @pytest.mark.slow_test
 def test_beacons_before_connect(minion_opts):
     """
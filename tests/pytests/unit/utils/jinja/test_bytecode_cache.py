@@ -0,0 +1,126 @@
+"""
+Tests for salt.utils.jinja.SaltBytecodeCache
+"""
+
+import jinja2
+import pytest
+
+import salt.utils.jinja
+from salt.utils.templates import render_jinja_tmpl
+from tests.support.mock import patch
+
+
+@pytest.fixture(autouse=True)
+def clear_store():
+    salt.utils.jinja._bytecode_store.clear()
+    yield
+    salt.utils.jinja._bytecode_store.clear()
+
+
+@pytest.fixture
+def templates():
+    return {"macro": "{% macro hello(name) %}Hello {{ name }}{% endmacro %}"}
+
+
+def _env(bcc, templates):
+    return jinja2.Environment(
+        loader=jinja2.DictLoader(templates), bytecode_cache=bcc, auto_reload=False
+    )
+
+
+def _count_compiles():
+    return patch.object(
+        jinja2.Environment,
+        "compile",
+        side_effect=jinja2.Environment.compile,
+        autospec=True,
+    )
+
+
+def test_imports_compiled_once(templates):
+    source = "{% from 'macro' import hello %}{{ hello('world') }}"
+    with _count_compiles() as compile_:
+        for _ in range(3):
+            # A new environment for each render, as render_jinja_tmpl does
+            bcc = salt.utils.jinja.SaltBytecodeCache(10)
+            template = bcc.from_string(_env(bcc, templates), source)
+            assert template.render() == "Hello world"
+    # The template itself and the imported macro
+    assert compile_.call_count == 2
+
+
+def test_changed_source_recompiled(templates):
+    bcc = salt.utils.jinja.SaltBytecodeCache(10)
+    env = _env(bcc, templates)
+    assert env.get_template("macro").module.hello("a") == "Hello a"
+    templates["macro"] = "{% macro hello(name) %}Bye {{ name }}{% endmacro %}"
+    env = _env(bcc, templates)
+    assert env.get_template("macro").module.hello("a") == "Bye a"
+
+
+def test_prefix_separates_entries(templates):
+    source = "{{ 'foo' }}"
+    with _count_compiles() as compile_:
+        for prefix in ("a", "b", "a"):
+            bcc = salt.utils.jinja.SaltBytecodeCache(10, prefix=prefix)
+            bcc.from_string(_env(bcc, templates), source)
+    assert compile_.call_count == 2
+
+
+def test_lru_eviction(templates):
+    bcc = salt.utils.jinja.SaltBytecodeCache(2)
+    env = _env(bcc, templates)
+    for source in ("a", "b", "a", "c"):
+        bcc.from_string(env, source)
+    assert len(salt.utils.jinja._bytecode_store) == 2
+    with _count_compiles() as compile_:
+        bcc.from_string(env, "a")
+        assert compile_.call_count == 0
+        bcc.from_string(env, "b")
+        assert compile_.call_count == 1
+
+
+def test_filesystem_cache(tmp_path, templates):
+    directory = tmp_path / "jinja_bytecode"
+    bcc = salt.utils.jinja.SaltBytecodeCache(10, directory=str(directory))
+    bcc.from_string(_env(bcc, templates), "{{ 'foo' }}")
+    assert list(directory.iterdir())
+
+    salt.utils.jinja._bytecode_store.clear()
+    with _count_compiles() as compile_:
+        template = bcc.from_string(_env(bcc, templates), "{{ 'foo' }}")
+        assert template.render() == "foo"
+    assert compile_.call_count == 0
+
+
+def test_from_opts(tmp_path):
+    env_args = {"extensions": [], "loader": None}
+    assert salt.utils.jinja.SaltBytecodeCache.from_opts({}, env_args) is None
+    opts = {
+        "jinja_template_cache_size": 10,
+        "jinja_bytecode_cache": True,
+        "cachedir": str(tmp_path),
+    }
+    bcc = salt.utils.jinja.SaltBytecodeCache.from_opts(opts, env_args)
+    assert bcc.fs_cache is not None
+    assert (tmp_path / "jinja_bytecode").is_dir()
+    other = salt.utils.jinja.SaltBytecodeCache.from_opts(
+        opts, dict(env_args, trim_blocks=True)
+    )
+    assert bcc.prefix != other.prefix
+
+
+def test_render_jinja_tmpl(minion_opts, tmp_path):
+    minion_opts["jinja_template_cache_size"] = 10
+    (tmp_path / "macro").write_text(
+        "{% macro hello(name) %}Hello {{ name }}{% endmacro %}"
+    )
+    tmplpath = str(tmp_path / "template")
+    source = "{% from 'macro' import hello %}{{ hello(name) }}"
+    with _count_compiles() as compile_:
+        for name in ("a", "b"):
+            context = {"opts": minion_opts, "saltenv": None, "name": name}
+            assert render_jinja_tmpl(source, context, tmplpath=tmplpath) == (
+                f"Hello {name}"
+            )
+    assert compile_.call_count == 2
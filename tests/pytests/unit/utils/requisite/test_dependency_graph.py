@@ -2,6 +2,8 @@
 Test functions in state.py that are not a part of a class
 """
 
+import time
+
 import pytest
 
 import salt.utils.requisite
@@ -483,3 +485,142 @@ def test_get_dependencies_when_aggregated():
             for (req_type, chunk) in depend_graph.get_dependencies(low)
         ]
         assert expected_dependency_tuples == depend_tuples
+
+
+def _synthetic_highstate_chunks(count):
+    """
+    Generate the low chunks of a highstate with ``count`` packages which
+    all depend on a shared set of repositories and are each followed by a
+    service requiring the package.
+    """
+    chunks = []
+    for idx in range(20):
+        chunks.append(
+            {
+                "__id__": f"repo-{idx}",
+                "name": f"repo-{idx}",
+                "state": "pkgrepo",
+                "fun": "managed",
+                "__sls__": "repos",
+                "__env__": "base",
+            }
+        )
+    for idx in range(count):
+        chunks.append(
+            {
+                "__id__": f"pkg-{idx}",
+                "name": f"pkg-{idx}",
+                "state": "pkg",
+                "fun": "installed",
+                "__sls__": f"app-{idx}",
+                "__env__": "base",
+                "require": [{"sls": "repos"}],
+            }
+        )
+        chunks.append(
+            {
+                "__id__": f"service-{idx}",
+                "name": f"service-{idx}",
+                "state": "service",
+                "fun": "running",
+                "__sls__": f"app-{idx}",
+                "__env__": "base",
+                "require": [{"pkg": f"pkg-{idx}"}],
+            }
+        )
+    return chunks
+
+
+def _time_aggregate_and_order(count):
+    depend_graph = salt.utils.requisite.DependencyGraph()
+    chunks = _synthetic_highstate_chunks(count)
+    for low in chunks:
+        depend_graph.add_chunk(low, allow_aggregate=low["state"] == "pkg")
+    for low in chunks:
+        depend_graph.add_requisites(low, [])
+    start = time.perf_counter()
+    ordered_chunks = depend_graph.aggregate_and_order_chunks(100)
+    duration = time.perf_counter() - start
+    assert len(ordered_chunks) == len(chunks)
+    # The packages are split into aggregation groups of 500 chunks
+    assert len(depend_graph.get_aggregate_chunks(chunks[-2])) == 500
+    return duration
+
+
+def test_aggregate_and_order_chunks_scaling():
+    """
+    Aggregating and ordering a synthetic 10k package highstate must scale
+    roughly linearly with the number of chunks
+    """
+    small = min(_time_aggregate_and_order(2000) for _ in range(2))
+    large = _time_aggregate_and_order(10000)
+    # 5 times the chunks, allow for noise but not for quadratic growth
+    assert large < small * 12
+
+
+def test_aggregate_and_order_chunks_cycle():
+    """
+    Ordering chunks with recursive requisites raises RequisiteCycleError
+    """
+    chunks = [
+        {
+            "__id__": f"state-{idx}",
+            "name": f"state-{idx}",
+            "state": "test",
+            "fun": "nop",
+            "__sls__": "test",
+            "__env__": "base",
+            "require": [f"state-{(idx + 1) % 2}"],
+        }
+        for idx in range(2)
+    ]
+    depend_graph = salt.utils.requisite.DependencyGraph()
+    for low in chunks:
+        depend_graph.add_chunk(low, allow_aggregate=False)
+    for low in chunks:
+        depend_graph.add_requisites(low, [])
+    with pytest.raises(salt.utils.requisite.RequisiteCycleError):
+        depend_graph.aggregate_and_order_chunks(100)
+    assert len(depend_graph.find_cycle_edges()) == 2
+
+
+def test_get_requisites():
+    chunks = [
+        {"__id__": "requirement", "name": "requirement", "state": "test", "fun": "nop"},
+        {
+            "__id__": "changes",
+            "name": "changes",
+            "state": "test",
+            "fun": "nop",
+        },
+        {
+            "__id__": "target",
+            "name": "target",
+            "state": "test",
+            "fun": "nop",
+            "require": ["requirement"],
+            "onchanges": ["changes"],
+        },
+    ]
+    depend_graph = salt.utils.requisite.DependencyGraph()
+    for low in chunks:
+        low.update({"__env__": "base", "__sls__": "test"})
+        depend_graph.add_chunk(low, allow_aggregate=False)
+    for low in chunks:
+        depend_graph.add_requisites(low, [])
+    depend_graph.aggregate_and_order_chunks(100)
+
+    reqs = depend_graph.get_requisites(chunks[2])
+    assert reqs == {
+        salt.utils.requisite.RequisiteType.REQUIRE: (
+            [chunks[0]],
+            ["test_|-requirement_|-requirement_|-nop"],
+        ),
+        salt.utils.requisite.RequisiteType.ONCHANGES: (
+            [chunks[1]],
+            ["test_|-changes_|-changes_|-nop"],
+        ),
+    }
+    # The requisites are computed once per chunk and then reused
+    assert depend_graph.get_requisites(chunks[2]) is reqs
+    assert depend_graph.get_requisites(chunks[0]) == {}
@@ -0,0 +1,91 @@
+"""
+Tests for the copy on write containers of salt.utils.context
+"""
+
+import copy
+
+import salt.payload
+import salt.utils.json
+import salt.utils.yaml
+from salt.utils.context import CopyOnWriteDict, CopyOnWriteList
+
+
+def _original():
+    return {
+        "top": "level",
+        "nested": {"key": "value", "deeper": {"list": [1, {"a": "b"}]}},
+        "list": [{"x": 1}, [2]],
+    }
+
+
+def test_changes_do_not_reach_original():
+    original = _original()
+    cow = CopyOnWriteDict(original)
+    cow["top"] = "changed"
+    cow["nested"]["key"] = "changed"
+    cow["nested"]["deeper"]["list"][1]["a"] = "changed"
+    cow["nested"]["deeper"]["list"].append(3)
+    cow.get("list")[0]["x"] = 2
+    cow["list"][1].append(3)
+    cow.setdefault("nested", {})["new"] = True
+    for _, value in cow.items():
+        if isinstance(value, dict):
+            value.clear()
+    assert original == _original()
+    assert cow["top"] == "changed"
+    assert cow["list"] == [{"x": 2}, [2, 3]]
+
+
+def test_unread_values_shared():
+    original = _original()
+    cow = CopyOnWriteDict(original)
+    assert dict.__getitem__(cow, "nested") is original["nested"]
+    assert cow["nested"] is not original["nested"]
+    assert cow["nested"] is cow["nested"]
+    assert cow == original
+
+
+def test_copies_are_independent():
+    original = _original()
+    cow = CopyOnWriteDict(original)
+    other = cow.copy()
+    other["nested"]["key"] = "other"
+    assert cow["nested"]["key"] == "value"
+    # Like any shallow copy, a plain dict shares the values of the copy on
+    # write dict, but not those of the original
+    plain = dict(cow)
+    plain["list"][0]["x"] = "plain"
+    assert cow["list"][0]["x"] == "plain"
+    assert original == _original()
+    assert copy.deepcopy(cow) == cow
+    assert type(copy.deepcopy(cow)) is dict
+
+
+def test_assigned_values_not_copied():
+    cow = CopyOnWriteDict({})
+    value = {"a": 1}
+    cow["value"] = value
+    assert cow["value"] is value
+    cow_list = CopyOnWriteList([])
+    cow_list.append(value)
+    assert cow_list[0] is value
+
+
+def test_list_changes_do_not_reach_original():
+    original = [{"a": 1}, {"b": 2}, {"c": 3}]
+    cow = CopyOnWriteList(original)
+    cow.insert(0, {"z": 0})
+    cow[1]["a"] = "changed"
+    cow.pop()
+    cow.reverse()
+    for item in cow:
+        item["new"] = True
+    assert original == [{"a": 1}, {"b": 2}, {"c": 3}]
+    assert cow[-1] == {"z": 0, "new": True}
+
+
+def test_serialization():
+    cow = CopyOnWriteDict(_original())
+    assert salt.utils.json.loads(salt.utils.json.dumps(cow)) == _original()
+    assert salt.payload.loads(salt.payload.dumps(cow)) == _original()
+    assert salt.utils.yaml.safe_load(salt.utils.yaml.safe_dump(cow)) == _original()
@@ -0,0 +1,96 @@
+"""
+Tests for salt.utils.forkserver
+"""
+
+import os
+import time
+
+import pytest
+
+import salt.utils.files
+import salt.utils.forkserver
+import salt.utils.json
+
+pytestmark = [
+    pytest.mark.skipif(
+        not salt.utils.forkserver.supported(), reason="Requires os.fork"
+    ),
+    pytest.mark.skip_on_spawning_platform(
+        reason="The fake minion cannot be rebuilt in a spawned process"
+    ),
+]
+
+
+class _Loader:
+    def __init__(self, opts):
+        self.pack = {"__pillar__": opts["pillar"]}
+
+
+class FakeMinion:
+    """
+    Writes the pid and pillar of the process running each job
+    """
+
+    def __init__(self, opts):
+        self.opts = opts
+        self.connected = True
+        self.functions = _Loader(opts)
+        self.returners = _Loader(opts)
+
+    @classmethod
+    def _prepare_target_instance(cls, minion_instance, opts, connected, creds_map):
+        return minion_instance
+
+    @classmethod
+    def _target(cls, minion_instance, opts, data, connected, creds_map):
+        path = os.path.join(opts["cachedir"], data["jid"])
+        with salt.utils.files.fopen(path + ".tmp", "w") as fp_:
+            salt.utils.json.dump(
+                {
+                    "pid": os.getpid(),
+                    "pillar": minion_instance.functions.pack["__pillar__"],
+                },
+                fp_,
+            )
+        os.rename(path + ".tmp", path)
+
+
+def _wait_for(path, timeout=30):
+    start = time.time()
+    while not os.path.exists(path):
+        assert time.time() - start < timeout, f"{path} was not written"
+        time.sleep(0.05)
+    with salt.utils.files.fopen(path) as fp_:
+        return salt.utils.json.load(fp_)
+
+
+def test_jobs_forked_from_template(tmp_path):
+    minion = FakeMinion({"cachedir": str(tmp_path), "pillar": {"foo": "bar"}})
+    server = salt.utils.forkserver.JobForkServer(minion)
+    try:
+        assert server.submit({"jid": "1"}, True)
+        first = _wait_for(str(tmp_path / "1"))
+        assert first["pillar"] == {"foo": "bar"}
+        assert first["pid"] not in (os.getpid(), server.process.pid)
+
+        assert server.refresh(pillar={"foo": "baz"})
+        assert server.submit({"jid": "2"}, True)
+        second = _wait_for(str(tmp_path / "2"))
+        assert second["pillar"] == {"foo": "baz"}
+        assert second["pid"] != first["pid"]
+    finally:
+        server.stop()
+    assert server.process is None
+
+
+def test_template_restarted(tmp_path):
+    minion = FakeMinion({"cachedir": str(tmp_path), "pillar": {}})
+    server = salt.utils.forkserver.JobForkServer(minion)
+    try:
+        server.start()
+        server.process.terminate()
+        server.process.join(5)
+        assert server.submit({"jid": "1"}, True)
+        _wait_for(str(tmp_path / "1"))
+    finally:
+        server.stop()
@@ -0,0 +1,65 @@
+"""
+Tests for salt.utils.histogram
+"""
+
+import random
+
+import pytest
+
+import salt.utils.json
+from salt.utils.histogram import Histogram
+
+
+def test_percentiles():
+    values = [random.expovariate(100) for _ in range(10000)]
+    hist = Histogram()
+    for value in values:
+        hist.record(value)
+    values.sort()
+    for percent in (50, 90, 99, 99.9):
+        exact = values[int(percent * len(values) / 100) - 1]
+        assert hist.percentile(percent) == pytest.approx(exact, rel=0.01, abs=1e-6)
+    assert hist.percentile(100) == values[-1]
+    assert hist.count == len(values)
+    assert hist.mean() == pytest.approx(sum(values) / len(values))
+    # The buckets grow with the values
+    assert len(hist.counts) < 2000
+
+
+def test_empty():
+    hist = Histogram()
+    assert hist.percentile(99) is None
+    assert hist.summary() == {
+        "count": 0,
+        "mean": None,
+        "min": None,
+        "max": None,
+        "p50": None,
+        "p90": None,
+        "p99": None,
+        "p99.9": None,
+    }
+
+
+def test_merge():
+    first, second, both = Histogram(), Histogram(), Histogram()
+    for value in range(1, 1000):
+        (first if value % 2 else second).record(value / 1000.0)
+        both.record(value / 1000.0)
+    first.merge(second)
+    assert first.counts == both.counts
+    assert (first.count, first.min, first.max) == (both.count, both.min, both.max)
+    assert first.total == pytest.approx(both.total)
+    with pytest.raises(ValueError):
+        first.merge(Histogram(precision=3))
+
+
+def test_serialization():
+    hist = Histogram()
+    for value in (0.001, 0.002, 0.5, 3):
+        hist.record(value)
+    ret = Histogram.from_dict(
+        salt.utils.json.loads(salt.utils.json.dumps(hist.to_dict()))
+    )
+    assert ret.to_dict() == hist.to_dict()
+    assert ret.summary() == hist.summary()
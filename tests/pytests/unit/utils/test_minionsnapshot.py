@@ -0,0 +1,53 @@
+"""
+Tests for salt.utils.minionsnapshot
+"""
+
+import pytest
+
+import salt.utils.minionsnapshot
+
+
+@pytest.fixture
+def opts(tmp_path):
+    cachedir = tmp_path / "cache"
+    cachedir.mkdir()
+    pki_dir = tmp_path / "pki"
+    pki_dir.mkdir()
+    (pki_dir / "minion_master.pub").write_text("master key")
+    return {
+        "cachedir": str(cachedir),
+        "pki_dir": str(pki_dir),
+        "id": "minion",
+        "master": "salt",
+        "saltenv": None,
+        "pillarenv": None,
+        "grains": {"os": "Debian"},
+        "minion_warm_start_max_age": 3600,
+    }
+
+
+def test_roundtrip(opts):
+    salt.utils.minionsnapshot.save(opts, {"foo": "bar"})
+    assert salt.utils.minionsnapshot.load(opts) == {"foo": "bar"}
+
+
+def test_no_snapshot(opts):
+    assert salt.utils.minionsnapshot.load(opts) is None
+
+
+def test_grains_change_invalidates(opts):
+    salt.utils.minionsnapshot.save(opts, {"foo": "bar"})
+    opts["grains"] = {"os": "Fedora"}
+    assert salt.utils.minionsnapshot.load(opts) is None
+
+
+def test_master_key_change_invalidates(opts, tmp_path):
+    salt.utils.minionsnapshot.save(opts, {"foo": "bar"})
+    (tmp_path / "pki" / "minion_master.pub").write_text("other master key")
+    assert salt.utils.minionsnapshot.load(opts) is None
+
+
+def test_expired(opts):
+    salt.utils.minionsnapshot.save(opts, {"foo": "bar"})
+    opts["minion_warm_start_max_age"] = -1
+    assert salt.utils.minionsnapshot.load(opts) is None
@@ -0,0 +1,108 @@
+"""
+Tests for salt.utils.slscache
+"""
+
+import pytest
+
+import salt.utils.slscache
+from tests.support.mock import MagicMock
+
+
+@pytest.fixture
+def opts(tmp_path):
+    cachedir = tmp_path / "cache"
+    cachedir.mkdir()
+    return {"cachedir": str(cachedir)}
+
+
+@pytest.fixture
+def sls_file(tmp_path):
+    path = tmp_path / "foo.sls"
+    path.write_text("foo: test.nop")
+    return path
+
+
+@pytest.fixture
+def template_file(tmp_path):
+    path = tmp_path / "map.jinja"
+    path.write_text("{% set foo = 'bar' %}")
+    return path
+
+
+@pytest.fixture
+def file_client(template_file):
+    client = MagicMock()
+    client.cache_file.return_value = str(template_file)
+    return client
+
+
+def _make_cache(opts, file_client, pillar=None, grains=None):
+    return salt.utils.slscache.SLSRenderCache(
+        opts, file_client, pillar or {"a": 1}, grains or {"os": "Linux"}
+    )
+
+
+def test_roundtrip(opts, file_client, sls_file):
+    state = {"foo": {"test": ["nop"]}}
+    cache = _make_cache(opts, file_client)
+    assert cache.get("foo", "base", str(sls_file), "jinja|yaml") is None
+    cache.set("foo", "base", str(sls_file), "jinja|yaml", set(), state)
+    cache.save()
+
+    cache = _make_cache(opts, file_client)
+    ret = cache.get("foo", "base", str(sls_file), "jinja|yaml")
+    assert ret == state
+    # The returned data must not be shared with the cache
+    ret["foo"]["changed"] = True
+    assert cache.get("foo", "base", str(sls_file), "jinja|yaml") == state
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"pillar": {"a": 2}}, {"grains": {"os": "Windows"}}],
+)
+def test_invalidated_by_pillar_and_grains(opts, file_client, sls_file, kwargs):
+    cache = _make_cache(opts, file_client)
+    cache.set("foo", "base", str(sls_file), "jinja|yaml", set(), {"foo": {}})
+    cache.save()
+
+    cache = _make_cache(opts, file_client, **kwargs)
+    assert cache.get("foo", "base", str(sls_file), "jinja|yaml") is None
+
+
+def test_invalidated_by_renderer_and_sls_change(opts, file_client, sls_file):
+    cache = _make_cache(opts, file_client)
+    cache.set("foo", "base", str(sls_file), "jinja|yaml", set(), {"foo": {}})
+    assert cache.get("foo", "base", str(sls_file), "yaml") is None
+    sls_file.write_text("foo: test.succeed_without_changes")
+    assert cache.get("foo", "base", str(sls_file), "jinja|yaml") is None
+
+
+def test_invalidated_by_imported_template_change(
+    opts, file_client, sls_file, template_file
+):
+    cache = _make_cache(opts, file_client)
+    cache.set(
+        "foo",
+        "base",
+        str(sls_file),
+        "jinja|yaml",
+        {("base", "map.jinja")},
+        {"foo": {}},
+    )
+    cache.save()
+    assert _make_cache(opts, file_client).get(
+        "foo", "base", str(sls_file), "jinja|yaml"
+    ) == {"foo": {}}
+
+    template_file.write_text("{% set foo = 'baz' %}")
+    assert (
+        _make_cache(opts, file_client).get("foo", "base", str(sls_file), "jinja|yaml")
+        is None
+    )
+
+
+def test_unserializable_data_not_cached(opts, file_client, sls_file):
+    cache = _make_cache(opts, file_client)
+    cache.set("foo", "base", str(sls_file), "jinja|yaml", set(), {"foo": object()})
+    assert cache.get("foo", "base", str(sls_file), "jinja|yaml") is None
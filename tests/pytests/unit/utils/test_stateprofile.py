@@ -0,0 +1,59 @@
+"""
+Tests for salt.utils.stateprofile
+"""
+
+import json
+
+import salt.utils.stateprofile
+from tests.support.mock import patch
+
+
+def _profile(profiler):
+    with patch("time.perf_counter", side_effect=[0.0, 1.0, 3.0, 4.0, 5.0, 10.0]):
+        with profiler.phase("outer"):
+            with salt.utils.stateprofile.phase("inner"):
+                pass
+            with salt.utils.stateprofile.phase("inner"):
+                pass
+
+
+def test_report():
+    profiler = salt.utils.stateprofile.StateProfiler()
+    _profile(profiler)
+    assert profiler.report() == {
+        "duration": 10000.0,
+        "phases": [
+            {
+                "path": ["outer", "inner"],
+                "duration": 3000.0,
+                "self": 3000.0,
+                "calls": 2,
+            },
+            {"path": ["outer"], "duration": 10000.0, "self": 7000.0, "calls": 1},
+        ],
+    }
+    assert profiler.collapsed() == "outer;inner 3000000\nouter 7000000\n"
+
+
+def test_phase_outside_of_profiled_phase():
+    profiler = salt.utils.stateprofile.StateProfiler()
+    with salt.utils.stateprofile.phase("orphan"):
+        pass
+    assert profiler.report() == {"duration": 0, "phases": []}
+
+
+def test_disabled():
+    profiler = salt.utils.stateprofile.StateProfiler(enabled=False)
+    with profiler.phase("outer"):
+        with salt.utils.stateprofile.phase("inner"):
+            pass
+    assert profiler.report()["phases"] == []
+
+
+def test_write(tmp_path):
+    profiler = salt.utils.stateprofile.StateProfiler()
+    _profile(profiler)
+    report = profiler.write(str(tmp_path), "123")
+    profile_dir = tmp_path / "state_profile"
+    assert json.loads((profile_dir / "123.json").read_text()) == report
+    assert (profile_dir / "123.folded").read_text() == profiler.collapsed()
@@ -4,7 +4,7 @@ unit tests for salt.utils.job
 
 import salt.minion
 import salt.utils.job as job
-from tests.support.mock import patch
+from tests.support.mock import MagicMock, patch
 from tests.support.unit import TestCase
 
 
@@ -57,3 +57,28 @@ class JobTest(TestCase):
                         "The specified 'foo' returner threw a stack trace",
                         logged.output[0],
                     )
+
+    def test_store_jobs_prepares_job_once(self):
+        """
+        test store_jobs prepares and saves each job once for all its returns
+        """
+        returners = {
+            "foo.save_load": MagicMock(),
+            "foo.prep_jid": MagicMock(),
+            "foo.get_load": MagicMock(return_value={}),
+            "foo.returner": MagicMock(),
+        }
+        loads = [
+            {"jid": "20190618090114890985", "return": {}, "id": "a"},
+            {"jid": "20190618090114890985", "return": {}, "id": "b"},
+            {"jid": "20190618090114890986", "return": {}, "id": "a"},
+        ]
+        with patch.object(salt.minion, "MasterMinion", MockMasterMinion), patch.dict(
+            MockMasterMinion.returners, returners
+        ), patch("salt.utils.verify.valid_id", return_value=True):
+            job.store_jobs(MockMasterMinion.opts, loads)
+        self.assertEqual(returners["foo.prep_jid"].call_count, 2)
+        self.assertEqual(returners["foo.save_load"].call_count, 2)
+        returners["foo.save_load"].assert_any_call("20190618090114890985", loads[0])
+        returners["foo.save_load"].assert_any_call("20190618090114890986", loads[2])
+        self.assertEqual(returners["foo.returner"].call_count, 3)
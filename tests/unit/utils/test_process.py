@@ -195,6 +195,23 @@ class TestThreadPool(TestCase):
         self.assertEqual(counter.value, 0)
         # make sure the queue is still full
         self.assertEqual(pool._job_queue.qsize(), 1)
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+    def test_priorities(self):
+        """
+        Make sure tasks with a lower priority number are run first, and tasks
+        of the same priority in the order they were fired
+        """
+        order = []
+        pool = salt.utils.process.ThreadPool(0, priorities=True)
+        pool.fire_async(order.append, args=("scheduled",), priority=1)
+        pool.fire_async(order.append, args=("first",))
+        pool.fire_async(order.append, args=("second",))
+        self.assertEqual(pool.stats()["queued"], 3)
+        while not pool._job_queue.empty():
+            func, args, kwargs = pool._job_queue.get_nowait()[-3:]
+            func(*args, **kwargs)
+        self.assertEqual(order, ["first", "second", "scheduled"])
 
 
 class TestProcess(TestCase):